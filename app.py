@@ -0,0 +1,23 @@
+from networksecurity.logging import logger
+from networksecurity.exception import NetworkSecurityException
+from networksecurity.serving.prediction_server import PredictionServer
+from networksecurity.entity.config_entity import PredictionServerConfig
+
+import sys
+import threading
+
+
+if __name__ == "__main__":
+    try:
+        # Load the published model once and serve it until interrupted
+        prediction_server = PredictionServer(PredictionServerConfig())
+        prediction_server.start()
+        try:
+            threading.Event().wait()
+        except KeyboardInterrupt:
+            logger.info("Stopping prediction server...")
+        finally:
+            prediction_server.shutdown()
+
+    except Exception as e:
+        raise NetworkSecurityException(e, sys)
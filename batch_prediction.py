@@ -0,0 +1,40 @@
+from networksecurity.logging import logger
+from networksecurity.exception import NetworkSecurityException
+from networksecurity.pipeline.batch_prediction import BatchPredictionPipeline
+from networksecurity.entity.config_entity import TrainingPipelineConfig, BatchPredictionConfig
+
+import sys
+import argparse
+
+
+if __name__ == "__main__":
+    try:
+        parser = argparse.ArgumentParser(description="Score a csv/parquet file or a Mongo collection with the saved model.")
+        parser.add_argument("--input-file", help="csv or parquet file to score")
+        parser.add_argument("--input-collection", help="Mongo collection to score instead of a file")
+        parser.add_argument("--output-file", help="csv or parquet file for the predictions")
+        parser.add_argument("--output-collection", help="Mongo collection for the predictions instead of a file")
+        parser.add_argument("--model", help="pickled NetworkModel, defaults to the published model")
+        parser.add_argument("--chunk-size", type=int)
+        parser.add_argument("--workers", type=int, help="worker processes, -1 for one per CPU")
+        args = parser.parse_args()
+
+        batch_prediction_config = BatchPredictionConfig(TrainingPipelineConfig())
+        overrides = {
+            "input_file_path": args.input_file,
+            "input_collection_name": args.input_collection,
+            "output_file_path": args.output_file,
+            "output_collection_name": args.output_collection,
+            "model_file_path": args.model,
+            "chunk_size": args.chunk_size,
+            "n_workers": args.workers
+        }
+        for name, value in overrides.items():
+            if value is not None:
+                setattr(batch_prediction_config, name, value)
+
+        batch_prediction_artifact = BatchPredictionPipeline(batch_prediction_config).run_pipeline()
+        print(f"Batch prediction completed. Artifacts: {batch_prediction_artifact}")
+
+    except Exception as e:
+        raise NetworkSecurityException(e, sys)
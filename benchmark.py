@@ -0,0 +1,58 @@
+from networksecurity.logging import logger
+from networksecurity.exception import NetworkSecurityException
+from networksecurity.benchmark.benchmark_suite import BenchmarkSuite, PIPELINE_STAGES
+from networksecurity.constants.training_pipeline import BENCHMARK_DIR_NAME
+from networksecurity.entity.config_entity import TrainingPipelineConfig, BenchmarkConfig
+
+import os
+import sys
+import argparse
+from datetime import datetime
+
+
+if __name__ == "__main__":
+    try:
+        parser = argparse.ArgumentParser(description="Benchmark the pipeline stages on synthetic data and check for regressions.")
+        parser.add_argument("--rows", type=int, help="synthetic rows to generate, e.g. 100000 to 100000000")
+        parser.add_argument("--nan-rate", type=float, help="fraction of feature values left missing")
+        parser.add_argument("--drift", type=float, help="0 to 1, how far feature distributions move from the seed data")
+        parser.add_argument("--seed", type=int)
+        parser.add_argument("--source", choices=["file", "mongo"], help="read the data from the file or a Mongo collection")
+        parser.add_argument("--format", choices=["csv", "parquet"], help="file format of the generated dataset")
+        parser.add_argument("--chunk-size", type=int)
+        parser.add_argument("--stages", nargs="+", choices=PIPELINE_STAGES + ["batch_prediction", "prediction_latency"])
+        parser.add_argument("--history-file", help="JSON lines file the results are appended to and compared against")
+        parser.add_argument("--tolerance", type=float, help="relative slowdown or memory growth reported as a regression")
+        args = parser.parse_args()
+
+        training_pipeline_config = TrainingPipelineConfig(timestamp=os.path.join(BENCHMARK_DIR_NAME, datetime.now().strftime("%m-%d-%Y_%H-%M-%S")))
+        benchmark_config = BenchmarkConfig(training_pipeline_config)
+        overrides = {
+            "n_rows": args.rows,
+            "nan_rate": args.nan_rate,
+            "drift": args.drift,
+            "random_seed": args.seed,
+            "source": args.source,
+            "file_format": args.format,
+            "chunk_size": args.chunk_size,
+            "stages": args.stages,
+            "history_file_path": args.history_file,
+            "regression_tolerance": args.tolerance
+        }
+        for name, value in overrides.items():
+            if value is not None:
+                setattr(benchmark_config, name, value)
+
+        benchmark_artifact = BenchmarkSuite(benchmark_config, training_pipeline_config).run_benchmark()
+        for stage, metrics in benchmark_artifact.stage_metrics.items():
+            print(f"{stage:<22} {metrics['wall_time']:8.2f}s  {metrics['peak_rss_bytes'] / 1024 ** 2:7.0f} MB  "
+                  f"{metrics['rows_per_second'] or 0:12.0f} rows/sec")
+        if benchmark_artifact.latency_ms:
+            print("latency ms: " + ", ".join(f"{name} {value:.3f}" for name, value in benchmark_artifact.latency_ms.items()))
+
+        if benchmark_artifact.regressions:
+            logger.error(f"{len(benchmark_artifact.regressions)} benchmark regressions, see {benchmark_artifact.history_file_path}")
+            sys.exit(1)
+
+    except Exception as e:
+        raise NetworkSecurityException(e, sys)
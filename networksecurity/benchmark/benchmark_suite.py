@@ -0,0 +1,298 @@
+from networksecurity.logging import logger
+from networksecurity.exception import NetworkSecurityException
+from networksecurity.constants.training_pipeline import SCHEMA_FILE_PATH, BENCHMARK_DIR_NAME
+from networksecurity.components.data_ingestion import DataIngestion
+from networksecurity.components.batch_prediction import BatchPrediction
+from networksecurity.entity.config_entity import (TrainingPipelineConfig,
+                                                  DataIngestionConfig,
+                                                  BatchPredictionConfig,
+                                                  BenchmarkConfig)
+from networksecurity.entity.artifact_entity import DataIngestionArtifact, BenchmarkArtifact
+from networksecurity.pipeline.training_pipeline import TrainingPipeline
+from networksecurity.benchmark.synthetic_data import SyntheticDataGenerator
+from networksecurity.utils.main_utils.utils import read_yaml_file, read_dataframe_in_chunks, load_object
+from networksecurity.utils.main_utils.instrumentation import record_rows
+
+import os
+import sys
+import json
+import time
+import platform
+import subprocess
+import numpy as np
+from datetime import datetime
+
+# training stages in the order they depend on each other
+PIPELINE_STAGES: list = ["data_ingestion", "data_validation", "data_transformation", "model_trainer"]
+LATENCY_PERCENTILES: tuple = (50, 95, 99)
+
+
+def get_git_commit() -> str:
+    try:
+        return subprocess.run(["git", "rev-parse", "--short", "HEAD"], cwd=os.path.dirname(os.path.abspath(__file__)),
+                              capture_output=True, text=True, check=True).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+def read_history(history_file_path: str) -> list:
+    """
+    Reads the benchmark history, one JSON result per line, oldest first.
+    """
+    try:
+        if not os.path.exists(history_file_path):
+            return []
+        with open(history_file_path) as file:
+            return [json.loads(line) for line in file if line.strip()]
+    except Exception as e:
+        raise NetworkSecurityException(f"Error reading benchmark history {history_file_path}: {e}", sys)
+
+
+def append_history(history_file_path: str, result: dict) -> None:
+    try:
+        os.makedirs(os.path.dirname(history_file_path), exist_ok=True)
+        with open(history_file_path, 'a') as file:
+            file.write(json.dumps(result, default=str) + "\n")
+    except Exception as e:
+        raise NetworkSecurityException(f"Error writing benchmark history {history_file_path}: {e}", sys)
+
+
+def find_regressions(result: dict, history: list, tolerance: float, window: int, min_history: int, min_stage_seconds: float) -> list:
+    """
+    Compares a run with the median of the last `window` runs that used the same parameters on the same host,
+    once there are at least `min_history` of them.
+    Throughput (or wall time for stages without rows), peak RSS and the latency percentiles each regress when
+    they are more than `tolerance` worse than that median. Returns one message per regressed metric.
+    """
+    comparable = [run for run in history if run["params"] == result["params"] and run["host"] == result["host"]][-window:]
+    if len(comparable) < max(min_history, 1):
+        return []
+
+    def median(values: list) -> float:
+        values = [value for value in values if value is not None]
+        return float(np.median(values)) if values else None
+
+    regressions = []
+
+    def check(name: str, value: float, baseline: float, higher_is_better: bool) -> None:
+        if value is None or baseline is None or baseline == 0:
+            return
+        change = (baseline - value) / baseline if higher_is_better else (value - baseline) / baseline
+        if change > tolerance:
+            regressions.append(f"{name}: {value:.4g} vs median {baseline:.4g} of the last {len(comparable)} runs ({change:+.0%} worse)")
+
+    for stage, metrics in result["stages"].items():
+        baselines = [run["stages"][stage] for run in comparable if stage in run["stages"]]
+        baseline_wall_time = median([baseline["wall_time"] for baseline in baselines])
+        if baseline_wall_time is None or baseline_wall_time < min_stage_seconds:
+            continue
+        if metrics["rows_per_second"] is not None:
+            check(f"{stage} rows/sec", metrics["rows_per_second"], median([baseline["rows_per_second"] for baseline in baselines]), True)
+        else:
+            check(f"{stage} wall time", metrics["wall_time"], baseline_wall_time, False)
+        check(f"{stage} peak rss", metrics["peak_rss_bytes"], median([baseline["peak_rss_bytes"] for baseline in baselines]), False)
+
+    for percentile, value in (result["latency_ms"] or {}).items():
+        check(f"{percentile} latency ms", value, median([(run["latency_ms"] or {}).get(percentile) for run in comparable]), False)
+    return regressions
+
+
+class BenchmarkSuite(TrainingPipeline):
+    """
+    Runs the pipeline stages on synthetic data of a chosen size, NaN rate and drift and tracks their throughput,
+    latency and peak memory across runs. The dataset is generated once per parameter set from the seed data and
+    read from the file or, with the "mongo" source, from a collection it is loaded into. Stage outputs are never
+    taken from the stage cache and the trained model is not published.
+    Each run is appended to the history file and checked against the recent runs with the same parameters.
+    """
+    def __init__(self, benchmark_config: BenchmarkConfig = None, training_pipeline_config: TrainingPipelineConfig = None):
+        try:
+            training_pipeline_config = training_pipeline_config or TrainingPipelineConfig(
+                timestamp=os.path.join(BENCHMARK_DIR_NAME, datetime.now().strftime("%m-%d-%Y_%H-%M-%S")))
+            # a cache hit would time the cache instead of the stage, and benchmark runs are not experiments
+            training_pipeline_config.stage_cache_enabled = False
+            training_pipeline_config.experiment_tracking_enabled = False
+            super().__init__(training_pipeline_config)
+            self.benchmark_config = benchmark_config or BenchmarkConfig(training_pipeline_config)
+            self.schema_config = read_yaml_file(SCHEMA_FILE_PATH)
+        except Exception as e:
+            raise NetworkSecurityException(e, sys)
+
+    def get_params(self) -> dict:
+        config = self.benchmark_config
+        return {
+            "n_rows": config.n_rows,
+            "nan_rate": config.nan_rate,
+            "drift": config.drift,
+            "random_seed": config.random_seed,
+            "source": config.source,
+            "file_format": config.file_format,
+            "chunk_size": config.chunk_size,
+            "stages": config.stages
+        }
+
+    def prepare_dataset(self) -> str:
+        """
+        Generates the synthetic dataset for the configured parameters, unless an earlier run already did.
+        """
+        try:
+            config = self.benchmark_config
+            # chunks are seeded by their index, so the chunk size is part of what identifies the data
+            file_name = (f"rows{config.n_rows}_nan{config.nan_rate}_drift{config.drift}_seed{config.random_seed}"
+                         f"_chunk{config.chunk_size}.{config.file_format}")
+            dataset_file_path = os.path.join(config.data_dir, file_name)
+            if not os.path.exists(dataset_file_path):
+                generator = SyntheticDataGenerator.from_file(self.schema_config, config.seed_file_path, nan_rate=config.nan_rate,
+                                                             drift=config.drift, seed=config.random_seed)
+                # generate under a temporary name, an interrupted run must not leave a truncated dataset behind
+                temporary_file_path = os.path.join(config.data_dir, "partial_" + file_name)
+                generator.write(temporary_file_path, config.n_rows, config.chunk_size)
+                os.replace(temporary_file_path, dataset_file_path)
+            return dataset_file_path
+        except Exception as e:
+            raise NetworkSecurityException(e, sys)
+
+    def load_collection(self, dataset_file_path: str, data_ingestion: DataIngestion) -> None:
+        """
+        Replaces the benchmark collection with the dataset, missing values as the "na" markers of the real collection.
+        """
+        try:
+            collection = data_ingestion.mongo_client[data_ingestion.data_ingestion_config.database_name][self.benchmark_config.collection_name]
+            collection.drop()
+            for chunk in read_dataframe_in_chunks(dataset_file_path, self.benchmark_config.chunk_size):
+                records = chunk.astype(object).where(chunk.notna(), "na").to_dict(orient="records")
+                collection.insert_many(records, ordered=False)
+                record_rows(len(records))
+        except Exception as e:
+            raise NetworkSecurityException(e, sys)
+
+    def start_benchmark_ingestion(self, dataset_file_path: str) -> DataIngestionArtifact:
+        """
+        Streams the dataset into the feature store and train/test files, through Mongo with the "mongo" source.
+        """
+        try:
+            data_ingestion_config = DataIngestionConfig(self.training_pipeline_config)
+            data_ingestion_config.streaming = True
+            data_ingestion_config.batch_size = self.benchmark_config.chunk_size
+            data_ingestion_config.collection_name = self.benchmark_config.collection_name
+            data_ingestion = DataIngestion(data_ingestion_config, artifact_writer=self.artifact_writer)
+
+            if self.benchmark_config.source == "mongo":
+                with self.instrumentation.stage("mongo_load"):
+                    self.load_collection(dataset_file_path, data_ingestion)
+
+            with self.instrumentation.stage("data_ingestion"):
+                if self.benchmark_config.source == "mongo":
+                    chunks = data_ingestion.export_data_from_mongo_in_chunks()
+                else:
+                    chunks = read_dataframe_in_chunks(dataset_file_path, self.benchmark_config.chunk_size)
+                record_rows(data_ingestion.export_chunks_into_feature_store(chunks))
+
+            return DataIngestionArtifact(
+                train_data_path=data_ingestion_config.training_file_path,
+                test_data_path=data_ingestion_config.testing_file_path
+            )
+        except Exception as e:
+            raise NetworkSecurityException(e, sys)
+
+    def start_batch_prediction(self, dataset_file_path: str, model_file_path: str) -> None:
+        try:
+            batch_prediction_config = BatchPredictionConfig(self.training_pipeline_config)
+            batch_prediction_config.input_file_path = dataset_file_path
+            batch_prediction_config.model_file_path = model_file_path
+            batch_prediction_config.output_file_path = self.benchmark_config.predictions_file_path
+            with self.instrumentation.stage("batch_prediction"):
+                batch_prediction_artifact = BatchPrediction(batch_prediction_config).initiate_batch_prediction()
+                record_rows(batch_prediction_artifact.n_rows)
+        except Exception as e:
+            raise NetworkSecurityException(e, sys)
+
+    def measure_latency(self, dataset_file_path: str, model_file_path: str) -> dict:
+        """
+        Times single-row predictions of the model on the first rows of the dataset. Returns the percentiles in ms.
+        """
+        try:
+            with self.instrumentation.stage("prediction_latency"):
+                model = load_object(model_file_path)
+                rows = next(read_dataframe_in_chunks(dataset_file_path, self.benchmark_config.latency_samples))
+                features = BatchPrediction.get_features(rows, getattr(model.preprocessor, "feature_names_in_", None))
+                latencies = []
+                for index in range(len(features)):
+                    row = features.iloc[index:index + 1]
+                    start = time.perf_counter()
+                    model.predict(row)
+                    latencies.append((time.perf_counter() - start) * 1000)
+                record_rows(len(latencies))
+            return {f"p{percentile}": float(np.percentile(latencies, percentile)) for percentile in LATENCY_PERCENTILES}
+        except Exception as e:
+            raise NetworkSecurityException(e, sys)
+
+    def run_benchmark(self) -> BenchmarkArtifact:
+        try:
+            config = self.benchmark_config
+            stages = config.stages
+            selected_pipeline_stages = [stage for stage in PIPELINE_STAGES if stage in stages]
+            if selected_pipeline_stages != PIPELINE_STAGES[:len(selected_pipeline_stages)]:
+                raise ValueError(f"Benchmark stages {stages} skip a stage that a later one depends on, expected a prefix of {PIPELINE_STAGES}")
+
+            dataset_file_path = self.prepare_dataset()
+            # without a training stage, prediction is measured with the published model
+            model_file_path = BatchPredictionConfig(self.training_pipeline_config).model_file_path
+            if "data_ingestion" in stages:
+                data_ingestion_artifact = self.start_benchmark_ingestion(dataset_file_path)
+            # stages run one at a time, so each one is measured on its own
+            if "data_validation" in stages:
+                with self.instrumentation.stage("data_validation"):
+                    data_validation_artifact = self.start_data_validation(data_ingestion_artifact)
+            if "data_transformation" in stages:
+                with self.instrumentation.stage("data_transformation"):
+                    data_transformation_artifact = self.start_data_transformation(data_validation_artifact)
+            if "model_trainer" in stages:
+                with self.instrumentation.stage("model_trainer"):
+                    model_file_path = self.start_model_trainer(data_transformation_artifact).trained_model_path
+            # the model may still be written behind
+            self.artifact_writer.wait()
+
+            if "batch_prediction" in stages:
+                self.start_batch_prediction(dataset_file_path, model_file_path)
+            latency_ms = None
+            if "prediction_latency" in stages:
+                latency_ms = self.measure_latency(dataset_file_path, model_file_path)
+
+            stage_metrics = {
+                stage.name: {
+                    "wall_time": stage.wall_time,
+                    "cpu_time": stage.cpu_time,
+                    "peak_rss_bytes": stage.peak_rss_bytes,
+                    "rows": stage.rows,
+                    "rows_per_second": stage.rows_per_second
+                }
+                for stage in self.instrumentation.stages
+            }
+            result = {
+                "timestamp": datetime.now().isoformat(timespec="seconds"),
+                "git_commit": get_git_commit(),
+                "host": {"node": platform.node(), "cpu_count": os.cpu_count(), "python": platform.python_version()},
+                "params": self.get_params(),
+                "stages": stage_metrics,
+                "latency_ms": latency_ms
+            }
+
+            regressions = find_regressions(result, read_history(config.history_file_path), config.regression_tolerance,
+                                           config.history_window, config.min_history, config.min_stage_seconds)
+            result["regressions"] = regressions
+            append_history(config.history_file_path, result)
+            for regression in regressions:
+                logger.warning(f"Benchmark regression: {regression}")
+
+            return BenchmarkArtifact(
+                run_report_file_path=self.training_pipeline_config.run_report_file_path,
+                history_file_path=config.history_file_path,
+                stage_metrics=stage_metrics,
+                latency_ms=latency_ms,
+                regressions=regressions
+            )
+        except Exception as e:
+            raise NetworkSecurityException(e, sys)
+        finally:
+            self.artifact_writer.shutdown()
@@ -0,0 +1,97 @@
+from networksecurity.exception import NetworkSecurityException
+from networksecurity.logging import logger
+from networksecurity.constants.training_pipeline import TARGET_COLUMN
+from networksecurity.utils.main_utils.utils import read_dataframe, DataFrameWriter
+
+import sys
+import numpy as np
+import pandas as pd
+from typing import Iterator
+
+# pseudo-count per allowed value, so values absent from the seed data can still be drawn
+SMOOTHING: float = 1.0
+
+
+class SyntheticDataGenerator:
+    """
+    Generates schema-conformant rows at any scale from the seed dataset.
+    Labels are drawn from the seed class balance and each feature from its distribution given the label,
+    so models trained on the synthetic data learn the same signal as on the real data.
+    `nan_rate` blanks that fraction of feature values and `drift` (0 to 1) moves every feature distribution
+    towards its mirror image, which the drift checks of data validation should pick up.
+    Chunk i is drawn from its own generator seeded with (seed, i), so output is identical for a given seed
+    regardless of chunk processing order.
+    """
+    def __init__(self, schema_config: dict, seed_data: pd.DataFrame, nan_rate: float = 0.0, drift: float = 0.0, seed: int = 42):
+        try:
+            if not 0.0 <= nan_rate < 1.0 or not 0.0 <= drift <= 1.0:
+                raise ValueError(f"nan_rate must be in [0, 1) and drift in [0, 1], got {nan_rate} and {drift}")
+            self.columns = list(schema_config['columns'])
+            self.nan_rate = nan_rate
+            self.seed = seed
+
+            allowed_values = schema_config['allowed_values']
+            target = seed_data[TARGET_COLUMN]
+            self.labels = np.array(allowed_values[TARGET_COLUMN])
+            label_counts = target.value_counts().reindex(self.labels, fill_value=0).to_numpy() + SMOOTHING
+            self.label_probabilities = label_counts / label_counts.sum()
+
+            # cumulative P(value | label) per feature, shape (labels, values)
+            self.values, self.cumulative_probabilities = {}, {}
+            for col in self.columns:
+                if col == TARGET_COLUMN:
+                    continue
+                values = np.array(allowed_values[col])
+                counts = pd.crosstab(target, seed_data[col]).reindex(index=self.labels, columns=values, fill_value=0).to_numpy()
+                probabilities = (counts + SMOOTHING) / (counts + SMOOTHING).sum(axis=1, keepdims=True)
+                probabilities = (1 - drift) * probabilities + drift * probabilities[:, ::-1]
+                self.values[col] = values
+                self.cumulative_probabilities[col] = np.cumsum(probabilities, axis=1)
+        except Exception as e:
+            raise NetworkSecurityException(e, sys)
+
+    @classmethod
+    def from_file(cls, schema_config: dict, seed_file_path: str, **kwargs) -> "SyntheticDataGenerator":
+        try:
+            return cls(schema_config, read_dataframe(seed_file_path), **kwargs)
+        except Exception as e:
+            raise NetworkSecurityException(e, sys)
+
+    def generate_chunk(self, n_rows: int, chunk_index: int = 0) -> pd.DataFrame:
+        try:
+            rng = np.random.default_rng([self.seed, chunk_index])
+            label_index = rng.choice(len(self.labels), size=n_rows, p=self.label_probabilities)
+            data = {}
+            for col in self.columns:
+                if col == TARGET_COLUMN:
+                    data[col] = self.labels[label_index].astype(np.int8)
+                    continue
+                # inverse-CDF draw against the row's label distribution
+                cumulative = self.cumulative_probabilities[col][label_index]
+                value_index = (rng.random(n_rows)[:, None] > cumulative[:, :-1]).sum(axis=1)
+                values = self.values[col][value_index].astype(np.int8)
+                if self.nan_rate:
+                    values = pd.arrays.IntegerArray(values, rng.random(n_rows) < self.nan_rate)
+                data[col] = values
+            return pd.DataFrame(data, columns=self.columns)
+        except Exception as e:
+            raise NetworkSecurityException(e, sys)
+
+    def generate(self, n_rows: int, chunk_size: int) -> Iterator[pd.DataFrame]:
+        for chunk_index, start in enumerate(range(0, n_rows, chunk_size)):
+            yield self.generate_chunk(min(chunk_size, n_rows - start), chunk_index)
+
+    def write(self, file_path: str, n_rows: int, chunk_size: int) -> int:
+        """
+        Streams `n_rows` synthetic rows into a csv or parquet file chunk by chunk. Returns the rows written.
+        """
+        try:
+            total_rows = 0
+            with DataFrameWriter(file_path) as writer:
+                for chunk in self.generate(n_rows, chunk_size):
+                    writer.write(chunk)
+                    total_rows += len(chunk)
+            logger.info(f"Generated {total_rows} synthetic rows (nan rate {self.nan_rate}) into {file_path}")
+            return total_rows
+        except Exception as e:
+            raise NetworkSecurityException(e, sys)
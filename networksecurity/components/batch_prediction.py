@@ -0,0 +1,148 @@
+from networksecurity.logging import logger
+from networksecurity.exception import NetworkSecurityException
+from networksecurity.constants.training_pipeline import TARGET_COLUMN
+from networksecurity.entity.config_entity import BatchPredictionConfig, MongoDBClientConfig
+from networksecurity.entity.artifact_entity import BatchPredictionArtifact
+from networksecurity.utils.main_utils.utils import load_object, read_dataframe_in_chunks, DataFrameWriter
+from networksecurity.configuration.mongo_db_connection import get_mongo_client
+
+import sys
+import time
+import numpy as np
+import pandas as pd
+from collections import deque
+from typing import Iterator
+from concurrent.futures import ProcessPoolExecutor
+from joblib import effective_n_jobs
+
+# chunks in flight per worker, enough to keep every worker busy while bounding memory
+PENDING_CHUNKS_PER_WORKER: int = 2
+
+# model of this worker process, loaded once by the pool initializer
+_worker_model = None
+
+
+def _load_worker_model(model_file_path: str) -> None:
+    global _worker_model
+    _worker_model = load_object(model_file_path)
+
+
+def _predict_chunk(features: pd.DataFrame) -> np.ndarray:
+    return _worker_model.predict(features)
+
+
+class BatchPrediction:
+    """
+    Scores a csv/parquet file or a Mongo collection with the saved NetworkModel.
+    The input is streamed in chunks that a pool of worker processes, each holding its own copy of the model,
+    transforms and predicts. Predictions are written out chunk by chunk in input order, so memory is bounded
+    by the number of chunks in flight rather than the size of the input.
+    """
+    def __init__(self, batch_prediction_config: BatchPredictionConfig):
+        try:
+            self.batch_prediction_config = batch_prediction_config
+            self.mongo_client = None
+            if batch_prediction_config.input_collection_name or batch_prediction_config.output_collection_name:
+                mongo_db_client_config = MongoDBClientConfig()
+                if batch_prediction_config.read_preference:
+                    mongo_db_client_config.read_preference = batch_prediction_config.read_preference
+                self.mongo_client = get_mongo_client(mongo_db_client_config)
+        except Exception as e:
+            raise NetworkSecurityException(e, sys)
+
+    def read_collection_in_chunks(self) -> Iterator[pd.DataFrame]:
+        """
+        Streams the input collection as numeric DataFrame chunks, "na" markers become NaN.
+        """
+        try:
+            chunk_size = self.batch_prediction_config.chunk_size
+            collection = self.mongo_client[self.batch_prediction_config.database_name][self.batch_prediction_config.input_collection_name]
+            records = []
+            projection = {"_id": 0, self.batch_prediction_config.row_hash_field: 0}
+            for document in collection.find({}, projection=projection, batch_size=chunk_size):
+                records.append(document)
+                if len(records) >= chunk_size:
+                    yield pd.DataFrame.from_records(records).replace({"na": np.nan}).apply(pd.to_numeric)
+                    records = []
+            if records:
+                yield pd.DataFrame.from_records(records).replace({"na": np.nan}).apply(pd.to_numeric)
+        except Exception as e:
+            raise NetworkSecurityException(e, sys)
+
+    def iter_input_chunks(self) -> Iterator[pd.DataFrame]:
+        if self.batch_prediction_config.input_collection_name:
+            return self.read_collection_in_chunks()
+        return read_dataframe_in_chunks(self.batch_prediction_config.input_file_path, self.batch_prediction_config.chunk_size)
+
+    @staticmethod
+    def get_features(chunk: pd.DataFrame, feature_names) -> pd.DataFrame:
+        """
+        Selects the model's input columns in training order, dropping the target when the input has one.
+        """
+        if feature_names is not None:
+            return chunk[list(feature_names)]
+        return chunk.drop(columns=[TARGET_COLUMN], errors="ignore")
+
+    def score_chunks(self, chunks: Iterator[pd.DataFrame], model) -> Iterator[tuple]:
+        """
+        Yields (chunk, predictions) in input order, scoring up to PENDING_CHUNKS_PER_WORKER chunks per worker at once.
+        """
+        feature_names = getattr(model.preprocessor, "feature_names_in_", None)
+        n_workers = effective_n_jobs(self.batch_prediction_config.n_workers)
+        if n_workers == 1:
+            for chunk in chunks:
+                yield chunk, model.predict(self.get_features(chunk, feature_names))
+            return
+
+        with ProcessPoolExecutor(max_workers=n_workers, initializer=_load_worker_model,
+                                 initargs=(self.batch_prediction_config.model_file_path,)) as executor:
+            pending = deque()
+            for chunk in chunks:
+                pending.append((chunk, executor.submit(_predict_chunk, self.get_features(chunk, feature_names))))
+                if len(pending) >= n_workers * PENDING_CHUNKS_PER_WORKER:
+                    chunk, future = pending.popleft()
+                    yield chunk, future.result()
+            while pending:
+                chunk, future = pending.popleft()
+                yield chunk, future.result()
+
+    def initiate_batch_prediction(self) -> BatchPredictionArtifact:
+        try:
+            config = self.batch_prediction_config
+            model = load_object(config.model_file_path)
+
+            output_collection = None
+            writer = None
+            if config.output_collection_name:
+                output_collection = self.mongo_client[config.database_name][config.output_collection_name]
+            else:
+                writer = DataFrameWriter(config.output_file_path)
+
+            start = time.perf_counter()
+            n_rows = 0
+            try:
+                for chunk, predictions in self.score_chunks(self.iter_input_chunks(), model):
+                    chunk = chunk.assign(**{config.prediction_column: predictions})
+                    if output_collection is not None:
+                        # unordered inserts let the server apply the batch in parallel
+                        output_collection.insert_many(chunk.to_dict(orient="records"), ordered=False)
+                    else:
+                        writer.write(chunk)
+                    n_rows += len(chunk)
+                    logger.info(f"Scored {n_rows} rows")
+            finally:
+                if writer is not None:
+                    writer.close()
+
+            elapsed = time.perf_counter() - start
+            rows_per_second = n_rows / elapsed if elapsed > 0 else 0.0
+            logger.info(f"Batch prediction scored {n_rows} rows in {elapsed:.1f}s ({rows_per_second:.0f} rows/sec)")
+
+            return BatchPredictionArtifact(
+                output_file_path=None if output_collection is not None else config.output_file_path,
+                output_collection_name=config.output_collection_name,
+                n_rows=n_rows,
+                rows_per_second=rows_per_second
+            )
+        except Exception as e:
+            raise NetworkSecurityException(e, sys)
@@ -2,25 +2,30 @@ from networksecurity.logging import logger
 from networksecurity.exception import NetworkSecurityException
 from networksecurity.entity.config_entity import DataIngestionConfig
 from networksecurity.entity.artifact_entity import DataIngestionArtifact
+from networksecurity.utils.main_utils.utils import read_yaml_file, write_yaml_file, write_dataframe, read_dataframe_in_chunks, DataFrameWriter, ArtifactWriter
+from networksecurity.utils.main_utils.instrumentation import record_rows
+from networksecurity.configuration.mongo_db_connection import get_mongo_client
 
 import os
 import sys
+import shutil
 import pymongo
 import numpy as np
 import pandas as pd
-from typing import List
+from typing import Iterator, List
+from datetime import datetime, timedelta
+from bson import ObjectId
 from sklearn.model_selection import train_test_split
 
-from dotenv import load_dotenv
-load_dotenv()
-
-MONGO_DB_URI = os.getenv("MONGO_DB_URI")
-
 class DataIngestion:
-    def __init__(self, data_ingestion_config: DataIngestionConfig):
+    def __init__(self, data_ingestion_config: DataIngestionConfig, artifact_writer: ArtifactWriter = None):
         try:
             self.data_ingestion_config = data_ingestion_config
-            self.mongo_client = pymongo.MongoClient(MONGO_DB_URI)
+            self.artifact_writer = artifact_writer or ArtifactWriter()
+            self.mongo_client = get_mongo_client()
+            self.last_exported_id = None
+            # ObjectIds exported by the incremental export, one array of 12-byte ids per batch
+            self.exported_ids = []
             
         except Exception as e:
             raise NetworkSecurityException(e, sys)
@@ -35,7 +40,8 @@ class DataIngestion:
             collection_name = self.data_ingestion_config.collection_name
             collection = self.mongo_client[database_name][collection_name]
 
-            data = pd.DataFrame(list(collection.find()))
+            # the row hash written by push_data.py in upsert mode is not a feature
+            data = pd.DataFrame(list(collection.find({}, projection={self.data_ingestion_config.row_hash_field: 0})))
             
             #if not data:
                 #raise NetworkSecurityException("No data found in the MongoDB collection", sys)
@@ -44,21 +50,82 @@ class DataIngestion:
                 data.drop(columns=["_id"], inplace=True)
             
             data.replace({"na":np.nan}, inplace=True)
+            # columns that held "na" markers are object dtype, give them back their numeric dtype
+            data = data.infer_objects()
             
             logger.info(f"Data exported from MongoDB collection: {self.data_ingestion_config.collection_name}")
             return data
         except Exception as e:
             raise NetworkSecurityException(e, sys)
         
+    def to_typed_chunk(self, records: List[dict], columns: List[str] = None) -> pd.DataFrame:
+        """
+        Convert a batch of MongoDB documents into a typed DataFrame chunk.
+        "na" markers become NaN and the columns are cast to the configured chunk dtype.
+        """
+        try:
+            chunk = pd.DataFrame.from_records(records, columns=columns)
+            chunk = chunk.replace({"na": np.nan})
+            chunk = chunk.apply(pd.to_numeric).astype(self.data_ingestion_config.chunk_dtype)
+            return chunk
+        except Exception as e:
+            raise NetworkSecurityException(e, sys)
+        
+    def export_data_from_mongo_in_chunks(self, after_id: ObjectId = None, skip_ids: set = None) -> Iterator[pd.DataFrame]:
+        """
+        Stream the MongoDB collection as typed DataFrame chunks.
+        The cursor is read in batches of `batch_size` documents with `_id` projected out on the server,
+        so only one batch is held in memory at a time. When `after_id` is given only documents inserted
+        after it are read, in `_id` order, and `last_exported_id` tracks the newest `_id` read. Documents whose
+        `_id` (as 12 bytes) is in `skip_ids` are left out, the others are recorded in `exported_ids`.
+        """
+        try:
+            database_name = self.data_ingestion_config.database_name
+            collection_name = self.data_ingestion_config.collection_name
+            batch_size = self.data_ingestion_config.batch_size
+            row_hash_field = self.data_ingestion_config.row_hash_field
+            collection = self.mongo_client[database_name][collection_name]
+            
+            if after_id is None and not self.data_ingestion_config.incremental:
+                cursor = collection.find({}, projection={"_id": 0, row_hash_field: 0}, batch_size=batch_size)
+            else:
+                query = {"_id": {"$gt": after_id}} if after_id is not None else {}
+                cursor = collection.find(query, projection={row_hash_field: 0}, batch_size=batch_size).sort("_id", pymongo.ASCENDING)
+            
+            columns = None
+            records, ids = [], []
+            for document in cursor:
+                document_id = document.pop("_id", None)
+                if document_id is not None:
+                    self.last_exported_id = document_id
+                    if skip_ids and document_id.binary in skip_ids:
+                        continue
+                    ids.append(document_id.binary)
+                records.append(document)
+                if len(records) >= batch_size:
+                    chunk = self.to_typed_chunk(records, columns)
+                    columns = chunk.columns.tolist()
+                    self.exported_ids.append(np.array(ids, dtype="S12"))
+                    records, ids = [], []
+                    yield chunk
+                    
+            if records:
+                self.exported_ids.append(np.array(ids, dtype="S12"))
+                yield self.to_typed_chunk(records, columns)
+                
+            logger.info(f"Data streamed from MongoDB collection: {collection_name} in batches of {batch_size}")
+        except Exception as e:
+            raise NetworkSecurityException(e, sys)
+        
     def export_data_into_feature_store(self, data: pd.DataFrame):
         """
         Export the DataFrame into the feature store directory.
-        This method saves the DataFrame to a CSV file in the feature store directory.
+        This method saves the DataFrame to a CSV or Parquet file in the feature store directory.
         """
         try:
             feature_store_dir = self.data_ingestion_config.feature_store_dir
             os.makedirs(os.path.dirname(feature_store_dir), exist_ok=True)
-            data.to_csv(feature_store_dir, index=False, header=True)
+            self.artifact_writer.submit(write_dataframe, feature_store_dir, data)
             
             logger.info(f"Data exported into feature store at: {feature_store_dir}")
             return data
@@ -76,21 +143,243 @@ class DataIngestion:
             os.makedirs(os.path.dirname(self.data_ingestion_config.training_file_path), exist_ok=True)
             os.makedirs(os.path.dirname(self.data_ingestion_config.testing_file_path), exist_ok=True)
             
-            train_set.to_csv(self.data_ingestion_config.training_file_path, index=False, header=True)
-            test_set.to_csv(self.data_ingestion_config.testing_file_path, index=False, header=True)
+            self.artifact_writer.submit(write_dataframe, self.data_ingestion_config.training_file_path, train_set)
+            self.artifact_writer.submit(write_dataframe, self.data_ingestion_config.testing_file_path, test_set)
             
             logger.info(f"Data split into train and test sets. Train set saved at: {self.data_ingestion_config.training_file_path}, Test set saved at: {self.data_ingestion_config.testing_file_path}")
+            return train_set, test_set
+        except Exception as e:
+            raise NetworkSecurityException(e, sys)
+        
+    def export_chunks_into_feature_store(self, chunks: Iterator[pd.DataFrame], feature_store_file_path: str = None,
+                                         training_file_path: str = None, testing_file_path: str = None,
+                                         append: bool = False) -> int:
+        """
+        Write streamed chunks into the feature store and split each one into the train and test files.
+        Every chunk is split with the same seeded generator, so the split is reproducible and memory
+        stays bounded by the batch size. With `append` the chunks are added to existing files.
+        Returns the number of rows written.
+        """
+        try:
+            feature_store_file_path = feature_store_file_path or self.data_ingestion_config.feature_store_dir
+            training_file_path = training_file_path or self.data_ingestion_config.training_file_path
+            testing_file_path = testing_file_path or self.data_ingestion_config.testing_file_path
+            
+            random_state = np.random.RandomState(42)
+            total_rows = 0
+            with DataFrameWriter(feature_store_file_path, append=append) as feature_store_writer, \
+                 DataFrameWriter(training_file_path, append=append) as train_writer, \
+                 DataFrameWriter(testing_file_path, append=append) as test_writer:
+                for chunk in chunks:
+                    if len(chunk) > 1:
+                        train_set, test_set = train_test_split(chunk, test_size=self.data_ingestion_config.train_test_split_ratio, random_state=random_state)
+                    else:
+                        train_set, test_set = chunk, chunk.iloc[0:0]
+                    
+                    feature_store_writer.write(chunk)
+                    train_writer.write(train_set)
+                    test_writer.write(test_set)
+                    total_rows += len(chunk)
+            
+            logger.info(f"Streamed {total_rows} rows into feature store at: {feature_store_file_path}, Train set saved at: {training_file_path}, Test set saved at: {testing_file_path}")
+            return total_rows
+        except Exception as e:
+            raise NetworkSecurityException(e, sys)
+        
+    def read_checkpoint(self) -> dict:
+        """
+        Read the incremental ingestion checkpoint, an empty dict when no run has completed yet.
+        """
+        try:
+            checkpoint_file_path = self.data_ingestion_config.checkpoint_file_path
+            if not os.path.exists(checkpoint_file_path):
+                return {}
+            return read_yaml_file(checkpoint_file_path) or {}
+        except Exception as e:
+            raise NetworkSecurityException(e, sys)
+        
+    def write_checkpoint(self, last_object_id: ObjectId, total_rows: int, parts: List[str]) -> None:
+        """
+        Persist the high-water mark of the cumulative feature store and the parts it is made of.
+        The file is replaced atomically, a crash leaves either the old or the new checkpoint.
+        """
+        try:
+            checkpoint = {
+                "last_object_id": str(last_object_id) if last_object_id is not None else None,
+                "total_rows": int(total_rows),
+                "parts": list(parts),
+                "updated_at": datetime.now().isoformat()
+            }
+            checkpoint_file_path = self.data_ingestion_config.checkpoint_file_path
+            write_yaml_file(checkpoint_file_path + ".tmp", checkpoint, replace=True)
+            os.replace(checkpoint_file_path + ".tmp", checkpoint_file_path)
+        except Exception as e:
+            raise NetworkSecurityException(e, sys)
+        
+    def get_part_file_paths(self, part_dir: str) -> tuple:
+        """
+        Feature store, train and test file paths of a cumulative store part.
+        """
+        return tuple(os.path.join(part_dir, os.path.basename(file_path)) for file_path in (
+            self.data_ingestion_config.cumulative_feature_store_file_path,
+            self.data_ingestion_config.cumulative_training_file_path,
+            self.data_ingestion_config.cumulative_testing_file_path))
+        
+    def get_ingested_ids_since(self, parts: List[str], since_id: ObjectId) -> set:
+        """
+        The ObjectIds (as 12 bytes) from `since_id` on that the committed parts already hold, read from the
+        newest part backwards until a part ends before `since_id`.
+        """
+        try:
+            ingested_ids = set()
+            for part in reversed(parts):
+                object_ids_file_path = os.path.join(self.data_ingestion_config.cumulative_parts_dir, part,
+                                                    self.data_ingestion_config.part_object_ids_file_name)
+                if not os.path.exists(object_ids_file_path):
+                    logger.warning(f"Cumulative store part {part} has no ObjectIds, documents before it cannot be de-duplicated")
+                    break
+                ids = np.load(object_ids_file_path)
+                # ObjectIds start with their big-endian timestamp, byte order is time order
+                recent_ids = ids[ids >= np.array(since_id.binary, dtype="S12")]
+                # numpy drops trailing zero bytes of fixed-size byte strings
+                ingested_ids.update(bytes(object_id).ljust(12, b"\0") for object_id in recent_ids)
+                if len(recent_ids) < len(ids):
+                    break
+            return ingested_ids
+        except Exception as e:
+            raise NetworkSecurityException(e, sys)
+        
+    def get_committed_parts(self, checkpoint: dict) -> List[str]:
+        """
+        The parts the checkpoint records. Part directories it does not record are left over from an interrupted
+        run and are removed, their rows are fetched again. A store written as single files by an earlier
+        version becomes the first part.
+        """
+        try:
+            parts_dir = self.data_ingestion_config.cumulative_parts_dir
+            parts = checkpoint.get("parts")
+            if parts is None:
+                parts = []
+                legacy_file_paths = (self.data_ingestion_config.cumulative_feature_store_file_path,
+                                     self.data_ingestion_config.cumulative_training_file_path,
+                                     self.data_ingestion_config.cumulative_testing_file_path)
+                if checkpoint and os.path.exists(self.data_ingestion_config.cumulative_training_file_path):
+                    legacy_dir = os.path.join(parts_dir, "legacy")
+                    os.makedirs(legacy_dir, exist_ok=True)
+                    for source, destination in zip(legacy_file_paths, self.get_part_file_paths(legacy_dir)):
+                        if os.path.exists(source):
+                            os.replace(source, destination)
+                    parts = ["legacy"]
+                    self.write_checkpoint(checkpoint.get("last_object_id"), checkpoint.get("total_rows", 0), parts)
+            
+            if os.path.isdir(parts_dir):
+                for name in os.listdir(parts_dir):
+                    if name not in parts:
+                        logger.info(f"Removing uncommitted cumulative store part {name}")
+                        shutil.rmtree(os.path.join(parts_dir, name), ignore_errors=True)
+            return parts
+        except Exception as e:
+            raise NetworkSecurityException(e, sys)
+        
+    def ingest_incrementally(self) -> int:
+        """
+        Fetch only the documents inserted after the checkpointed ObjectId and write them as a new part of the
+        cumulative feature store, so the MongoDB read and the store update cost the size of the new data and the
+        parts already stored are never rewritten. The snapshot the run then trains on is O(total), see
+        snapshot_cumulative_store.
+        Documents committed late with an older ObjectId are caught by reading the safety window below the
+        checkpoint again and skipping the ids already ingested.
+        The part is staged in a temporary directory, renamed into place once complete and only then recorded
+        in the checkpoint, so an interrupted run leaves the store unchanged and is fetched again by the next one.
+        Returns the number of new rows.
+        """
+        try:
+            checkpoint = self.read_checkpoint()
+            parts = self.get_committed_parts(checkpoint)
+            last_object_id = checkpoint.get("last_object_id")
+            total_rows = checkpoint.get("total_rows", 0)
+            after_id, skip_ids = None, None
+            if last_object_id:
+                high_water_mark = ObjectId(last_object_id)
+                window = timedelta(seconds=self.data_ingestion_config.checkpoint_safety_window_seconds)
+                after_id = ObjectId.from_datetime(high_water_mark.generation_time - window)
+                skip_ids = self.get_ingested_ids_since(parts, after_id)
+            
+            part_id = datetime.now().strftime("%Y%m%d%H%M%S%f")
+            part_dir = os.path.join(self.data_ingestion_config.cumulative_parts_dir, part_id)
+            staging_dir = part_dir + ".tmp"
+            feature_store_file_path, training_file_path, testing_file_path = self.get_part_file_paths(staging_dir)
+            
+            self.last_exported_id, self.exported_ids = None, []
+            new_rows = self.export_chunks_into_feature_store(
+                self.export_data_from_mongo_in_chunks(after_id=after_id, skip_ids=skip_ids),
+                feature_store_file_path=feature_store_file_path,
+                training_file_path=training_file_path,
+                testing_file_path=testing_file_path
+            )
+            if new_rows == 0:
+                shutil.rmtree(staging_dir, ignore_errors=True)
+                logger.info(f"Incremental ingestion found no new rows, cumulative feature store holds {total_rows} rows")
+                return 0
+            
+            np.save(os.path.join(staging_dir, self.data_ingestion_config.part_object_ids_file_name), np.concatenate(self.exported_ids))
+            os.replace(staging_dir, part_dir)
+            total_rows += new_rows
+            # the high-water mark never moves back, a window that only held late documents ends below it
+            last_exported_id = max(self.last_exported_id, high_water_mark) if last_object_id else self.last_exported_id
+            self.write_checkpoint(last_exported_id, total_rows, parts + [part_id])
+            logger.info(f"Incremental ingestion added {new_rows} new rows as part {part_id}, cumulative feature store holds {total_rows} rows")
+            return new_rows
+        except Exception as e:
+            raise NetworkSecurityException(e, sys)
+        
+    def snapshot_cumulative_store(self) -> None:
+        """
+        Concatenate the train/test files of every committed part into this run's ingested directory.
+        This reads and writes every stored row on each run, so it grows with the whole store, as the validation
+        and training that read the snapshot do.
+        """
+        try:
+            parts = self.read_checkpoint().get("parts") or []
+            if not parts:
+                raise ValueError("No data found in the MongoDB collection")
+            
+            part_file_paths = [self.get_part_file_paths(os.path.join(self.data_ingestion_config.cumulative_parts_dir, part))
+                               for part in parts]
+            for index, file_path in ((1, self.data_ingestion_config.training_file_path), (2, self.data_ingestion_config.testing_file_path)):
+                with DataFrameWriter(file_path) as writer:
+                    for paths in part_file_paths:
+                        # a part whose rows all went to the other split has no file for this one
+                        if os.path.exists(paths[index]):
+                            for chunk in read_dataframe_in_chunks(paths[index], self.data_ingestion_config.batch_size):
+                                writer.write(chunk)
         except Exception as e:
             raise NetworkSecurityException(e, sys)
         
     def initiate_data_ingestion(self):
         try:
-            dataframe = self.export_data_from_mongo()
-            dataframe = self.export_data_into_feature_store(dataframe)
-            self.split_data_as_train_test(dataframe)
+            train_set, test_set = None, None
+            if self.data_ingestion_config.incremental:
+                record_rows(self.ingest_incrementally())
+                self.snapshot_cumulative_store()
+            elif self.data_ingestion_config.streaming:
+                chunks = self.export_data_from_mongo_in_chunks()
+                total_rows = self.export_chunks_into_feature_store(chunks)
+                if total_rows == 0:
+                    raise ValueError("No data found in the MongoDB collection")
+                record_rows(total_rows)
+            else:
+                dataframe = self.export_data_from_mongo()
+                dataframe = self.export_data_into_feature_store(dataframe)
+                record_rows(len(dataframe))
+                train_set, test_set = self.split_data_as_train_test(dataframe)
+            
+            keep_in_memory = self.data_ingestion_config.keep_in_memory
             data_ingestion_artifact = DataIngestionArtifact(
                 train_data_path=self.data_ingestion_config.training_file_path,
-                test_data_path=self.data_ingestion_config.testing_file_path
+                test_data_path=self.data_ingestion_config.testing_file_path,
+                train_data=train_set if keep_in_memory else None,
+                test_data=test_set if keep_in_memory else None
             )
             
             logger.info(f"Data ingestion artifact created: {data_ingestion_artifact}")
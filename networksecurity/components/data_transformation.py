@@ -2,7 +2,7 @@ import sys
 import os
 import numpy as np
 import pandas as pd
-from sklearn.impute import KNNImputer
+from concurrent.futures import ThreadPoolExecutor
 from sklearn.pipeline import Pipeline
 
 from networksecurity.constants.training_pipeline import TARGET_COLUMN, DATA_TRANSFORMATION_IMPUTER_PARAMS
@@ -10,27 +10,37 @@ from networksecurity.entity.artifact_entity import (DataValidationArtifact, Data
 from networksecurity.entity.config_entity import DataTransformationConfig
 from networksecurity.exception import NetworkSecurityException
 from networksecurity.logging import logger
-from networksecurity.utils.main_utils.utils import save_numpy_array,save_object
+from networksecurity.utils.main_utils import utils
+from networksecurity.utils.main_utils.utils import save_numpy_array,save_object,load_numpy_array,load_object,read_dataframe,compact_array,ArtifactWriter
+from networksecurity.utils.main_utils.stage_cache import StageCache
+from networksecurity.utils.main_utils.instrumentation import record_rows
+from networksecurity.utils.ml_utils.preprocessing import imputer as imputer_module
+from networksecurity.utils.ml_utils.preprocessing.imputer import get_imputer, count_missing_values, impute_missing_rows
+
+STAGE_NAME: str = "data_transformation"
 
 class DataTransformation:
     def __init__(self, data_validation_artifact: DataValidationArtifact,
-                 data_transformation_config: DataTransformationConfig):
+                 data_transformation_config: DataTransformationConfig,
+                 artifact_writer: ArtifactWriter = None, stage_cache: StageCache = None):
         try:
             self.data_validation_artifact = data_validation_artifact
             self.data_transformation_config = data_transformation_config
+            self.artifact_writer = artifact_writer or ArtifactWriter()
+            self.stage_cache = stage_cache
         except Exception as e:
             raise NetworkSecurityException(e, sys) from e
     
     @staticmethod
     def read_data(file_path: str) -> pd.DataFrame:
         try:
-            return pd.read_csv(file_path)
+            return read_dataframe(file_path)
         except Exception as e:
             raise NetworkSecurityException(e, sys) from e
         
     def get_data_transformation_object(self) -> Pipeline:
         try:
-            imputer: KNNImputer = KNNImputer(**DATA_TRANSFORMATION_IMPUTER_PARAMS)
+            imputer = get_imputer(DATA_TRANSFORMATION_IMPUTER_PARAMS)
             processor: Pipeline = Pipeline(steps=[
                 ('imputer', imputer)
             ])
@@ -38,42 +48,118 @@ class DataTransformation:
         except Exception as e:
             raise NetworkSecurityException(e, sys) from e
         
+    def get_cache_key(self) -> str:
+        """
+        Hashes the validated data, imputer params and the transformation code (this module, the imputer and the
+        file readers) into the stage cache key.
+        """
+        try:
+            train_source = self.data_validation_artifact.train_data
+            test_source = self.data_validation_artifact.test_data
+            if train_source is None or test_source is None:
+                train_source = self.data_validation_artifact.valid_train_file_path
+                test_source = self.data_validation_artifact.valid_test_file_path
+            return StageCache.fingerprint(train_source, test_source, TARGET_COLUMN, DATA_TRANSFORMATION_IMPUTER_PARAMS,
+                                          self.data_transformation_config.compact_arrays, __file__, imputer_module.__file__, utils.__file__)
+        except Exception as e:
+            raise NetworkSecurityException(e, sys) from e
+        
+    def load_from_cache(self, entry: dict) -> DataTransformationArtifact:
+        """
+        Restores the transformed arrays and preprocessor of a cached run into this run's artifact dir.
+        """
+        try:
+            StageCache.restore(entry, {
+                "train": self.data_transformation_config.transformed_train_file_path,
+                "test": self.data_transformation_config.transformed_test_file_path,
+                "preprocessor": self.data_transformation_config.transformed_object_file_path
+            })
+            
+            keep_in_memory = self.data_transformation_config.keep_in_memory
+            return DataTransformationArtifact(
+                transformed_train_file_path=self.data_transformation_config.transformed_train_file_path,
+                transformed_test_file_path=self.data_transformation_config.transformed_test_file_path,
+                transformed_object_file_path=self.data_transformation_config.transformed_object_file_path,
+                train_array=load_numpy_array(entry["files"]["train"]) if keep_in_memory else None,
+                test_array=load_numpy_array(entry["files"]["test"]) if keep_in_memory else None,
+                preprocessor=load_object(entry["files"]["preprocessor"]) if keep_in_memory else None
+            )
+        except Exception as e:
+            raise NetworkSecurityException(e, sys) from e
+        
     def initiate_data_transformation(self) -> DataTransformationArtifact:
         try:
             logger.info("Starting data transformation process.")
-            train_df = DataTransformation.read_data(self.data_validation_artifact.valid_train_file_path)
-            test_df = DataTransformation.read_data(self.data_validation_artifact.valid_test_file_path)
+            cache_key = None
+            if self.stage_cache is not None:
+                cache_key = self.get_cache_key()
+                entry = self.stage_cache.get(STAGE_NAME, cache_key)
+                if entry is not None:
+                    logger.info("Reusing cached data transformation output.")
+                    return self.load_from_cache(entry)
+            
+            train_df = self.data_validation_artifact.train_data
+            test_df = self.data_validation_artifact.test_data
+            if train_df is None or test_df is None:
+                train_df = DataTransformation.read_data(self.data_validation_artifact.valid_train_file_path)
+                test_df = DataTransformation.read_data(self.data_validation_artifact.valid_test_file_path)
+            record_rows(len(train_df) + len(test_df))
             
             # train dataframe
-            input_features_train_df = train_df.drop(columns=[TARGET_COLUMN], axis=1)
+            input_features_train_df = train_df.drop(columns=[TARGET_COLUMN])
             target_feature_train_df = train_df[TARGET_COLUMN]
             target_feature_train_df = target_feature_train_df.replace(-1, 0)
             
             # test dataframe
-            input_features_test_df = test_df.drop(columns=[TARGET_COLUMN], axis=1)
+            input_features_test_df = test_df.drop(columns=[TARGET_COLUMN])
             target_feature_test_df = test_df[TARGET_COLUMN]
             target_feature_test_df = target_feature_test_df.replace(-1, 0)
             
             # get transformation object
             transformation_object: Pipeline = self.get_data_transformation_object()
             
+            train_null_counts = count_missing_values(input_features_train_df)
+            test_null_counts = count_missing_values(input_features_test_df)
+            logger.info(f"Missing values: {sum(train_null_counts.values())} in train, {sum(test_null_counts.values())} in test")
+            
+            # only the rows with a missing value go through the neighbour search
             preprocessor_object: Pipeline = transformation_object.fit(input_features_train_df)
-            transformed_input_features_train = preprocessor_object.transform(input_features_train_df)
-            transformed_input_features_test = preprocessor_object.transform(input_features_test_df)
+            # the test set is imputed alongside the training set, the neighbour searches release the GIL
+            with ThreadPoolExecutor(max_workers=1) as executor:
+                test_future = executor.submit(impute_missing_rows, preprocessor_object, input_features_test_df)
+                transformed_input_features_train = impute_missing_rows(preprocessor_object, input_features_train_df)
+                transformed_input_features_test = test_future.result()
             
             train_arr = np.c_[transformed_input_features_train, np.array(target_feature_train_df)]
             test_arr = np.c_[transformed_input_features_test, np.array(target_feature_test_df)]
+            if self.data_transformation_config.compact_arrays:
+                train_arr = compact_array(train_arr)
+                test_arr = compact_array(test_arr)
             
             # save transformed data
-            save_numpy_array(file_path=self.data_transformation_config.transformed_train_file_path,array=train_arr)
-            save_numpy_array(file_path=self.data_transformation_config.transformed_test_file_path,array=test_arr)
-            save_object(file_path=self.data_transformation_config.transformed_object_file_path, obj=preprocessor_object)
+            writes = [
+                self.artifact_writer.submit(save_numpy_array, file_path=self.data_transformation_config.transformed_train_file_path,array=train_arr),
+                self.artifact_writer.submit(save_numpy_array, file_path=self.data_transformation_config.transformed_test_file_path,array=test_arr),
+                self.artifact_writer.submit(save_object, file_path=self.data_transformation_config.transformed_object_file_path, obj=preprocessor_object)
+            ]
+            if self.stage_cache is not None:
+                self.artifact_writer.submit_after(writes, self.stage_cache.put, STAGE_NAME, cache_key, {
+                    "train": self.data_transformation_config.transformed_train_file_path,
+                    "test": self.data_transformation_config.transformed_test_file_path,
+                    "preprocessor": self.data_transformation_config.transformed_object_file_path
+                })
             
             # create and return artifact
+            keep_in_memory = self.data_transformation_config.keep_in_memory
             data_transformation_artifact = DataTransformationArtifact(
                 transformed_train_file_path=self.data_transformation_config.transformed_train_file_path,
                 transformed_test_file_path=self.data_transformation_config.transformed_test_file_path,
-                transformed_object_file_path=self.data_transformation_config.transformed_object_file_path
+                transformed_object_file_path=self.data_transformation_config.transformed_object_file_path,
+                train_array=train_arr if keep_in_memory else None,
+                test_array=test_arr if keep_in_memory else None,
+                preprocessor=preprocessor_object if keep_in_memory else None,
+                train_null_counts=train_null_counts,
+                test_null_counts=test_null_counts
             )
             
             return data_transformation_artifact
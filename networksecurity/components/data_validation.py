@@ -1,18 +1,26 @@
-from networksecurity.entity.artifact_entity import DataIngestionArtifact, DataValidationArtifact
+from networksecurity.entity.artifact_entity import DataIngestionArtifact, DatasetValidationArtifact, DataValidationArtifact
 from networksecurity.entity.config_entity import DataValidationConfig, TrainingPipelineConfig
-from networksecurity.constants.training_pipeline import SCHEMA_FILE_PATH
+from networksecurity.constants.training_pipeline import SCHEMA_FILE_PATH, TARGET_COLUMN
 from networksecurity.logging import logger
 from networksecurity.exception import NetworkSecurityException
-from networksecurity.utils.main_utils.utils import read_yaml_file, write_yaml_file
-from scipy.stats import ks_2samp
+from networksecurity.utils.main_utils.utils import (read_yaml_file, write_yaml_file, read_dataframe, read_dataframe_in_chunks,
+                                                    write_dataframe, DataFrameWriter, ArtifactWriter)
+from networksecurity.utils.main_utils.instrumentation import record_rows
+from networksecurity.utils.ml_utils.metric.drift_metric import build_profile, merge_profiles, get_profile_drift_report
+import numpy as np
 import pandas as pd
 import sys
 import os
 
+# column added to quarantined rows, naming the first check they failed
+VALIDATION_ERROR_COLUMN: str = "validation_error"
+
 class DataValidation:
-    def __init__(self, data_validation_config: DataValidationConfig, training_pipeline_config: TrainingPipelineConfig):
+    def __init__(self, data_validation_config: DataValidationConfig, training_pipeline_config: TrainingPipelineConfig,
+                 artifact_writer: ArtifactWriter = None):
         try:
             self.data_validation_config = data_validation_config
+            self.artifact_writer = artifact_writer or ArtifactWriter()
             self.training_pipeline_config = training_pipeline_config
             self.schema_config = read_yaml_file(SCHEMA_FILE_PATH)
         except Exception as e:
@@ -21,8 +29,8 @@ class DataValidation:
     @staticmethod
     def read_data(file_path: str):
         """
-        Reads a CSV file and returns a DataFrame."""
-        return pd.read_csv(file_path)
+        Reads a CSV or Parquet file and returns a DataFrame."""
+        return read_dataframe(file_path)
     
     def validate_column_count(self, data: pd.DataFrame) -> bool:
         """
@@ -46,44 +54,146 @@ class DataValidation:
         except Exception as e:
             raise NetworkSecurityException(f"Error validating column count: {e}", sys)
         
-    def validate_data_types(self, data: pd.DataFrame) -> bool:
+    def split_invalid_rows(self, data: pd.DataFrame) -> tuple:
         """
-        Validates if the numerical columns in the data are of the correct data type.
+        Checks every row against the schema dtypes and allowed value domains.
+        Returns (valid_rows, invalid_rows): valid rows have numeric columns, invalid rows keep their raw values
+        as strings plus a validation_error column. Missing feature values are valid (they are imputed later),
+        a missing target is not.
         """
         try:
-            numerical_columns = self.schema_config['numeric_features']
-            for col in numerical_columns:
-                if col not in data.columns:
-                    logger.error(f"Missing numerical column: {col}")
-                    return False
+            allowed_values = self.schema_config.get('allowed_values', {})
+            errors = np.full(len(data), None, dtype=object)
+            columns = {}
+            for col, dtype in self.schema_config['columns'].items():
+                raw = data[col]
+                values = pd.to_numeric(raw, errors="coerce")
+                present = values.notna().to_numpy()
                 
-                if not pd.api.types.is_numeric_dtype(data[col]):
-                    logger.error(f"Column {col} is not of numeric type")
-                    return False
+                checks = [("not numeric", raw.notna().to_numpy() & ~present)]
+                if str(dtype).startswith("int"):
+                    checks.append(("not an integer", present & (values.to_numpy(dtype=np.float64, na_value=np.nan) % 1 != 0)))
+                if col in allowed_values:
+                    checks.append(("not an allowed value", present & ~values.isin(allowed_values[col]).to_numpy()))
+                if col == TARGET_COLUMN:
+                    checks.append(("missing target", ~present))
                 
-            return True
+                for reason, failed in checks:
+                    # keep the first failure of each row
+                    errors[failed & (errors == None)] = f"{col}: {reason}"
+                columns[col] = values
+            
+            invalid = errors != None
+            valid_rows = pd.DataFrame(columns, index=data.index)[~invalid]
+            invalid_rows = data[invalid].astype("string")
+            invalid_rows[VALIDATION_ERROR_COLUMN] = errors[invalid]
+            return valid_rows, invalid_rows
+        except Exception as e:
+            raise NetworkSecurityException(f"Error validating rows: {e}", sys)
+        
+    def iter_chunks(self, data: pd.DataFrame, file_path: str, bad_lines: list = None):
+        """
+        Yields the dataset chunk by chunk, from the in-memory DataFrame when there is one, otherwise from the file.
+        Malformed csv lines of the file are collected into `bad_lines`.
+        """
+        chunk_size = self.data_validation_config.chunk_size
+        if data is not None:
+            for start in range(0, len(data), chunk_size):
+                yield data.iloc[start:start + chunk_size]
+        else:
+            yield from read_dataframe_in_chunks(file_path, chunk_size, bad_lines=bad_lines)
+            
+    def to_invalid_rows(self, bad_lines: list) -> pd.DataFrame:
+        """
+        Malformed csv lines as quarantined rows, their fields laid out over the schema columns.
+        """
+        try:
+            columns = list(self.schema_config['columns'])
+            invalid_rows = pd.DataFrame([(fields + [None] * len(columns))[:len(columns)] for fields in bad_lines],
+                                        columns=columns).astype("string")
+            invalid_rows[VALIDATION_ERROR_COLUMN] = [f"malformed line: expected {len(columns)} fields, saw {len(fields)}"
+                                                     for fields in bad_lines]
+            return invalid_rows
+        except Exception as e:
+            raise NetworkSecurityException(f"Error quarantining malformed lines: {e}", sys)
+        
+    def validate_in_chunks(self, chunks, valid_file_path: str, invalid_file_path: str, bad_lines: list = None) -> tuple:
+        """
+        Streams the chunks through the schema checks. Clean rows are written to `valid_file_path` (or kept in
+        memory when the next stage takes in-memory artifacts) and bad rows are quarantined to `invalid_file_path`,
+        with the malformed lines the reader collects into `bad_lines`.
+        Returns (profile, valid_data, invalid_file_path) with the profile of the clean rows; valid_data is None
+        unless it is kept in memory and invalid_file_path is None when every row passed.
+        """
+        try:
+            keep_in_memory = self.data_validation_config.keep_in_memory
+            valid_writer = None if keep_in_memory else DataFrameWriter(valid_file_path)
+            invalid_writer = None
+            valid_chunks, profiles = [], []
+            n_rows = n_invalid = 0
+            try:
+                for chunk in chunks:
+                    if not self.validate_column_count(chunk):
+                        raise ValueError("Column validation failed")
+                    
+                    valid_rows, invalid_rows = self.split_invalid_rows(chunk)
+                    n_rows += len(chunk)
+                    profiles.append(build_profile(valid_rows))
+                    if keep_in_memory:
+                        valid_chunks.append(valid_rows)
+                    else:
+                        valid_writer.write(valid_rows)
+                    
+                    # malformed lines the reader skipped while parsing this chunk
+                    if bad_lines:
+                        invalid_rows = pd.concat([invalid_rows, self.to_invalid_rows(bad_lines)], ignore_index=True)
+                        n_rows += len(bad_lines)
+                        bad_lines.clear()
+                    if len(invalid_rows):
+                        n_invalid += len(invalid_rows)
+                        invalid_writer = invalid_writer or DataFrameWriter(invalid_file_path)
+                        invalid_writer.write(invalid_rows)
+                
+                if bad_lines:
+                    n_rows += len(bad_lines)
+                    n_invalid += len(bad_lines)
+                    invalid_writer = invalid_writer or DataFrameWriter(invalid_file_path)
+                    invalid_writer.write(self.to_invalid_rows(bad_lines))
+                    bad_lines.clear()
+            finally:
+                for writer in (valid_writer, invalid_writer):
+                    if writer is not None:
+                        writer.close()
+            
+            record_rows(n_rows)
+            if n_invalid:
+                logger.warning(f"Quarantined {n_invalid} of {n_rows} rows to {invalid_file_path}")
+            
+            valid_data = None
+            if keep_in_memory:
+                valid_data = pd.concat(valid_chunks) if valid_chunks else pd.DataFrame(columns=list(self.schema_config['columns']))
+                self.artifact_writer.submit(write_dataframe, valid_file_path, valid_data)
+            return merge_profiles(*profiles), valid_data, invalid_file_path if n_invalid else None
         except Exception as e:
-            raise NetworkSecurityException(f"Error validating data types: {e}", sys)
+            raise NetworkSecurityException(f"Error validating data in chunks: {e}", sys)
     
     def detect_data_drift(self, base_df: pd.DataFrame, current_df: pd.DataFrame, threshold:float = 0.5) -> bool:
         try:
-            status = True
-            report = {}
-            for column in base_df.columns:
-                d1 = base_df[column]
-                d2 = current_df[column]
-                is_same_dist = ks_2samp(d1, d2)
-                if threshold <= is_same_dist.pvalue:
-                    is_found = True
-                else:
-                    is_found = False
-                    status = False
-                    logger.info(f"Data drift detected in column: {column}, p-value: {is_same_dist.pvalue}")
-                
-                report.update({column: {
-                    "p_value": float(is_same_dist.pvalue),
-                    "same_distribution": is_found
-                }})
+            return self.detect_profile_drift(build_profile(base_df), build_profile(current_df), threshold)
+        except Exception as e:
+            raise NetworkSecurityException(f"Error detecting data drift: {e}", sys)
+        
+    def detect_profile_drift(self, base_profile: dict, current_profile: dict, threshold:float = 0.5) -> bool:
+        """
+        Drift between two datasets from their profiles, so the data itself does not have to be in memory.
+        """
+        try:
+            # one vectorized histogram pass over all columns instead of a ks_2samp call per column
+            status, report = get_profile_drift_report(base_profile, current_profile, threshold,
+                                                      self.data_validation_config.drift_metrics, self.data_validation_config.ks_method)
+            for column, column_report in report.items():
+                if not column_report["same_distribution"]:
+                    logger.info(f"Data drift detected in column: {column}, p-value: {column_report['p_value']}")
                 
             # create drift report directory if it doesn't exist
             drift_report_dir = self.data_validation_config.drift_report_dir
@@ -96,49 +206,100 @@ class DataValidation:
         except Exception as e:
             raise NetworkSecurityException(f"Error detecting data drift: {e}", sys)
         
-        
-    def initiate_data_validation(self, data_ingestion_artifact: DataIngestionArtifact) -> DataValidationArtifact:
+    def detect_reference_drift(self, current_profile: dict, threshold:float = 0.5) -> bool:
         """
-        Initiates the data validation process.
+        Compares the profile of the new data with the reference profile saved next to the last model.
+        Only the two profiles are needed, the historical training data is not reloaded.
+        Returns True when there is no reference profile yet.
         """
         try:
-            # import the datasets
-            train_data = data_ingestion_artifact.train_data_path
-            test_data = data_ingestion_artifact.test_data_path
-            
-            # read the Data Set
-            train_data = DataValidation.read_data(train_data)
-            test_data = DataValidation.read_data(test_data)
+            baseline_profile_file_path = self.data_validation_config.baseline_profile_file_path
+            if not os.path.exists(baseline_profile_file_path):
+                logger.info(f"No reference profile at {baseline_profile_file_path}, skipping reference drift check")
+                return True
             
-            # validate the number of columns
-            col_validation_status = self.validate_column_count(train_data) and self.validate_column_count(test_data)
+            reference_profile = read_yaml_file(baseline_profile_file_path)
+            status, report = get_profile_drift_report(reference_profile, current_profile, threshold,
+                                                      self.data_validation_config.drift_metrics, self.data_validation_config.ks_method)
+            for column, column_report in report.items():
+                if not column_report["same_distribution"]:
+                    logger.info(f"Drift from reference profile in column: {column}, p-value: {column_report['p_value']}")
             
-            if not col_validation_status:
-                raise NetworkSecurityException("Column validation failed", sys)
-            
-            # validate the numerical data types
-            numerical_validation_status = self.validate_data_types(train_data) and self.validate_data_types(test_data)
-            if not numerical_validation_status:
-                raise NetworkSecurityException("Numerical data type validation failed", sys)
+            write_yaml_file(self.data_validation_config.reference_drift_report_file_path, report, replace=True)
+            return status
+        except Exception as e:
+            raise NetworkSecurityException(f"Error detecting drift from reference profile: {e}", sys)
+        
+        
+    def validate_train_data(self, data_ingestion_artifact: DataIngestionArtifact) -> DatasetValidationArtifact:
+        """
+        Validates the training set row by row in bounded chunks, from the in-memory dataset when the previous stage handed it over.
+        """
+        try:
+            bad_lines = []
+            profile, data, invalid_file_path = self.validate_in_chunks(
+                self.iter_chunks(data_ingestion_artifact.train_data, data_ingestion_artifact.train_data_path, bad_lines),
+                self.data_validation_config.valid_training_file_path, self.data_validation_config.invalid_training_file_path, bad_lines)
+            return DatasetValidationArtifact(self.data_validation_config.valid_training_file_path, invalid_file_path, profile, data)
+        except Exception as e:
+            raise NetworkSecurityException(f"Error validating training data: {e}", sys)
+        
+    def validate_test_data(self, data_ingestion_artifact: DataIngestionArtifact) -> DatasetValidationArtifact:
+        try:
+            bad_lines = []
+            profile, data, invalid_file_path = self.validate_in_chunks(
+                self.iter_chunks(data_ingestion_artifact.test_data, data_ingestion_artifact.test_data_path, bad_lines),
+                self.data_validation_config.valid_testing_file_path, self.data_validation_config.invalid_testing_file_path, bad_lines)
+            return DatasetValidationArtifact(self.data_validation_config.valid_testing_file_path, invalid_file_path, profile, data)
+        except Exception as e:
+            raise NetworkSecurityException(f"Error validating test data: {e}", sys)
+        
+    def detect_drift(self, train_validation_artifact: DatasetValidationArtifact,
+                     test_validation_artifact: DatasetValidationArtifact) -> DataValidationArtifact:
+        """
+        Checks the validated train and test sets for drift against each other and against the last published
+        reference profile, and saves the training profile as the reference for later runs.
+        """
+        try:
+            train_profile, test_profile = train_validation_artifact.profile, test_validation_artifact.profile
+            # the drift checks run on the profiles of every valid train and test row
+            record_rows(train_profile["row_count"] + test_profile["row_count"])
             
             # validate the data drift
-            status = self.detect_data_drift(train_data, test_data)
-            dir_path = os.path.dirname(self.data_validation_config.valid_training_file_path)
-            os.makedirs(dir_path, exist_ok=True)
+            status = self.detect_profile_drift(train_profile, test_profile)
             
-            train_data.to_csv(self.data_validation_config.valid_training_file_path, index=False, header=True)
-            test_data.to_csv(self.data_validation_config.valid_testing_file_path, index=False, header=True)
+            # profile the training data as the reference for later runs, and check this batch against the last one
+            self.artifact_writer.submit(write_yaml_file, self.data_validation_config.reference_profile_file_path, train_profile, replace=True)
+            reference_status = self.detect_reference_drift(merge_profiles(train_profile, test_profile),
+                                                           self.data_validation_config.reference_drift_threshold)
+            status = status and reference_status
             
             data_validation_artifact = DataValidationArtifact(
                 validation_status=status,
-                valid_train_file_path=self.data_validation_config.valid_training_file_path,
-                valid_test_file_path=self.data_validation_config.valid_testing_file_path,
-                invalid_train_file_path=None,
-                invalid_test_file_path=None,
-                drift_report_file_path=self.data_validation_config.drift_report_dir
+                valid_train_file_path=train_validation_artifact.valid_file_path,
+                valid_test_file_path=test_validation_artifact.valid_file_path,
+                invalid_train_file_path=train_validation_artifact.invalid_file_path,
+                invalid_test_file_path=test_validation_artifact.invalid_file_path,
+                drift_report_file_path=self.data_validation_config.drift_report_dir,
+                reference_profile_file_path=self.data_validation_config.reference_profile_file_path,
+                reference_drift_report_file_path=self.data_validation_config.reference_drift_report_file_path,
+                reference_drift_status=reference_status,
+                train_data=train_validation_artifact.data,
+                test_data=test_validation_artifact.data
             )
             
             return data_validation_artifact
+        except Exception as e:
+            raise NetworkSecurityException(f"Error detecting drift: {e}", sys)
+        
+    def initiate_data_validation(self, data_ingestion_artifact: DataIngestionArtifact) -> DataValidationArtifact:
+        """
+        Initiates the data validation process.
+        """
+        try:
+            train_validation_artifact = self.validate_train_data(data_ingestion_artifact)
+            test_validation_artifact = self.validate_test_data(data_ingestion_artifact)
+            return self.detect_drift(train_validation_artifact, test_validation_artifact)
             
         except Exception as e:
-            raise NetworkSecurityException(f"Error during data validation: {e}", sys)
\ No newline at end of file
+            raise NetworkSecurityException(f"Error during data validation: {e}", sys)
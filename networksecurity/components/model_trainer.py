@@ -1,44 +1,75 @@
 import os
 import sys
-import mlflow
 
 from networksecurity.exception import NetworkSecurityException
 from networksecurity.logging import logger
 
 from networksecurity.entity.artifact_entity import DataTransformationArtifact, ModelTrainerArtifact, ClassificationMetricArtifact
 from networksecurity.entity.config_entity import ModelTrainerConfig
+from networksecurity.constants.training_pipeline import TARGET_COLUMN
 
-from networksecurity.utils.main_utils.utils import load_object, save_object, load_numpy_array, evaluate_models
+from networksecurity.utils.main_utils import utils, model_store
+from networksecurity.utils.main_utils.utils import load_object, save_object, load_numpy_array, evaluate_models, evaluate_models_incrementally, ArtifactWriter
+from networksecurity.utils.main_utils.stage_cache import StageCache
+from networksecurity.utils.main_utils.instrumentation import record_rows
+from networksecurity.utils.ml_utils.tracking.experiment_tracker import ExperimentTracker
 from networksecurity.utils.ml_utils.metric.classification_metric import get_classification_score
+from networksecurity.utils.ml_utils.search.incremental_search import IncrementalSearchEngine
 from networksecurity.utils.ml_utils.model.estimator import NetworkModel
+from networksecurity.utils.ml_utils.model import compiled, estimator as estimator_module
+from networksecurity.utils.ml_utils.search import model_search, incremental_search
 
-from sklearn.linear_model import LogisticRegression
+from sklearn.linear_model import LogisticRegression, SGDClassifier
+from sklearn.naive_bayes import BernoulliNB
 from sklearn.metrics import r2_score
 from sklearn.neighbors import KNeighborsClassifier
 from sklearn.tree import DecisionTreeClassifier
 from sklearn.ensemble import (RandomForestClassifier, GradientBoostingClassifier, AdaBoostClassifier)
+from dataclasses import asdict
+
+STAGE_NAME: str = "model_trainer"
+TRAINING_MODES: tuple = ("batch", "incremental")
+# modules besides this one whose code shapes the saved model, hashed into the stage cache key
+CACHE_KEY_MODULES: tuple = (utils, model_store, model_search, incremental_search, compiled, estimator_module)
 
 class ModelTrainer:
-    def __init__(self, model_trainer_config: ModelTrainerConfig, data_transformation_artifact: DataTransformationArtifact):
+    def __init__(self, model_trainer_config: ModelTrainerConfig, data_transformation_artifact: DataTransformationArtifact,
+                 artifact_writer: ArtifactWriter = None, stage_cache: StageCache = None, tracker: ExperimentTracker = None):
         try:
+            if model_trainer_config.training_mode not in TRAINING_MODES:
+                raise ValueError(f"Unknown training mode {model_trainer_config.training_mode}, expected one of {TRAINING_MODES}")
             self.model_trainer_config = model_trainer_config
             self.data_transformation_artifact = data_transformation_artifact
+            self.artifact_writer = artifact_writer or ArtifactWriter()
+            self.stage_cache = stage_cache
+            self.tracker = tracker
         except Exception as e:
             raise NetworkSecurityException(e, sys)
         
-    def track_mlflow(self, best_model, classification_train_metric:ClassificationMetricArtifact):
-        with mlflow.start_run():
-            f1_score = classification_train_metric.f1_score
-            recall = classification_train_metric.recall
-            precision = classification_train_metric.precision
-            
-            mlflow.log_metric("f1_score", f1_score)
-            mlflow.log_metric("recall", recall)
-            mlflow.log_metric("precision", precision)
-            mlflow.sklearn.log_model(best_model, "model")
-            
+    def track_experiment(self, best_model_name: str, best_model, classification_train_metric: ClassificationMetricArtifact,
+                         classification_test_metric: ClassificationMetricArtifact) -> None:
+        """
+        Queues the search settings, best model with its parameters and metrics to the experiment tracker,
+        which logs them and the model (once) in the background.
+        """
+        if self.tracker is None:
+            return
+        self.tracker.log_params({
+            "best_model_name": best_model_name,
+            **{f"search.{name}": value for name, value in self.get_search_params().items()},
+            **{f"model.{name}": value for name, value in best_model.get_params(deep=False).items()}
+        })
+        self.tracker.log_metrics({
+            **{f"train_{name}": value for name, value in asdict(classification_train_metric).items()},
+            **{f"test_{name}": value for name, value in asdict(classification_test_metric).items()}
+        })
+        self.tracker.log_model(best_model)
         
-    def train_model(self, x_train, y_train, x_test, y_test):
+        
+    def get_model_grid(self):
+        """
+        Returns the candidate models and their hyperparameter grids.
+        """
         model = {
             'Logistic Regression': LogisticRegression(verbose=1),
             'KNeighbors': KNeighborsClassifier(),
@@ -52,7 +83,7 @@ class ModelTrainer:
             "Decision Tree": {
                 'criterion': ['gini', 'entropy', 'log_loss'],
                 'splitter': ['best', 'random'],
-                'max_features': ['auto', 'sqrt', 'log2']
+                'max_features': [None, 'sqrt', 'log2']
             },
             
             "Random Forest": {
@@ -84,7 +115,63 @@ class ModelTrainer:
             }
         }
         
-        model_report = evaluate_models(x_train, y_train, x_test, y_test, models=model, params=params)
+        return model, params
+    
+    def get_incremental_model_grid(self):
+        """
+        Returns the candidate partial_fit learners of the incremental training mode and their hyperparameter grids.
+        """
+        model = {
+            'SGD Logistic Regression': SGDClassifier(loss='log_loss', random_state=42),
+            'SGD Modified Huber': SGDClassifier(loss='modified_huber', random_state=42),
+            # the ternary features are split into 1 and {-1, 0}
+            'Bernoulli Naive Bayes': BernoulliNB(binarize=0.0)
+        }
+        
+        params = {
+            "SGD Logistic Regression": {
+                'alpha': [1e-5, 1e-4, 1e-3]
+            },
+            
+            "SGD Modified Huber": {
+                'alpha': [1e-5, 1e-4, 1e-3]
+            },
+            
+            "Bernoulli Naive Bayes": {
+                'alpha': [0.1, 1.0]
+            }
+        }
+        
+        return model, params
+    
+    def get_search_params(self) -> dict:
+        """
+        Returns the search engine settings from the model trainer config.
+        """
+        return {
+            "strategy": self.model_trainer_config.search_strategy,
+            "cv": self.model_trainer_config.search_cv,
+            "n_jobs": self.model_trainer_config.search_n_jobs,
+            "n_iter": self.model_trainer_config.search_n_iter,
+            "halving_factor": self.model_trainer_config.search_halving_factor,
+            "shared_memory": self.model_trainer_config.search_shared_memory
+        }
+    
+    def get_incremental_search_params(self) -> dict:
+        """
+        Returns the chunked training settings from the model trainer config.
+        """
+        return {
+            "chunk_size": self.model_trainer_config.incremental_chunk_size,
+            "epochs": self.model_trainer_config.incremental_epochs,
+            "validation_fraction": self.model_trainer_config.incremental_validation_fraction
+        }
+    
+    def train_model(self, x_train, y_train, x_test, y_test, cache_key: str = None):
+        model, params = self.get_model_grid()
+        
+        model_report = evaluate_models(x_train, y_train, x_test, y_test, models=model, params=params,
+                                       tracker=self.tracker, **self.get_search_params())
         
         best_model_score = max(sorted(model_report.values()))
         
@@ -95,20 +182,60 @@ class ModelTrainer:
         y_train_pred = best_model.predict(x_train)
         classification_train_metric = get_classification_score(y_true=y_train, y_pred=y_train_pred)
         
-        self.track_mlflow(best_model, classification_train_metric)
-        
         y_test_pred = best_model.predict(x_test)
         classification_test_metric = get_classification_score(y_true=y_test, y_pred=y_test_pred)
         
-        self.track_mlflow(best_model, classification_test_metric)
+        return self.save_trained_model(best_model_name, best_model, classification_train_metric, classification_test_metric, cache_key)
+    
+    def train_model_incrementally(self, train_array, test_array, cache_key: str = None):
+        """
+        Trains the partial_fit learners chunk by chunk over the transformed arrays, which stay on disk
+        (memmapped), and saves the best one like train_model does.
+        """
+        model, params = self.get_incremental_model_grid()
+        search_params = self.get_incremental_search_params()
+        
+        model_report = evaluate_models_incrementally(train_array, test_array, models=model, params=params,
+                                                     tracker=self.tracker, **search_params)
+        
+        best_model_name = max(model_report, key=model_report.get)
+        best_model = model[best_model_name]
+        
+        engine = IncrementalSearchEngine(chunk_size=search_params["chunk_size"])
+        classification_train_metric = engine.score({best_model_name: best_model}, train_array)[best_model_name]
+        classification_test_metric = engine.score({best_model_name: best_model}, test_array)[best_model_name]
+        
+        return self.save_trained_model(best_model_name, best_model, classification_train_metric, classification_test_metric, cache_key)
+    
+    def save_trained_model(self, best_model_name: str, best_model, classification_train_metric: ClassificationMetricArtifact,
+                           classification_test_metric: ClassificationMetricArtifact, cache_key: str = None) -> ModelTrainerArtifact:
+        """
+        Wraps the best model with the preprocessor into a NetworkModel, saves it and records it in the
+        experiment tracker and stage cache.
+        """
+        self.track_experiment(best_model_name, best_model, classification_train_metric, classification_test_metric)
         
-        preprocessor = load_object(file_path=self.data_transformation_artifact.transformed_object_file_path)
+        preprocessor = self.data_transformation_artifact.preprocessor
+        if preprocessor is None:
+            preprocessor = load_object(file_path=self.data_transformation_artifact.transformed_object_file_path)
         
         model_dir_path = os.path.dirname(self.model_trainer_config.trained_model_file_path)
         os.makedirs(model_dir_path, exist_ok=True)
         
         Network_Model= NetworkModel(preprocessor=preprocessor, model=best_model)
-        save_object(file_path=self.model_trainer_config.trained_model_file_path, obj=Network_Model)
+        if self.model_trainer_config.compile_model and not Network_Model.compile():
+            logger.info(f"{best_model_name} has no compiled form, the model predicts through sklearn")
+        # schema and score of the model, readable from the file header without loading the model
+        feature_names = getattr(preprocessor, "feature_names_in_", None)
+        metadata = {
+            "model_name": best_model_name,
+            "feature_names": [str(name) for name in feature_names] if feature_names is not None else None,
+            "target_column": TARGET_COLUMN,
+            "compiled": Network_Model.compiled_model is not None,
+            "test_f1_score": float(classification_test_metric.f1_score)
+        }
+        model_write = self.artifact_writer.submit(save_object, file_path=self.model_trainer_config.trained_model_file_path,
+                                                  obj=Network_Model, metadata=metadata)
         
         model_trainer_artifact = ModelTrainerArtifact(
             trained_model_path=self.model_trainer_config.trained_model_file_path,
@@ -116,7 +243,59 @@ class ModelTrainer:
             test_metric_artifact=classification_test_metric
         )
         
+        if self.stage_cache is not None and cache_key is not None:
+            metadata = {
+                "best_model_name": best_model_name,
+                "train_metric": {name: float(value) for name, value in asdict(classification_train_metric).items()},
+                "test_metric": {name: float(value) for name, value in asdict(classification_test_metric).items()}
+            }
+            self.artifact_writer.submit_after([model_write], self.stage_cache.put, STAGE_NAME, cache_key,
+                                              {"model": self.model_trainer_config.trained_model_file_path}, metadata)
+        
         return model_trainer_artifact
+    
+    def get_cache_key(self, preprocessor_source) -> str:
+        """
+        Hashes the transformed data, preprocessor, model grid, compile flag and training code into the stage cache key.
+        """
+        try:
+            train_source = self.data_transformation_artifact.train_array
+            test_source = self.data_transformation_artifact.test_array
+            if train_source is None or test_source is None:
+                train_source = self.data_transformation_artifact.transformed_train_file_path
+                test_source = self.data_transformation_artifact.transformed_test_file_path
+            
+            if self.model_trainer_config.training_mode == "incremental":
+                model, params = self.get_incremental_model_grid()
+                search_params = self.get_incremental_search_params()
+            else:
+                model, params = self.get_model_grid()
+                search_params = self.get_search_params()
+            model_grid = {name: [repr(estimator), params[name]] for name, estimator in model.items()}
+            model_grid["search"] = search_params
+            model_grid["training_mode"] = self.model_trainer_config.training_mode
+            model_grid["compile_model"] = self.model_trainer_config.compile_model
+            return StageCache.fingerprint(train_source, test_source, preprocessor_source, model_grid, __file__,
+                                          *(module.__file__ for module in CACHE_KEY_MODULES))
+        except Exception as e:
+            raise NetworkSecurityException(e, sys)
+        
+    def load_from_cache(self, entry: dict) -> ModelTrainerArtifact:
+        """
+        Restores a cached trained model and its metrics into this run's artifact dir.
+        """
+        try:
+            StageCache.restore(entry, {"model": self.model_trainer_config.trained_model_file_path})
+            metadata = entry["metadata"]
+            logger.info(f"Reusing cached model: {metadata['best_model_name']}")
+            
+            return ModelTrainerArtifact(
+                trained_model_path=self.model_trainer_config.trained_model_file_path,
+                train_metric_artifact=ClassificationMetricArtifact(**metadata["train_metric"]),
+                test_metric_artifact=ClassificationMetricArtifact(**metadata["test_metric"])
+            )
+        except Exception as e:
+            raise NetworkSecurityException(e, sys)
         
     
     def initiate_model_trainer(self):
@@ -124,8 +303,28 @@ class ModelTrainer:
             train_file_path = self.data_transformation_artifact.transformed_train_file_path
             test_file_path = self.data_transformation_artifact.transformed_test_file_path
             
-            train_array = load_numpy_array(file_path=train_file_path)
-            test_array = load_numpy_array(file_path=test_file_path)
+            cache_key = None
+            if self.stage_cache is not None:
+                preprocessor = self.data_transformation_artifact.preprocessor
+                preprocessor_source = repr(preprocessor) if preprocessor is not None else self.data_transformation_artifact.transformed_object_file_path
+                cache_key = self.get_cache_key(preprocessor_source)
+                entry = self.stage_cache.get(STAGE_NAME, cache_key)
+                if entry is not None:
+                    return self.load_from_cache(entry)
+            
+            train_array = self.data_transformation_artifact.train_array
+            test_array = self.data_transformation_artifact.test_array
+            if self.model_trainer_config.training_mode == "incremental":
+                # always memmapped, only one chunk at a time is read into memory
+                if train_array is None or test_array is None:
+                    train_array = load_numpy_array(file_path=train_file_path, mmap_mode="r")
+                    test_array = load_numpy_array(file_path=test_file_path, mmap_mode="r")
+                record_rows(len(train_array))
+                return self.train_model_incrementally(train_array, test_array, cache_key=cache_key)
+            
+            if train_array is None or test_array is None:
+                train_array = load_numpy_array(file_path=train_file_path, mmap_mode=self.model_trainer_config.mmap_mode)
+                test_array = load_numpy_array(file_path=test_file_path, mmap_mode=self.model_trainer_config.mmap_mode)
             
             x_train, y_train, x_test, y_test = (
                 train_array[:,:-1],
@@ -133,8 +332,9 @@ class ModelTrainer:
                 test_array[:,:-1],
                 test_array[:,-1]
             )
+            record_rows(len(x_train))
             
-            model_trainer_artifact = self.train_model(x_train, y_train, x_test, y_test)
+            model_trainer_artifact = self.train_model(x_train, y_train, x_test, y_test, cache_key=cache_key)
             
             return model_trainer_artifact
             
@@ -0,0 +1,87 @@
+from networksecurity.logging import logger
+from networksecurity.exception import NetworkSecurityException
+from networksecurity.entity.config_entity import MongoDBClientConfig
+
+import os
+import sys
+import certifi
+import pymongo
+import threading
+import importlib.util
+
+from dotenv import load_dotenv
+load_dotenv()
+
+# python package each wire compressor needs, zlib ships with python
+COMPRESSOR_PACKAGES: dict = {"zstd": "zstandard", "snappy": "snappy", "zlib": None}
+
+_clients = {}
+_clients_lock = threading.Lock()
+
+
+def available_compressors(compressors: list) -> list:
+    """
+    The configured compressors whose package is installed, in the configured order.
+    """
+    return [name for name in compressors
+            if name in COMPRESSOR_PACKAGES and (COMPRESSOR_PACKAGES[name] is None or importlib.util.find_spec(COMPRESSOR_PACKAGES[name]))]
+
+
+def get_client_options(mongo_db_client_config: MongoDBClientConfig) -> dict:
+    """
+    MongoClient keyword arguments for the config: pool size, wire compression, read preference and timeouts.
+    """
+    config = mongo_db_client_config
+    options = {
+        "maxPoolSize": config.max_pool_size,
+        "minPoolSize": config.min_pool_size,
+        "maxIdleTimeMS": config.max_idle_time_ms,
+        "readPreference": config.read_preference,
+        "connectTimeoutMS": config.connect_timeout_ms,
+        "serverSelectionTimeoutMS": config.server_selection_timeout_ms,
+        "appname": config.app_name,
+    }
+    compressors = available_compressors(config.compressors)
+    if compressors:
+        options["compressors"] = ",".join(compressors)
+    # Atlas (mongodb+srv) connections are TLS, verify them against certifi's CA bundle
+    if config.uri and (config.uri.startswith("mongodb+srv://") or "tls=true" in config.uri or "ssl=true" in config.uri):
+        options["tlsCAFile"] = certifi.where()
+    return options
+
+
+def get_mongo_client(mongo_db_client_config: MongoDBClientConfig = None) -> pymongo.MongoClient:
+    """
+    Returns the process-wide MongoClient for the config, creating it on first use.
+    A MongoClient is a thread-safe connection pool, so every caller with the same settings shares its
+    connections instead of paying a new handshake (and TLS negotiation) for each client. Clients are
+    keyed by process id as well, a forked worker gets its own instead of reusing the parent's sockets.
+    """
+    try:
+        config = mongo_db_client_config or MongoDBClientConfig()
+        options = get_client_options(config)
+        key = (os.getpid(), config.uri, tuple(sorted(options.items())))
+        with _clients_lock:
+            client = _clients.get(key)
+            if client is None:
+                client = pymongo.MongoClient(config.uri, **options)
+                _clients[key] = client
+                logger.info(f"Created MongoDB client (pool size {config.max_pool_size}, "
+                            f"compressors {options.get('compressors')}, read preference {config.read_preference})")
+            return client
+    except Exception as e:
+        raise NetworkSecurityException(e, sys)
+
+
+def close_mongo_clients() -> None:
+    """
+    Closes the clients this process created, e.g. before it exits.
+    """
+    try:
+        with _clients_lock:
+            for (pid, _, _), client in list(_clients.items()):
+                if pid == os.getpid():
+                    client.close()
+            _clients.clear()
+    except Exception as e:
+        raise NetworkSecurityException(e, sys)
@@ -16,10 +16,66 @@ TEST_FILE_NAME = "test.csv"
 
 SCHEMA_FILE_PATH = os.path.join("data_schema", "schema.yaml")
 
+# format of the dataframes handed between stages, "csv" or "parquet" (int8 columns, zstd compressed)
+ARTIFACT_FILE_FORMAT:str = "csv"
+
+# hand DataFrames/arrays between stages in memory, files are then written behind on a background thread
+IN_MEMORY_ARTIFACTS:bool = False
+ARTIFACT_WRITE_BEHIND:bool = True
+
+# content-addressed cache of stage outputs, reused when data, schema, params and code are unchanged
+STAGE_CACHE_ENABLED:bool = True
+STAGE_CACHE_DIR:str = os.path.join(ARTIFACTS_DIR, "stage_cache")
+STAGE_CACHE_MAX_SIZE_BYTES:int = 2 * 1024 ** 3
+
+# per-stage wall/cpu time, peak RSS and rows/sec of a run, written to the artifact dir
+RUN_REPORT_FILE_NAME:str = "run_report.json"
+# run every stage under cProfile and dump its stats to <artifact dir>/profiles/<stage>.prof
+PROFILE_STAGES:bool = False
+PROFILE_DIR_NAME:str = "profiles"
+
+# stages whose inputs are ready run concurrently on this many threads
+PIPELINE_MAX_WORKERS:int = 4
+# checkpointed stage outputs of a run, a resumed run skips the stages found here
+PIPELINE_STATE_DIR_NAME:str = "pipeline_state"
+
 SAVED_MODEL_DIR:str = os.path.join("saved_model")
 MODEL_FILE_NAME:str = "model.pkl"
+# per-column histograms, null counts and row count of the training data, kept next to the model
+REFERENCE_PROFILE_FILE_NAME:str = "reference_profile.yaml"
 
 
+"""
+    MongoDB client config constants
+"""
+
+MONGO_DB_URI_ENV_KEY:str = "MONGO_DB_URI"
+# connections kept per client; one client is shared by every stage of a process
+MONGO_DB_MAX_POOL_SIZE:int = 16
+MONGO_DB_MIN_POOL_SIZE:int = 0
+MONGO_DB_MAX_IDLE_TIME_MS:int = 300000
+# wire compression in order of preference, codecs whose package is not installed are skipped
+MONGO_DB_COMPRESSORS:list = ["zstd", "snappy", "zlib"]
+# reads go to the primary, so ingestion and its checkpoint never see a lagging secondary
+MONGO_DB_READ_PREFERENCE:str = "primary"
+MONGO_DB_CONNECT_TIMEOUT_MS:int = 10000
+MONGO_DB_SERVER_SELECTION_TIMEOUT_MS:int = 30000
+MONGO_DB_APP_NAME:str = "networksecurity"
+
+"""
+    Experiment tracking config constants
+"""
+
+EXPERIMENT_TRACKING_ENABLED:bool = True
+# None uses MLFLOW_TRACKING_URI from the environment, or a local ./mlruns file store
+EXPERIMENT_TRACKING_URI:str = None
+# None uses MLFLOW_EXPERIMENT_NAME from the environment, or the default experiment
+EXPERIMENT_TRACKING_EXPERIMENT_NAME:str = None
+# records waiting for the background tracker, further ones are dropped instead of blocking training
+EXPERIMENT_TRACKING_MAX_QUEUE_SIZE:int = 10000
+# seconds the end of a run waits for the tracker to send what is still queued
+EXPERIMENT_TRACKING_CLOSE_TIMEOUT:float = 600.0
+
 """
     Data ingestion config constants    
 """
@@ -30,6 +86,27 @@ DATA_INGESTION_DIR_NAME:str = "data_ingestion"
 DATA_INGESTION_FEATURE_STORE_DIR_NAME:str = "feature_store"
 DATA_INGESTION_INGESTED_DIR:str = "ingested"
 DATA_INGESTION_TRAIN_TEST_SPLIT_RATIO:float = 0.2
+# content hash push_data.py stores with each document in upsert mode, not a feature
+DATA_INGESTION_ROW_HASH_FIELD:str = "row_hash"
+
+# stream the collection in batches instead of loading every document at once
+DATA_INGESTION_STREAMING:bool = False
+DATA_INGESTION_BATCH_SIZE:int = 10000
+# nullable int8 keeps the ternary {-1,0,1} features compact while allowing NaN
+DATA_INGESTION_CHUNK_DTYPE:str = "Int8"
+
+# incremental mode fetches only new documents into a feature store shared across runs, each run still snapshots
+# and trains on the whole store
+DATA_INGESTION_INCREMENTAL:bool = False
+DATA_INGESTION_CUMULATIVE_DIR:str = os.path.join(ARTIFACTS_DIR, "cumulative_feature_store")
+# every run writes its new rows as one part (feature store, train and test files) in a directory of its own
+DATA_INGESTION_CUMULATIVE_PARTS_DIR_NAME:str = "parts"
+# ObjectIds of the rows in a part, to skip documents already ingested when the safety window is read again
+DATA_INGESTION_PART_OBJECT_IDS_FILE_NAME:str = "object_ids.npy"
+# ObjectIds are made by the client, and parallel loaders (push_data.py) commit batches out of _id order, so the
+# documents up to this many seconds older than the checkpointed ObjectId are read again on every run
+DATA_INGESTION_CHECKPOINT_SAFETY_WINDOW_SECONDS:int = 600
+DATA_INGESTION_CHECKPOINT_FILE_NAME:str = "checkpoint.yaml"
 
 """
     Data validation config constants
@@ -40,6 +117,16 @@ DATA_VALIDATION_VALID_DIR:str = "validated"
 DATA_VALIDATION_INVALID_DIR:str = "invalid"
 DATA_VALIDATION_DRIFT_REPORT_DIR:str = "drift_report"
 DATA_VALIDATION_DRIFT_REPORT_FILE_NAME:str = "report.yaml"
+# rows checked against the schema at a time, rows failing a check are written to the invalid dir
+DATA_VALIDATION_CHUNK_SIZE:int = 100000
+# drift statistics in the report: "ks" decides drift, "chi2" and "psi" are added alongside it
+DATA_VALIDATION_DRIFT_METRICS:list = ["ks"]
+# "auto" matches ks_2samp (exact p-values up to 10000 rows), "asymp" always uses the asymptotic distribution
+DATA_VALIDATION_KS_METHOD:str = "auto"
+# drift of the new data against the reference profile saved with the last model
+DATA_VALIDATION_REFERENCE_DRIFT_REPORT_FILE_NAME:str = "reference_drift_report.yaml"
+# KS p-value below which a column has drifted from the reference profile, the drift that blocks publishing
+DATA_VALIDATION_REFERENCE_DRIFT_THRESHOLD:float = 0.05
 
 """
     Data transformation config constants
@@ -50,13 +137,17 @@ DATA_TRANSFORMATION_TRANSFORMED_DATA_DIR:str = "transformed_data"
 DATA_TRANSFORMATION_TRANSFORMED_OBJECT_DIR:str = "transformed_object"
 PREPROCESSING_OBJECT_FILE_NAME:str = "preprocessor.pkl"
 
-# knn imputer to replace missing values
+# imputer to replace missing values, strategy is "knn" (brute force), "indexed_knn" (KD-tree) or "mode"
 DATA_TRANSFORMATION_IMPUTER_PARAMS: dict = {
+    'strategy': 'knn',
     'missing_values': np.nan,
     'n_neighbors': 3,
     'weights': 'uniform'
 }
 
+# store transformed arrays as int8 when the values allow it (float32 otherwise) instead of float64
+DATA_TRANSFORMATION_COMPACT_ARRAYS:bool = False
+
 """
     Model training config constants
 """
@@ -65,4 +156,93 @@ MODEL_TRAINING_DIR_NAME:str = "model_training"
 MODEL_TRAINER_TRAINED_MODEL_DIR:str = "trained_model"
 MODEL_TRAINER_TRAINED_MODEL_FILE_NAME:str = "model.pkl"
 TRAINED_MODEL_EXPECTED_SCORE:float = 0.6
-MODEL_TRAINER_OVERFITTING_UNDERFITTING_THRESHOLD:float = 0.05
\ No newline at end of file
+MODEL_TRAINER_OVERFITTING_UNDERFITTING_THRESHOLD:float = 0.05
+# memory-map the transformed arrays instead of reading them into RAM, None to load them fully
+MODEL_TRAINER_MMAP_MODE:str = "r"
+
+# hyperparameter search: "grid", "random" (n_iter candidates per model) or "halving" (successive halving)
+MODEL_TRAINER_SEARCH_STRATEGY:str = "grid"
+MODEL_TRAINER_SEARCH_CV:int = 3
+MODEL_TRAINER_SEARCH_N_JOBS:int = -1
+MODEL_TRAINER_SEARCH_N_ITER:int = 20
+MODEL_TRAINER_SEARCH_HALVING_FACTOR:int = 3
+# publish the training arrays once as memmapped .npy files that every search worker attaches to
+MODEL_TRAINER_SEARCH_SHARED_MEMORY:bool = True
+# export tree/linear models into flat-array evaluators that NetworkModel.predict uses instead of sklearn
+MODEL_TRAINER_COMPILE_MODEL:bool = True
+# publish a model whose data drifted from the reference profile of the serving model anyway, replacing the
+# serving model and the drift reference (drift between the train and test sets only logs a warning)
+MODEL_TRAINER_PUBLISH_ON_REFERENCE_DRIFT:bool = False
+
+# "batch" searches the model grid on the full arrays in memory, "incremental" streams the memmapped transformed
+# arrays in chunks through partial_fit learners, so the training set is bounded by disk instead of RAM
+MODEL_TRAINER_TRAINING_MODE:str = "batch"
+MODEL_TRAINER_INCREMENTAL_CHUNK_SIZE:int = 100_000
+MODEL_TRAINER_INCREMENTAL_EPOCHS:int = 5
+# trailing fraction of the training rows held out to pick the best candidate of each learner
+MODEL_TRAINER_INCREMENTAL_VALIDATION_FRACTION:float = 0.1
+
+"""
+    Batch prediction config constants
+"""
+
+BATCH_PREDICTION_DIR_NAME:str = "batch_prediction"
+BATCH_PREDICTION_MODEL_FILE_PATH:str = os.path.join(SAVED_MODEL_DIR, MODEL_FILE_NAME)
+BATCH_PREDICTION_INPUT_FILE_PATH:str = os.path.join("Network_data", FILE_NAME)
+BATCH_PREDICTION_OUTPUT_FILE_NAME:str = "predictions.csv"
+# score a Mongo collection / write to one instead of files when set
+BATCH_PREDICTION_INPUT_COLLECTION_NAME:str = None
+BATCH_PREDICTION_OUTPUT_COLLECTION_NAME:str = None
+BATCH_PREDICTION_PREDICTION_COLUMN:str = "prediction"
+# read preference of the input collection, e.g. "secondaryPreferred" to keep scoring reads off the primary;
+# None uses MONGO_DB_READ_PREFERENCE. Writes always go to the primary
+BATCH_PREDICTION_READ_PREFERENCE:str = None
+# rows per chunk sent to a worker, and worker processes (-1 for one per CPU)
+BATCH_PREDICTION_CHUNK_SIZE:int = 100000
+BATCH_PREDICTION_N_WORKERS:int = -1
+
+"""
+    Prediction server config constants
+"""
+
+PREDICTION_SERVER_HOST:str = "0.0.0.0"
+PREDICTION_SERVER_PORT:int = 8000
+# concurrent requests are coalesced into one predict call of up to MAX_BATCH_SIZE rows,
+# waiting at most MAX_WAIT_MS for the batch to fill
+PREDICTION_SERVER_MAX_BATCH_SIZE:int = 64
+PREDICTION_SERVER_MAX_WAIT_MS:float = 2.0
+# seconds between checks of saved_model/ for a newly published model
+PREDICTION_SERVER_RELOAD_INTERVAL:float = 2.0
+# number of recent requests the p50/p99 latencies are computed over
+PREDICTION_SERVER_LATENCY_WINDOW:int = 10000
+
+"""
+    Benchmark config constants
+"""
+
+BENCHMARK_DIR_NAME:str = "benchmark"
+# real dataset the synthetic rows are modelled on
+BENCHMARK_SEED_FILE_PATH:str = os.path.join("Network_data", FILE_NAME)
+BENCHMARK_DATA_DIR:str = os.path.join(ARTIFACTS_DIR, BENCHMARK_DIR_NAME, "data")
+BENCHMARK_FILE_FORMAT:str = "parquet"
+BENCHMARK_N_ROWS:int = 100000
+BENCHMARK_CHUNK_SIZE:int = 100000
+# fraction of feature values left missing, and how far feature distributions move from the seed data (0 to 1)
+BENCHMARK_NAN_RATE:float = 0.0
+BENCHMARK_DRIFT:float = 0.0
+BENCHMARK_RANDOM_SEED:int = 42
+# "file" reads the generated file directly, "mongo" loads it into a collection of MONGO_DB_URI first
+BENCHMARK_SOURCE:str = "file"
+BENCHMARK_COLLECTION_NAME:str = "network_data_benchmark"
+BENCHMARK_STAGES:list = ["data_ingestion", "data_validation", "data_transformation", "model_trainer", "batch_prediction", "prediction_latency"]
+# single-row predictions timed for the latency percentiles
+BENCHMARK_LATENCY_SAMPLES:int = 1000
+# results of every run, appended one JSON line per run
+BENCHMARK_HISTORY_FILE_PATH:str = os.path.join(ARTIFACTS_DIR, BENCHMARK_DIR_NAME, "history.jsonl")
+# a run regresses when a metric is this much worse than the median of the last BENCHMARK_HISTORY_WINDOW comparable runs
+BENCHMARK_REGRESSION_TOLERANCE:float = 0.2
+BENCHMARK_HISTORY_WINDOW:int = 5
+# one earlier run is too noisy a baseline, nothing is reported until this many comparable runs exist
+BENCHMARK_MIN_HISTORY:int = 3
+# stages faster than this are too noisy to compare
+BENCHMARK_MIN_STAGE_SECONDS:float = 0.1
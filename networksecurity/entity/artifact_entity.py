@@ -1,9 +1,24 @@
-from dataclasses import dataclass
+from dataclasses import dataclass, field
+from typing import Any, Optional
+import numpy as np
+import pandas as pd
 
 @dataclass
 class DataIngestionArtifact:
     train_data_path: str
     test_data_path: str
+    # in-memory handles, set when the pipeline runs with in-memory artifacts
+    train_data: Optional[pd.DataFrame] = field(default=None, repr=False)
+    test_data: Optional[pd.DataFrame] = field(default=None, repr=False)
+    
+@dataclass
+class DatasetValidationArtifact:
+    valid_file_path: str
+    # None when every row passed
+    invalid_file_path: Optional[str]
+    # column profile of the valid rows
+    profile: dict = field(repr=False)
+    data: Optional[pd.DataFrame] = field(default=None, repr=False)
     
 @dataclass
 class DataValidationArtifact:
@@ -13,12 +28,24 @@ class DataValidationArtifact:
     invalid_train_file_path: str
     invalid_test_file_path: str
     drift_report_file_path: str
+    reference_profile_file_path: Optional[str] = None
+    reference_drift_report_file_path: Optional[str] = None
+    # False when the data drifted from the reference profile of the serving model
+    reference_drift_status: Optional[bool] = None
+    train_data: Optional[pd.DataFrame] = field(default=None, repr=False)
+    test_data: Optional[pd.DataFrame] = field(default=None, repr=False)
     
 @dataclass
 class DataTransformationArtifact:
     transformed_train_file_path: str
     transformed_test_file_path: str
     transformed_object_file_path: str
+    train_array: Optional[np.ndarray] = field(default=None, repr=False)
+    test_array: Optional[np.ndarray] = field(default=None, repr=False)
+    preprocessor: Optional[Any] = field(default=None, repr=False)
+    # per-column null counts of the input features, before imputation
+    train_null_counts: Optional[dict] = field(default=None, repr=False)
+    test_null_counts: Optional[dict] = field(default=None, repr=False)
 
 @dataclass
 class ClassificationMetricArtifact:
@@ -30,4 +57,22 @@ class ClassificationMetricArtifact:
 class ModelTrainerArtifact:
     trained_model_path: str
     train_metric_artifact: ClassificationMetricArtifact
-    test_metric_artifact: ClassificationMetricArtifact
\ No newline at end of file
+    test_metric_artifact: ClassificationMetricArtifact
+    
+@dataclass
+class BatchPredictionArtifact:
+    # one of the two outputs is set, depending on where the predictions were written
+    output_file_path: Optional[str]
+    output_collection_name: Optional[str]
+    n_rows: int
+    rows_per_second: float
+    
+@dataclass
+class BenchmarkArtifact:
+    run_report_file_path: str
+    history_file_path: str
+    # stage name -> wall_time, cpu_time, peak_rss_bytes, rows_per_second
+    stage_metrics: dict
+    latency_ms: Optional[dict]
+    # metrics worse than the recent history by more than the tolerance, empty when the run is fine
+    regressions: list
@@ -8,30 +8,91 @@ class TrainingPipelineConfig:
         self.artifacts_name = training_pipeline.ARTIFACTS_DIR
         self.timestamp = timestamp
         self.artifact_dir = os.path.join(self.artifacts_name,self.timestamp)
+        self.artifact_file_format = training_pipeline.ARTIFACT_FILE_FORMAT
+        self.in_memory_artifacts = training_pipeline.IN_MEMORY_ARTIFACTS
+        self.artifact_write_behind = training_pipeline.ARTIFACT_WRITE_BEHIND
+        self.stage_cache_enabled = training_pipeline.STAGE_CACHE_ENABLED
+        self.stage_cache_dir = training_pipeline.STAGE_CACHE_DIR
+        self.stage_cache_max_size_bytes = training_pipeline.STAGE_CACHE_MAX_SIZE_BYTES
+        self.saved_model_dir = training_pipeline.SAVED_MODEL_DIR
+        self.run_report_file_path = os.path.join(self.artifact_dir, training_pipeline.RUN_REPORT_FILE_NAME)
+        self.profile_stages = training_pipeline.PROFILE_STAGES
+        self.profile_dir = os.path.join(self.artifact_dir, training_pipeline.PROFILE_DIR_NAME)
+        self.max_workers = training_pipeline.PIPELINE_MAX_WORKERS
+        self.experiment_tracking_enabled = training_pipeline.EXPERIMENT_TRACKING_ENABLED
+        self.state_dir = os.path.join(self.artifact_dir, training_pipeline.PIPELINE_STATE_DIR_NAME)
         
 
+class MongoDBClientConfig:
+    def __init__(self):
+        self.uri = os.getenv(training_pipeline.MONGO_DB_URI_ENV_KEY)
+        self.max_pool_size = training_pipeline.MONGO_DB_MAX_POOL_SIZE
+        self.min_pool_size = training_pipeline.MONGO_DB_MIN_POOL_SIZE
+        self.max_idle_time_ms = training_pipeline.MONGO_DB_MAX_IDLE_TIME_MS
+        self.compressors = training_pipeline.MONGO_DB_COMPRESSORS
+        self.read_preference = training_pipeline.MONGO_DB_READ_PREFERENCE
+        self.connect_timeout_ms = training_pipeline.MONGO_DB_CONNECT_TIMEOUT_MS
+        self.server_selection_timeout_ms = training_pipeline.MONGO_DB_SERVER_SELECTION_TIMEOUT_MS
+        self.app_name = training_pipeline.MONGO_DB_APP_NAME
+
+class ExperimentTrackingConfig:
+    def __init__(self, training_pipeline_config: TrainingPipelineConfig):
+        self.enabled = training_pipeline_config.experiment_tracking_enabled
+        self.tracking_uri = training_pipeline.EXPERIMENT_TRACKING_URI
+        self.experiment_name = training_pipeline.EXPERIMENT_TRACKING_EXPERIMENT_NAME
+        self.run_name = training_pipeline_config.timestamp
+        self.max_queue_size = training_pipeline.EXPERIMENT_TRACKING_MAX_QUEUE_SIZE
+        self.close_timeout = training_pipeline.EXPERIMENT_TRACKING_CLOSE_TIMEOUT
+
 class DataIngestionConfig:
     def __init__(self,training_pipeline_config: TrainingPipelineConfig):
+        file_format = training_pipeline_config.artifact_file_format
         self.data_ingestion_dir = os.path.join(training_pipeline_config.artifact_dir, training_pipeline.DATA_INGESTION_DIR_NAME)
-        self.feature_store_dir = os.path.join(self.data_ingestion_dir, training_pipeline.DATA_INGESTION_FEATURE_STORE_DIR_NAME, training_pipeline.FILE_NAME)
-        self.training_file_path = os.path.join(self.data_ingestion_dir, training_pipeline.DATA_INGESTION_INGESTED_DIR, training_pipeline.TRAIN_FILE_NAME)
-        self.testing_file_path = os.path.join(self.data_ingestion_dir, training_pipeline.DATA_INGESTION_INGESTED_DIR, training_pipeline.TEST_FILE_NAME)
+        self.feature_store_dir = os.path.join(self.data_ingestion_dir, training_pipeline.DATA_INGESTION_FEATURE_STORE_DIR_NAME, training_pipeline.FILE_NAME.replace('csv', file_format))
+        self.training_file_path = os.path.join(self.data_ingestion_dir, training_pipeline.DATA_INGESTION_INGESTED_DIR, training_pipeline.TRAIN_FILE_NAME.replace('csv', file_format))
+        self.testing_file_path = os.path.join(self.data_ingestion_dir, training_pipeline.DATA_INGESTION_INGESTED_DIR, training_pipeline.TEST_FILE_NAME.replace('csv', file_format))
         
         self.train_test_split_ratio = training_pipeline.DATA_INGESTION_TRAIN_TEST_SPLIT_RATIO
         self.database_name = training_pipeline.DATA_INGESTION_DATABASE_NAME
         self.collection_name = training_pipeline.DATA_INGESTION_COLLECTION_NAME
-        
+        self.row_hash_field = training_pipeline.DATA_INGESTION_ROW_HASH_FIELD
+        self.keep_in_memory = training_pipeline_config.in_memory_artifacts
+
+        self.streaming = training_pipeline.DATA_INGESTION_STREAMING
+        self.batch_size = training_pipeline.DATA_INGESTION_BATCH_SIZE
+        self.chunk_dtype = training_pipeline.DATA_INGESTION_CHUNK_DTYPE
+
+        self.incremental = training_pipeline.DATA_INGESTION_INCREMENTAL
+        self.cumulative_dir = training_pipeline.DATA_INGESTION_CUMULATIVE_DIR
+        self.cumulative_feature_store_file_path = os.path.join(self.cumulative_dir, training_pipeline.FILE_NAME.replace('csv', file_format))
+        self.cumulative_training_file_path = os.path.join(self.cumulative_dir, training_pipeline.TRAIN_FILE_NAME.replace('csv', file_format))
+        self.cumulative_testing_file_path = os.path.join(self.cumulative_dir, training_pipeline.TEST_FILE_NAME.replace('csv', file_format))
+        self.checkpoint_file_path = os.path.join(self.cumulative_dir, training_pipeline.DATA_INGESTION_CHECKPOINT_FILE_NAME)
+        self.cumulative_parts_dir = os.path.join(self.cumulative_dir, training_pipeline.DATA_INGESTION_CUMULATIVE_PARTS_DIR_NAME)
+        self.part_object_ids_file_name = training_pipeline.DATA_INGESTION_PART_OBJECT_IDS_FILE_NAME
+        self.checkpoint_safety_window_seconds = training_pipeline.DATA_INGESTION_CHECKPOINT_SAFETY_WINDOW_SECONDS
+
 class DataValidationConfig:
     def __init__(self, training_pipeline_config: TrainingPipelineConfig):
+        file_format = training_pipeline_config.artifact_file_format
         self.data_validation_dir = os.path.join(training_pipeline_config.artifact_dir, training_pipeline.DATA_VALIDATION_DIR_NAME)
         self.validated_dir = os.path.join(self.data_validation_dir, training_pipeline.DATA_VALIDATION_VALID_DIR)
         self.invalid_dir = os.path.join(self.data_validation_dir, training_pipeline.DATA_VALIDATION_INVALID_DIR)
         self.drift_report_dir = os.path.join(self.data_validation_dir, training_pipeline.DATA_VALIDATION_DRIFT_REPORT_DIR)
         self.drift_report_file_path = os.path.join(self.drift_report_dir, training_pipeline.DATA_VALIDATION_DRIFT_REPORT_FILE_NAME)
-        self.valid_training_file_path = os.path.join(self.validated_dir, training_pipeline.TRAIN_FILE_NAME)
-        self.valid_testing_file_path = os.path.join(self.validated_dir, training_pipeline.TEST_FILE_NAME)
-        self.invalid_training_file_path = os.path.join(self.invalid_dir, training_pipeline.TRAIN_FILE_NAME)
-        self.invalid_testing_file_path = os.path.join(self.invalid_dir, training_pipeline.TEST_FILE_NAME)
+        self.valid_training_file_path = os.path.join(self.validated_dir, training_pipeline.TRAIN_FILE_NAME.replace('csv', file_format))
+        self.valid_testing_file_path = os.path.join(self.validated_dir, training_pipeline.TEST_FILE_NAME.replace('csv', file_format))
+        self.invalid_training_file_path = os.path.join(self.invalid_dir, training_pipeline.TRAIN_FILE_NAME.replace('csv', file_format))
+        self.invalid_testing_file_path = os.path.join(self.invalid_dir, training_pipeline.TEST_FILE_NAME.replace('csv', file_format))
+        self.chunk_size = training_pipeline.DATA_VALIDATION_CHUNK_SIZE
+        self.drift_metrics = training_pipeline.DATA_VALIDATION_DRIFT_METRICS
+        self.ks_method = training_pipeline.DATA_VALIDATION_KS_METHOD
+        self.reference_profile_file_path = os.path.join(self.data_validation_dir, training_pipeline.REFERENCE_PROFILE_FILE_NAME)
+        self.reference_drift_report_file_path = os.path.join(self.data_validation_dir, training_pipeline.DATA_VALIDATION_REFERENCE_DRIFT_REPORT_FILE_NAME)
+        self.reference_drift_threshold = training_pipeline.DATA_VALIDATION_REFERENCE_DRIFT_THRESHOLD
+        # profile saved with the last published model, compared against when it exists
+        self.baseline_profile_file_path = os.path.join(training_pipeline_config.saved_model_dir, training_pipeline.REFERENCE_PROFILE_FILE_NAME)
+        self.keep_in_memory = training_pipeline_config.in_memory_artifacts
         
         
 class DataTransformationConfig:
@@ -40,6 +101,8 @@ class DataTransformationConfig:
         self.transformed_train_file_path = os.path.join(self.data_transformation_dir, training_pipeline.DATA_TRANSFORMATION_TRANSFORMED_DATA_DIR, training_pipeline.TRAIN_FILE_NAME.replace('csv','npy'))
         self.transformed_test_file_path = os.path.join(self.data_transformation_dir, training_pipeline.DATA_TRANSFORMATION_TRANSFORMED_DATA_DIR, training_pipeline.TEST_FILE_NAME.replace('csv','npy'))
         self.transformed_object_file_path = os.path.join(self.data_transformation_dir, training_pipeline.DATA_TRANSFORMATION_TRANSFORMED_OBJECT_DIR, training_pipeline.PREPROCESSING_OBJECT_FILE_NAME)
+        self.compact_arrays = training_pipeline.DATA_TRANSFORMATION_COMPACT_ARRAYS
+        self.keep_in_memory = training_pipeline_config.in_memory_artifacts
         
 class ModelTrainerConfig:
     def __init__(self, training_pipeline_config: TrainingPipelineConfig):
@@ -47,4 +110,67 @@ class ModelTrainerConfig:
         self.trained_model_file_path = os.path.join(self.model_trainer_dir, training_pipeline.MODEL_TRAINER_TRAINED_MODEL_DIR, training_pipeline.MODEL_TRAINER_TRAINED_MODEL_FILE_NAME)
         self.expected_score = training_pipeline.TRAINED_MODEL_EXPECTED_SCORE
         self.overfitting_underfitting_threshold = training_pipeline.MODEL_TRAINER_OVERFITTING_UNDERFITTING_THRESHOLD
-        
\ No newline at end of file
+        self.mmap_mode = training_pipeline.MODEL_TRAINER_MMAP_MODE
+        self.reference_profile_file_path = os.path.join(os.path.dirname(self.trained_model_file_path), training_pipeline.REFERENCE_PROFILE_FILE_NAME)
+        self.saved_model_file_path = os.path.join(training_pipeline_config.saved_model_dir, training_pipeline.MODEL_FILE_NAME)
+        self.saved_reference_profile_file_path = os.path.join(training_pipeline_config.saved_model_dir, training_pipeline.REFERENCE_PROFILE_FILE_NAME)
+        
+        self.search_strategy = training_pipeline.MODEL_TRAINER_SEARCH_STRATEGY
+        self.search_cv = training_pipeline.MODEL_TRAINER_SEARCH_CV
+        self.search_n_jobs = training_pipeline.MODEL_TRAINER_SEARCH_N_JOBS
+        self.search_n_iter = training_pipeline.MODEL_TRAINER_SEARCH_N_ITER
+        self.search_halving_factor = training_pipeline.MODEL_TRAINER_SEARCH_HALVING_FACTOR
+        self.search_shared_memory = training_pipeline.MODEL_TRAINER_SEARCH_SHARED_MEMORY
+        self.compile_model = training_pipeline.MODEL_TRAINER_COMPILE_MODEL
+        self.publish_on_reference_drift = training_pipeline.MODEL_TRAINER_PUBLISH_ON_REFERENCE_DRIFT
+        self.training_mode = training_pipeline.MODEL_TRAINER_TRAINING_MODE
+        self.incremental_chunk_size = training_pipeline.MODEL_TRAINER_INCREMENTAL_CHUNK_SIZE
+        self.incremental_epochs = training_pipeline.MODEL_TRAINER_INCREMENTAL_EPOCHS
+        self.incremental_validation_fraction = training_pipeline.MODEL_TRAINER_INCREMENTAL_VALIDATION_FRACTION
+        
+class BatchPredictionConfig:
+    def __init__(self, training_pipeline_config: TrainingPipelineConfig):
+        self.batch_prediction_dir = os.path.join(training_pipeline_config.artifact_dir, training_pipeline.BATCH_PREDICTION_DIR_NAME)
+        self.model_file_path = training_pipeline.BATCH_PREDICTION_MODEL_FILE_PATH
+        self.input_file_path = training_pipeline.BATCH_PREDICTION_INPUT_FILE_PATH
+        self.output_file_path = os.path.join(self.batch_prediction_dir, training_pipeline.BATCH_PREDICTION_OUTPUT_FILE_NAME)
+        self.database_name = training_pipeline.DATA_INGESTION_DATABASE_NAME
+        self.input_collection_name = training_pipeline.BATCH_PREDICTION_INPUT_COLLECTION_NAME
+        self.output_collection_name = training_pipeline.BATCH_PREDICTION_OUTPUT_COLLECTION_NAME
+        self.row_hash_field = training_pipeline.DATA_INGESTION_ROW_HASH_FIELD
+        self.prediction_column = training_pipeline.BATCH_PREDICTION_PREDICTION_COLUMN
+        self.read_preference = training_pipeline.BATCH_PREDICTION_READ_PREFERENCE
+        self.chunk_size = training_pipeline.BATCH_PREDICTION_CHUNK_SIZE
+        self.n_workers = training_pipeline.BATCH_PREDICTION_N_WORKERS
+        
+class PredictionServerConfig:
+    def __init__(self):
+        self.model_file_path = os.path.join(training_pipeline.SAVED_MODEL_DIR, training_pipeline.MODEL_FILE_NAME)
+        self.host = training_pipeline.PREDICTION_SERVER_HOST
+        self.port = training_pipeline.PREDICTION_SERVER_PORT
+        self.max_batch_size = training_pipeline.PREDICTION_SERVER_MAX_BATCH_SIZE
+        self.max_wait_ms = training_pipeline.PREDICTION_SERVER_MAX_WAIT_MS
+        self.reload_interval = training_pipeline.PREDICTION_SERVER_RELOAD_INTERVAL
+        self.latency_window = training_pipeline.PREDICTION_SERVER_LATENCY_WINDOW
+
+class BenchmarkConfig:
+    def __init__(self, training_pipeline_config: TrainingPipelineConfig):
+        self.benchmark_dir = training_pipeline_config.artifact_dir
+        self.seed_file_path = training_pipeline.BENCHMARK_SEED_FILE_PATH
+        self.data_dir = training_pipeline.BENCHMARK_DATA_DIR
+        self.file_format = training_pipeline.BENCHMARK_FILE_FORMAT
+        self.n_rows = training_pipeline.BENCHMARK_N_ROWS
+        self.chunk_size = training_pipeline.BENCHMARK_CHUNK_SIZE
+        self.nan_rate = training_pipeline.BENCHMARK_NAN_RATE
+        self.drift = training_pipeline.BENCHMARK_DRIFT
+        self.random_seed = training_pipeline.BENCHMARK_RANDOM_SEED
+        self.source = training_pipeline.BENCHMARK_SOURCE
+        self.collection_name = training_pipeline.BENCHMARK_COLLECTION_NAME
+        self.stages = list(training_pipeline.BENCHMARK_STAGES)
+        self.latency_samples = training_pipeline.BENCHMARK_LATENCY_SAMPLES
+        self.history_file_path = training_pipeline.BENCHMARK_HISTORY_FILE_PATH
+        self.regression_tolerance = training_pipeline.BENCHMARK_REGRESSION_TOLERANCE
+        self.history_window = training_pipeline.BENCHMARK_HISTORY_WINDOW
+        self.min_history = training_pipeline.BENCHMARK_MIN_HISTORY
+        self.min_stage_seconds = training_pipeline.BENCHMARK_MIN_STAGE_SECONDS
+        self.predictions_file_path = os.path.join(self.benchmark_dir, training_pipeline.BATCH_PREDICTION_DIR_NAME, training_pipeline.BATCH_PREDICTION_OUTPUT_FILE_NAME)
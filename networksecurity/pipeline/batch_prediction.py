@@ -0,0 +1,27 @@
+from networksecurity.logging import logger
+from networksecurity.exception import NetworkSecurityException
+from networksecurity.components.batch_prediction import BatchPrediction
+from networksecurity.entity.config_entity import TrainingPipelineConfig, BatchPredictionConfig
+from networksecurity.entity.artifact_entity import BatchPredictionArtifact
+
+import sys
+
+
+class BatchPredictionPipeline:
+    """
+    Scores a file or Mongo collection offline with the published model.
+    """
+    def __init__(self, batch_prediction_config: BatchPredictionConfig = None):
+        try:
+            self.batch_prediction_config = batch_prediction_config or BatchPredictionConfig(TrainingPipelineConfig())
+        except Exception as e:
+            raise NetworkSecurityException(e, sys)
+
+    def run_pipeline(self) -> BatchPredictionArtifact:
+        try:
+            logger.info("Starting batch prediction...")
+            batch_prediction_artifact = BatchPrediction(self.batch_prediction_config).initiate_batch_prediction()
+            logger.info("Batch prediction completed successfully.")
+            return batch_prediction_artifact
+        except Exception as e:
+            raise NetworkSecurityException(e, sys)
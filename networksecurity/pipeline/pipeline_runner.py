@@ -0,0 +1,166 @@
+from networksecurity.logging import logger
+from networksecurity.exception import NetworkSecurityException
+from networksecurity.utils.main_utils.utils import read_yaml_file, write_yaml_file, save_object, load_object, ArtifactWriter
+from networksecurity.utils.main_utils.instrumentation import RunInstrumentation
+
+import os
+import sys
+import threading
+import dataclasses
+from dataclasses import dataclass, field
+from typing import Callable, List
+from concurrent.futures import ThreadPoolExecutor, FIRST_COMPLETED, wait
+
+STATE_FILE_NAME: str = "state.yaml"
+# values a checkpointed artifact keeps, anything else (DataFrames, arrays, fitted objects) is an in-memory handle
+CHECKPOINT_VALUE_TYPES: tuple = (str, int, float, bool, dict, list, type(None))
+
+
+@dataclass
+class PipelineStage:
+    name: str
+    # called with the outputs of `depends_on`, in that order
+    fn: Callable
+    depends_on: List[str] = field(default_factory=list)
+
+
+def strip_in_memory_handles(output):
+    """
+    The artifact without its in-memory handles (optional fields holding DataFrames, arrays or fitted objects),
+    which the next stage then reads back from the artifact's files.
+    """
+    if dataclasses.is_dataclass(output) and not isinstance(output, type):
+        changes = {}
+        for artifact_field in dataclasses.fields(output):
+            value = getattr(output, artifact_field.name)
+            if artifact_field.default is None and not isinstance(value, CHECKPOINT_VALUE_TYPES):
+                changes[artifact_field.name] = None
+            elif dataclasses.is_dataclass(value):
+                changes[artifact_field.name] = strip_in_memory_handles(value)
+        return dataclasses.replace(output, **changes)
+    return output
+
+
+class PipelineRunner:
+    """
+    Runs a DAG of stages, each stage starting as soon as the stages it depends on have finished, so independent
+    stages overlap on a pool of `max_workers` threads.
+    The output artifact of every finished stage is checkpointed under `state_dir`. A run resumed from that dir
+    skips the stages that already completed and starts again from the one that failed.
+    When the stages write their files behind on `artifact_writer`, a checkpoint is only recorded once the
+    writes queued before it are on disk.
+    """
+    def __init__(self, stages: List[PipelineStage], state_dir: str, max_workers: int,
+                 instrumentation: RunInstrumentation = None, artifact_writer: ArtifactWriter = None):
+        try:
+            self.stages = {stage.name: stage for stage in stages}
+            self.state_dir = state_dir
+            self.state_file_path = os.path.join(state_dir, STATE_FILE_NAME)
+            self.max_workers = max_workers
+            self.instrumentation = instrumentation
+            self.artifact_writer = artifact_writer or ArtifactWriter()
+            self.state = {}
+            self._state_lock = threading.Lock()
+            self.validate_stages(stages)
+        except Exception as e:
+            raise NetworkSecurityException(e, sys)
+
+    @staticmethod
+    def validate_stages(stages: List[PipelineStage]) -> None:
+        names = [stage.name for stage in stages]
+        if len(set(names)) != len(names):
+            raise ValueError(f"Duplicate stage names in {names}")
+        for stage in stages:
+            unknown = set(stage.depends_on) - set(names)
+            if unknown:
+                raise ValueError(f"Stage {stage.name} depends on unknown stages {sorted(unknown)}")
+
+        # Kahn's algorithm, whatever is never ready sits on a cycle
+        remaining = {stage.name: set(stage.depends_on) for stage in stages}
+        while remaining:
+            ready = [name for name, depends_on in remaining.items() if not depends_on]
+            if not ready:
+                raise ValueError(f"Stages {sorted(remaining)} form a dependency cycle")
+            for name in ready:
+                del remaining[name]
+            for depends_on in remaining.values():
+                depends_on.difference_update(ready)
+
+    def get_checkpoint_file_path(self, name: str) -> str:
+        return os.path.join(self.state_dir, f"{name}.pkl")
+
+    def update_state(self, name: str, status: str) -> None:
+        with self._state_lock:
+            self.state[name] = status
+            write_yaml_file(self.state_file_path, dict(self.state), replace=True)
+
+    def load_completed_outputs(self) -> dict:
+        """
+        Outputs of the stages a previous attempt of this run completed.
+        """
+        try:
+            if not os.path.exists(self.state_file_path):
+                return {}
+            self.state = read_yaml_file(self.state_file_path) or {}
+            outputs = {}
+            for name, status in self.state.items():
+                if status == "completed" and name in self.stages:
+                    outputs[name] = load_object(self.get_checkpoint_file_path(name), mmap_mode=None)
+                    logger.info(f"Resuming with the checkpointed output of stage {name}")
+            return outputs
+        except Exception as e:
+            raise NetworkSecurityException(e, sys)
+
+    def checkpoint(self, name: str, output) -> None:
+        save_object(self.get_checkpoint_file_path(name), strip_in_memory_handles(output))
+        self.update_state(name, "completed")
+
+    def run_stage(self, stage: PipelineStage, inputs: list):
+        if self.instrumentation is None:
+            return stage.fn(*inputs)
+        with self.instrumentation.stage(stage.name):
+            return stage.fn(*inputs)
+
+    def run(self, resume: bool = False) -> dict:
+        """
+        Runs every stage that has not completed yet and returns the outputs of all stages by name.
+        After a failure the stages already running are allowed to finish (and are checkpointed) before
+        the first error is raised.
+        """
+        try:
+            outputs = self.load_completed_outputs() if resume else {}
+            if not resume:
+                self.state = {}
+            pending = [name for name in self.stages if name not in outputs]
+            running = {}
+            error = None
+            with ThreadPoolExecutor(max_workers=self.max_workers, thread_name_prefix="pipeline-stage") as thread_pool:
+                while pending or running:
+                    if error is None:
+                        for name in [name for name in pending if all(dependency in outputs for dependency in self.stages[name].depends_on)]:
+                            stage = self.stages[name]
+                            pending.remove(name)
+                            self.update_state(name, "running")
+                            inputs = [outputs[dependency] for dependency in stage.depends_on]
+                            running[thread_pool.submit(self.run_stage, stage, inputs)] = name
+                    if not running:
+                        break
+
+                    done, _ = wait(running, return_when=FIRST_COMPLETED)
+                    for future in done:
+                        name = running.pop(future)
+                        try:
+                            outputs[name] = future.result()
+                        except Exception as e:
+                            self.update_state(name, "failed")
+                            logger.error(f"Stage {name} failed: {e}")
+                            error = error or e
+                            continue
+                        # record the stage once the files it queued are written
+                        self.artifact_writer.submit_after(list(self.artifact_writer.futures), self.checkpoint, name, outputs[name])
+
+            if error is not None:
+                raise error
+            return outputs
+        except Exception as e:
+            raise NetworkSecurityException(e, sys)
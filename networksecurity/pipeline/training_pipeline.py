@@ -0,0 +1,206 @@
+from networksecurity.logging import logger
+from networksecurity.exception import NetworkSecurityException
+from networksecurity.components.data_ingestion import DataIngestion
+from networksecurity.components.data_validation import DataValidation
+from networksecurity.components.data_transformation import DataTransformation
+from networksecurity.components.model_trainer import ModelTrainer
+from networksecurity.entity.config_entity import (TrainingPipelineConfig,
+                                                  DataIngestionConfig,
+                                                  DataValidationConfig,
+                                                  DataTransformationConfig,
+                                                  ModelTrainerConfig,
+                                                  ExperimentTrackingConfig)
+from networksecurity.entity.artifact_entity import (DataIngestionArtifact,
+                                                    DatasetValidationArtifact,
+                                                    DataValidationArtifact,
+                                                    DataTransformationArtifact,
+                                                    ModelTrainerArtifact)
+from networksecurity.utils.main_utils.utils import ArtifactWriter
+from networksecurity.utils.main_utils.stage_cache import StageCache
+from networksecurity.utils.main_utils.instrumentation import RunInstrumentation
+from networksecurity.utils.ml_utils.tracking.experiment_tracker import ExperimentTracker
+from networksecurity.pipeline.pipeline_runner import PipelineRunner, PipelineStage
+
+import os
+import sys
+import shutil
+
+
+class TrainingPipeline:
+    """
+    Runs ingestion, validation, transformation, model training and publishing as a DAG of stages. The train and
+    test sets are validated concurrently, every other stage starts as soon as its inputs are ready.
+    With in-memory artifacts each stage hands its DataFrames/arrays straight to the next one and the
+    artifact files are written behind on a background thread.
+    Every stage is measured and the run report (run_report.json) is written to the artifact dir. A failed run
+    can be resumed with the same timestamp, from the stage that failed; the resumed attempt extends the run report.
+    """
+    def __init__(self, training_pipeline_config: TrainingPipelineConfig = None):
+        try:
+            self.training_pipeline_config = training_pipeline_config or TrainingPipelineConfig()
+            write_behind = self.training_pipeline_config.in_memory_artifacts and self.training_pipeline_config.artifact_write_behind
+            self.artifact_writer = ArtifactWriter(write_behind=write_behind)
+            self.stage_cache = None
+            if self.training_pipeline_config.stage_cache_enabled:
+                self.stage_cache = StageCache(self.training_pipeline_config.stage_cache_dir,
+                                              self.training_pipeline_config.stage_cache_max_size_bytes)
+            self.instrumentation = RunInstrumentation(
+                self.training_pipeline_config.run_report_file_path,
+                self.training_pipeline_config.profile_dir if self.training_pipeline_config.profile_stages else None)
+            self.experiment_tracking_config = ExperimentTrackingConfig(self.training_pipeline_config)
+            self.tracker = None
+            if self.experiment_tracking_config.enabled:
+                self.tracker = ExperimentTracker(self.experiment_tracking_config.tracking_uri, self.experiment_tracking_config.experiment_name,
+                                                 self.experiment_tracking_config.run_name, self.experiment_tracking_config.max_queue_size)
+        except Exception as e:
+            raise NetworkSecurityException(e, sys)
+
+    def start_data_ingestion(self) -> DataIngestionArtifact:
+        try:
+            data_ingestion_config = DataIngestionConfig(self.training_pipeline_config)
+            data_ingestion = DataIngestion(data_ingestion_config, artifact_writer=self.artifact_writer)
+
+            logger.info("Starting data ingestion process...")
+            data_ingestion_artifact = data_ingestion.initiate_data_ingestion()
+            logger.info("Data ingestion process completed successfully.")
+            return data_ingestion_artifact
+        except Exception as e:
+            raise NetworkSecurityException(e, sys)
+
+    def start_data_validation(self, data_ingestion_artifact: DataIngestionArtifact) -> DataValidationArtifact:
+        try:
+            data_validation_config = DataValidationConfig(self.training_pipeline_config)
+            data_validation = DataValidation(data_validation_config, self.training_pipeline_config, artifact_writer=self.artifact_writer)
+
+            logger.info("Starting data validation process...")
+            data_validation_artifact = data_validation.initiate_data_validation(data_ingestion_artifact)
+            logger.info("Data validation process completed successfully.")
+            return data_validation_artifact
+        except Exception as e:
+            raise NetworkSecurityException(e, sys)
+
+    def get_data_validation(self) -> DataValidation:
+        return DataValidation(DataValidationConfig(self.training_pipeline_config), self.training_pipeline_config,
+                              artifact_writer=self.artifact_writer)
+
+    def start_train_validation(self, data_ingestion_artifact: DataIngestionArtifact) -> DatasetValidationArtifact:
+        try:
+            return self.get_data_validation().validate_train_data(data_ingestion_artifact)
+        except Exception as e:
+            raise NetworkSecurityException(e, sys)
+
+    def start_test_validation(self, data_ingestion_artifact: DataIngestionArtifact) -> DatasetValidationArtifact:
+        try:
+            return self.get_data_validation().validate_test_data(data_ingestion_artifact)
+        except Exception as e:
+            raise NetworkSecurityException(e, sys)
+
+    def start_drift_detection(self, train_validation_artifact: DatasetValidationArtifact,
+                              test_validation_artifact: DatasetValidationArtifact) -> DataValidationArtifact:
+        try:
+            data_validation_artifact = self.get_data_validation().detect_drift(train_validation_artifact, test_validation_artifact)
+            logger.info("Data validation process completed successfully.")
+            return data_validation_artifact
+        except Exception as e:
+            raise NetworkSecurityException(e, sys)
+
+    def start_data_transformation(self, data_validation_artifact: DataValidationArtifact) -> DataTransformationArtifact:
+        try:
+            data_transformation_config = DataTransformationConfig(self.training_pipeline_config)
+            data_transformation = DataTransformation(data_validation_artifact, data_transformation_config,
+                                                     artifact_writer=self.artifact_writer, stage_cache=self.stage_cache)
+
+            logger.info("Starting data transformation process...")
+            data_transformation_artifact = data_transformation.initiate_data_transformation()
+            logger.info("Data transformation process completed successfully.")
+            return data_transformation_artifact
+        except Exception as e:
+            raise NetworkSecurityException(e, sys)
+
+    def start_model_trainer(self, data_transformation_artifact: DataTransformationArtifact) -> ModelTrainerArtifact:
+        try:
+            model_trainer_config = ModelTrainerConfig(self.training_pipeline_config)
+            model_trainer = ModelTrainer(model_trainer_config, data_transformation_artifact,
+                                         artifact_writer=self.artifact_writer, stage_cache=self.stage_cache, tracker=self.tracker)
+
+            logger.info("Starting model training process...")
+            model_trainer_artifact = model_trainer.initiate_model_trainer()
+            logger.info("Model training process completed successfully.")
+            return model_trainer_artifact
+        except Exception as e:
+            raise NetworkSecurityException(e, sys)
+
+    def publish_model(self, data_validation_artifact: DataValidationArtifact, model_trainer_artifact: ModelTrainerArtifact) -> None:
+        """
+        Saves the reference profile next to the trained model and publishes both to the saved model dir,
+        where the next validation run picks the profile up as its drift baseline.
+        Nothing is published when the data drifted from the reference profile of the serving model, unless the
+        config allows it. Drift between the train and test sets is only logged.
+        """
+        try:
+            model_trainer_config = ModelTrainerConfig(self.training_pipeline_config)
+            if data_validation_artifact.reference_drift_status is False and not model_trainer_config.publish_on_reference_drift:
+                logger.warning(f"Data drifted from the reference profile (see {data_validation_artifact.reference_drift_report_file_path}), "
+                               f"the trained model is not published and the serving model in {self.training_pipeline_config.saved_model_dir} is kept")
+                return
+            if not data_validation_artifact.validation_status:
+                logger.warning(f"Data validation reported drift (see {data_validation_artifact.drift_report_file_path}), publishing the model anyway")
+            # the model and profile may still be written behind
+            self.artifact_writer.wait()
+            
+            shutil.copyfile(data_validation_artifact.reference_profile_file_path, model_trainer_config.reference_profile_file_path)
+            os.makedirs(self.training_pipeline_config.saved_model_dir, exist_ok=True)
+            # copy then rename, so a running prediction server never loads a half-written model
+            for source, destination in ((model_trainer_config.reference_profile_file_path, model_trainer_config.saved_reference_profile_file_path),
+                                        (model_trainer_artifact.trained_model_path, model_trainer_config.saved_model_file_path)):
+                shutil.copyfile(source, destination + ".tmp")
+                os.replace(destination + ".tmp", destination)
+            logger.info(f"Published model and reference profile to {self.training_pipeline_config.saved_model_dir}")
+        except Exception as e:
+            raise NetworkSecurityException(e, sys)
+
+    def get_stages(self) -> list:
+        return [
+            PipelineStage("data_ingestion", self.start_data_ingestion),
+            PipelineStage("train_validation", self.start_train_validation, ["data_ingestion"]),
+            PipelineStage("test_validation", self.start_test_validation, ["data_ingestion"]),
+            PipelineStage("data_validation", self.start_drift_detection, ["train_validation", "test_validation"]),
+            PipelineStage("data_transformation", self.start_data_transformation, ["data_validation"]),
+            PipelineStage("model_trainer", self.start_model_trainer, ["data_transformation"]),
+            PipelineStage("publish_model", self.publish_model, ["data_validation", "model_trainer"]),
+        ]
+
+    def run_pipeline(self, resume: bool = False) -> ModelTrainerArtifact:
+        """
+        Runs the stages, or with `resume` only those that did not complete in an earlier attempt of this run.
+        """
+        try:
+            if resume:
+                self.instrumentation.load_report()
+            runner = PipelineRunner(self.get_stages(), self.training_pipeline_config.state_dir, self.training_pipeline_config.max_workers,
+                                    instrumentation=self.instrumentation, artifact_writer=self.artifact_writer)
+            outputs = runner.run(resume=resume)
+            for name in ("data_ingestion", "data_validation", "data_transformation", "model_trainer"):
+                print(f"{name} completed. Artifacts: {outputs[name]}")
+
+            return outputs["model_trainer"]
+        except Exception as e:
+            raise NetworkSecurityException(e, sys)
+        finally:
+            # make sure every write-behind artifact is on disk before the run is reported as done
+            try:
+                self.artifact_writer.shutdown()
+            finally:
+                self.close_tracker()
+
+    def close_tracker(self) -> None:
+        """
+        Attaches the run report to the tracked run and waits for the tracker to send what is still queued.
+        """
+        try:
+            if self.tracker is not None:
+                if os.path.exists(self.training_pipeline_config.run_report_file_path):
+                    self.tracker.log_artifact(self.training_pipeline_config.run_report_file_path)
+                self.tracker.close(self.experiment_tracking_config.close_timeout)
+        except Exception as e:
+            raise NetworkSecurityException(e, sys)
@@ -0,0 +1,306 @@
+from networksecurity.logging import logger
+from networksecurity.exception import NetworkSecurityException
+from networksecurity.entity.config_entity import PredictionServerConfig
+from networksecurity.utils.main_utils.utils import load_object
+
+import os
+import sys
+import json
+import time
+import queue
+import threading
+import numpy as np
+import pandas as pd
+from collections import deque
+from concurrent.futures import Future
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+
+def to_feature_frame(rows: list, feature_names) -> pd.DataFrame:
+    """
+    The request rows as a numeric DataFrame in the model's column order. null and "na" values are missing values
+    the model imputes; a row without one of the feature fields or with a non-numeric value raises ValueError.
+    """
+    if feature_names is not None:
+        for index, row in enumerate(rows):
+            missing = [name for name in feature_names if name not in row]
+            if missing:
+                raise ValueError(f"Row {index} is missing the feature fields {missing}")
+    features = pd.DataFrame.from_records(rows, columns=feature_names).replace({"na": np.nan})
+    numeric = features.apply(pd.to_numeric, errors="coerce")
+    not_numeric = numeric.isna().to_numpy() & features.notna().to_numpy()
+    if not_numeric.any():
+        index, column = np.argwhere(not_numeric)[0]
+        raise ValueError(f"Row {index} has a non-numeric value {features.iat[index, column]!r} for {features.columns[column]}")
+    return numeric
+
+
+class ModelStore:
+    """
+    Holds the served NetworkModel. It is loaded once at start-up and swapped in place when the model file changes,
+    so requests never wait on a load. A model that fails to load (e.g. a file still being copied) is retried on
+    the next check while the current model keeps serving.
+    """
+    def __init__(self, model_file_path: str, reload_interval: float):
+        try:
+            self.model_file_path = model_file_path
+            self.reload_interval = reload_interval
+            self.model = None
+            self.version = None
+            self.feature_names = None
+            self._stop = threading.Event()
+            self._watcher = None
+            self.load()
+        except Exception as e:
+            raise NetworkSecurityException(e, sys)
+
+    def _file_version(self) -> tuple:
+        stat = os.stat(self.model_file_path)
+        return stat.st_mtime_ns, stat.st_size
+
+    def load(self) -> None:
+        version = self._file_version()
+        model = load_object(self.model_file_path)
+        # training verbosity would print progress on every micro-batch; a compiled model never calls sklearn
+        if getattr(model, "compiled_model", None) is None and "verbose" in model.model.get_params():
+            model.model.set_params(verbose=0)
+        # a single reference swap, requests in flight finish on the model they started with
+        self.model, self.version = model, version
+        self.feature_names = getattr(model.preprocessor, "feature_names_in_", None)
+        logger.info(f"Loaded model {self.model_file_path} (version {version[0]})")
+
+    def reload_if_changed(self) -> bool:
+        try:
+            if self._file_version() == self.version:
+                return False
+            self.load()
+            return True
+        except Exception as e:
+            logger.warning(f"Model reload failed, keeping the current model: {e}")
+            return False
+
+    def _watch(self) -> None:
+        while not self._stop.wait(self.reload_interval):
+            self.reload_if_changed()
+
+    def start(self) -> None:
+        self._watcher = threading.Thread(target=self._watch, name="model-watcher", daemon=True)
+        self._watcher.start()
+
+    def stop(self) -> None:
+        self._stop.set()
+        if self._watcher is not None:
+            self._watcher.join()
+
+
+class MicroBatcher:
+    """
+    Coalesces concurrent prediction requests into one predict call.
+    A background thread takes the first queued request, then keeps collecting requests until the batch holds
+    `max_batch_size` rows or `max_wait_ms` has passed, and runs the whole batch through the model at once.
+    """
+    def __init__(self, model_store: ModelStore, max_batch_size: int, max_wait_ms: float):
+        self.model_store = model_store
+        self.max_batch_size = max_batch_size
+        self.max_wait = max_wait_ms / 1000
+        self.requests = queue.Queue()
+        self.n_batches = 0
+        self.n_rows = 0
+        self._thread = None
+
+    def start(self) -> None:
+        self._thread = threading.Thread(target=self._run, name="micro-batcher", daemon=True)
+        self._thread.start()
+
+    def stop(self) -> None:
+        self.requests.put(None)
+        if self._thread is not None:
+            self._thread.join()
+
+    def predict(self, features: pd.DataFrame) -> list:
+        """
+        Queues the rows of one request (see to_feature_frame) and blocks until their predictions are ready.
+        """
+        future = Future()
+        self.requests.put((features, future))
+        return future.result()
+
+    def _collect(self, first) -> tuple:
+        batch, n_rows = [first], len(first[0])
+        deadline = time.perf_counter() + self.max_wait
+        while n_rows < self.max_batch_size:
+            remaining = deadline - time.perf_counter()
+            if remaining <= 0:
+                break
+            try:
+                item = self.requests.get(timeout=remaining)
+            except queue.Empty:
+                break
+            if item is None:
+                return batch, True
+            batch.append(item)
+            n_rows += len(item[0])
+        return batch, False
+
+    def _run(self) -> None:
+        stopping = False
+        while not stopping:
+            first = self.requests.get()
+            if first is None:
+                break
+            batch, stopping = self._collect(first)
+
+            model = self.model_store.model
+            try:
+                features = pd.concat([request_features for request_features, _ in batch], ignore_index=True)
+                predictions = model.predict(features).tolist()
+            except Exception as e:
+                # one bad request must not fail the others coalesced with it, retry them one by one
+                logger.warning(f"Batch of {len(batch)} requests failed ({e}), predicting them one by one")
+                for request_features, future in batch:
+                    try:
+                        future.set_result(model.predict(request_features).tolist())
+                    except Exception as request_error:
+                        future.set_exception(request_error)
+                continue
+
+            self.n_batches += 1
+            self.n_rows += len(features)
+            start = 0
+            for request_features, future in batch:
+                future.set_result(predictions[start:start + len(request_features)])
+                start += len(request_features)
+
+
+class LatencyTracker:
+    """
+    Request latencies over a sliding window, summarized as p50/p99.
+    """
+    def __init__(self, window: int):
+        self.latencies = deque(maxlen=window)
+        self.count = 0
+        self._lock = threading.Lock()
+
+    def record(self, seconds: float) -> None:
+        with self._lock:
+            self.latencies.append(seconds)
+            self.count += 1
+
+    def summary(self) -> dict:
+        with self._lock:
+            latencies = np.array(self.latencies)
+            count = self.count
+        if latencies.size == 0:
+            return {"requests": count, "p50_ms": None, "p99_ms": None}
+        p50, p99 = np.percentile(latencies, [50, 99]) * 1000
+        return {"requests": count, "p50_ms": round(float(p50), 3), "p99_ms": round(float(p99), 3)}
+
+
+class PredictionRequestHandler(BaseHTTPRequestHandler):
+    """
+    POST /predict with one row ({"feature": value, ...}) or {"instances": [row, ...]};
+    GET /metrics for latency percentiles and batching stats, GET /health for liveness.
+    """
+    server_version = "NetworkSecurityPredictionServer/0.1"
+    protocol_version = "HTTP/1.1"
+
+    def _send_json(self, status: int, payload: dict) -> None:
+        body = json.dumps(payload).encode()
+        self.send_response(status)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def do_GET(self):
+        prediction_server = self.server.prediction_server
+        if self.path == "/health":
+            self._send_json(200, {"status": "ok", "model_version": prediction_server.model_store.version[0]})
+        elif self.path == "/metrics":
+            self._send_json(200, prediction_server.metrics())
+        else:
+            self._send_json(404, {"error": f"Unknown path {self.path}"})
+
+    def do_POST(self):
+        start = time.perf_counter()
+        prediction_server = self.server.prediction_server
+        if self.path != "/predict":
+            self._send_json(404, {"error": f"Unknown path {self.path}"})
+            return
+        try:
+            payload = json.loads(self.rfile.read(int(self.headers.get("Content-Length", 0))) or b"{}")
+            rows = payload["instances"] if isinstance(payload, dict) and "instances" in payload else [payload]
+            if not rows or not all(isinstance(row, dict) for row in rows):
+                raise ValueError("Expected a JSON object of feature values or {\"instances\": [...]}")
+            features = to_feature_frame(rows, prediction_server.model_store.feature_names)
+        except Exception as e:
+            self._send_json(400, {"error": str(e)})
+            return
+        try:
+            predictions = prediction_server.batcher.predict(features)
+        except Exception as e:
+            logger.error(f"Prediction failed: {e}")
+            self._send_json(500, {"error": str(e)})
+            return
+        self._send_json(200, {"predictions": predictions})
+        prediction_server.latency.record(time.perf_counter() - start)
+
+    def log_message(self, format, *args):
+        # per-request access logs would dominate the latency of small requests
+        pass
+
+
+class PredictionHTTPServer(ThreadingHTTPServer):
+    # a deep accept backlog so bursts of concurrent clients queue instead of being reset
+    request_queue_size = 1024
+    daemon_threads = True
+
+
+class PredictionServer:
+    """
+    HTTP prediction service around the published NetworkModel: warm model, hot reload, micro-batching.
+    """
+    def __init__(self, prediction_server_config: PredictionServerConfig = None):
+        try:
+            self.prediction_server_config = prediction_server_config or PredictionServerConfig()
+            config = self.prediction_server_config
+            self.model_store = ModelStore(config.model_file_path, config.reload_interval)
+            self.batcher = MicroBatcher(self.model_store, config.max_batch_size, config.max_wait_ms)
+            self.latency = LatencyTracker(config.latency_window)
+            self.httpd = None
+        except Exception as e:
+            raise NetworkSecurityException(e, sys)
+
+    def metrics(self) -> dict:
+        metrics = self.latency.summary()
+        metrics["batches"] = self.batcher.n_batches
+        metrics["mean_batch_size"] = round(self.batcher.n_rows / self.batcher.n_batches, 2) if self.batcher.n_batches else None
+        metrics["model_version"] = self.model_store.version[0]
+        return metrics
+
+    def start(self) -> tuple:
+        """
+        Starts the model watcher, the batcher and the HTTP server threads; returns the bound (host, port).
+        """
+        try:
+            config = self.prediction_server_config
+            self.model_store.start()
+            self.batcher.start()
+            self.httpd = PredictionHTTPServer((config.host, config.port), PredictionRequestHandler)
+            self.httpd.prediction_server = self
+            threading.Thread(target=self.httpd.serve_forever, name="http-server", daemon=True).start()
+            logger.info(f"Prediction server listening on {self.httpd.server_address}")
+            return self.httpd.server_address
+        except Exception as e:
+            raise NetworkSecurityException(e, sys)
+
+    def shutdown(self) -> None:
+        try:
+            if self.httpd is not None:
+                self.httpd.shutdown()
+                self.httpd.server_close()
+            self.batcher.stop()
+            self.model_store.stop()
+            logger.info(f"Prediction server stopped: {self.metrics()}")
+        except Exception as e:
+            raise NetworkSecurityException(e, sys)
@@ -0,0 +1,206 @@
+from networksecurity.exception import NetworkSecurityException
+from networksecurity.logging import logger
+
+import os
+import sys
+import json
+import time
+import cProfile
+import threading
+from datetime import datetime
+from contextlib import contextmanager
+from dataclasses import dataclass, field, fields, asdict
+
+# seconds between RSS samples while a stage runs
+RSS_SAMPLE_INTERVAL: float = 0.05
+STATM_FILE_PATH: str = "/proc/self/statm"
+
+# stage measured by each thread, rows and candidates a thread reports are added to its stage
+_active_stage = threading.local()
+
+
+@dataclass
+class StageReport:
+    name: str
+    status: str = "running"
+    started_at: str = None
+    wall_time: float = 0.0
+    cpu_time: float = 0.0
+    peak_rss_bytes: int = 0
+    rows: int = 0
+    rows_per_second: float = None
+    candidates: list = field(default_factory=list)
+    profile_file_path: str = None
+
+
+def current_rss_bytes() -> int:
+    """
+    Resident set size of this process, from /proc on Linux, otherwise the peak RSS reported by getrusage, or
+    psutil on Windows where neither exists. 0 when none of them is available.
+    """
+    try:
+        with open(STATM_FILE_PATH) as file:
+            return int(file.read().split()[1]) * os.sysconf("SC_PAGE_SIZE")
+    except OSError:
+        pass
+    try:
+        import resource
+        max_rss = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+        # kilobytes on Linux, bytes on macOS
+        return max_rss if sys.platform == "darwin" else max_rss * 1024
+    except ImportError:
+        pass
+    try:
+        import psutil
+        return psutil.Process().memory_info().rss
+    except ImportError:
+        return 0
+
+
+class RSSSampler:
+    """
+    Background thread tracking the highest RSS seen between start() and stop().
+    """
+    def __init__(self, interval: float = RSS_SAMPLE_INTERVAL):
+        self.interval = interval
+        self.peak = 0
+        self._stop = threading.Event()
+        self._thread = None
+
+    def _sample(self) -> None:
+        self.peak = max(self.peak, current_rss_bytes())
+
+    def _run(self) -> None:
+        while not self._stop.wait(self.interval):
+            self._sample()
+
+    def start(self) -> None:
+        self._sample()
+        self._thread = threading.Thread(target=self._run, name="rss-sampler", daemon=True)
+        self._thread.start()
+
+    def stop(self) -> int:
+        self._stop.set()
+        self._thread.join()
+        self._sample()
+        return self.peak
+
+
+def record_rows(n_rows: int) -> None:
+    """
+    Adds rows processed to the stage being measured, does nothing outside of a measured stage.
+    """
+    stage_report = getattr(_active_stage, "report", None)
+    if stage_report is not None:
+        stage_report.rows += int(n_rows)
+
+
+def record_candidates(candidates: list) -> None:
+    """
+    Adds per-candidate search results (model, params, cv score, fit time) to the stage being measured.
+    """
+    stage_report = getattr(_active_stage, "report", None)
+    if stage_report is not None:
+        stage_report.candidates.extend(candidates)
+
+
+class RunInstrumentation:
+    """
+    Measures every pipeline stage (wall and CPU time, peak RSS, rows and rows/sec) and writes the run report
+    as JSON after each stage, so a failed run still reports the stages it got through.
+    Stages may run concurrently on different threads. CPU time and peak RSS are those of the whole process,
+    so they include whatever ran alongside the stage; search workers report their own fit times per candidate.
+    With `profile_dir` each stage also runs under cProfile (which follows the stage's own thread) and its stats
+    are dumped to <profile_dir>/<stage>.prof.
+    A resumed run calls load_report() first to extend the report of its earlier attempts instead of replacing it.
+    """
+    def __init__(self, report_file_path: str, profile_dir: str = None):
+        try:
+            self.report_file_path = report_file_path
+            self.profile_dir = profile_dir
+            self.started_at = datetime.now().isoformat(timespec="seconds")
+            self._start = time.perf_counter()
+            # wall time and number of the earlier attempts of a resumed run
+            self._previous_wall_time = 0.0
+            self.attempts = 1
+            self.stages = []
+            self._lock = threading.Lock()
+        except Exception as e:
+            raise NetworkSecurityException(e, sys)
+
+    @contextmanager
+    def stage(self, name: str):
+        stage_report = StageReport(name=name, started_at=datetime.now().isoformat(timespec="seconds"))
+        with self._lock:
+            self.stages.append(stage_report)
+        profiler = cProfile.Profile() if self.profile_dir else None
+        sampler = RSSSampler()
+        sampler.start()
+        wall_start, cpu_start = time.perf_counter(), time.process_time()
+        _active_stage.report = stage_report
+        if profiler is not None:
+            try:
+                profiler.enable()
+            except ValueError:
+                # newer Pythons allow a single active profiler, a concurrent stage already holds it
+                logger.warning(f"Not profiling stage {name}, another stage is being profiled")
+                profiler = None
+        try:
+            yield stage_report
+            stage_report.status = "completed"
+        except BaseException:
+            stage_report.status = "failed"
+            raise
+        finally:
+            if profiler is not None:
+                profiler.disable()
+            _active_stage.report = None
+            stage_report.wall_time = time.perf_counter() - wall_start
+            stage_report.cpu_time = time.process_time() - cpu_start
+            stage_report.peak_rss_bytes = sampler.stop()
+            if stage_report.rows and stage_report.wall_time > 0:
+                stage_report.rows_per_second = stage_report.rows / stage_report.wall_time
+            if profiler is not None:
+                os.makedirs(self.profile_dir, exist_ok=True)
+                stage_report.profile_file_path = os.path.join(self.profile_dir, f"{name}.prof")
+                profiler.dump_stats(stage_report.profile_file_path)
+            logger.info(f"Stage {name} {stage_report.status} in {stage_report.wall_time:.2f}s "
+                        f"(cpu {stage_report.cpu_time:.2f}s, peak rss {stage_report.peak_rss_bytes / 1024 ** 2:.0f} MB, {stage_report.rows} rows)")
+            self.write_report()
+
+    def load_report(self) -> None:
+        """
+        Continues the report an earlier attempt of this run wrote: its stages are kept, those of this attempt are
+        appended after them and the total wall time adds up over the attempts. Does nothing without a report.
+        """
+        try:
+            if not os.path.exists(self.report_file_path):
+                return
+            with open(self.report_file_path) as file:
+                report = json.load(file)
+            stage_fields = {stage_field.name for stage_field in fields(StageReport)}
+            previous_stages = [StageReport(**{key: value for key, value in stage.items() if key in stage_fields})
+                               for stage in report.get("stages", [])]
+            with self._lock:
+                self.started_at = report.get("started_at", self.started_at)
+                self._previous_wall_time = report.get("total_wall_time", 0.0)
+                self.attempts = report.get("attempts", 1) + 1
+                self.stages = previous_stages + self.stages
+            logger.info(f"Extending run report {self.report_file_path} with attempt {self.attempts}")
+        except Exception as e:
+            raise NetworkSecurityException(e, sys)
+
+    def write_report(self) -> None:
+        try:
+            with self._lock:
+                report = {
+                    "started_at": self.started_at,
+                    "attempts": self.attempts,
+                    "total_wall_time": self._previous_wall_time + time.perf_counter() - self._start,
+                    "stages": [asdict(stage) for stage in self.stages]
+                }
+                os.makedirs(os.path.dirname(self.report_file_path), exist_ok=True)
+                with open(self.report_file_path, 'w') as file:
+                    json.dump(report, file, indent=2, default=str)
+        except Exception as e:
+            raise NetworkSecurityException(f"Error writing run report {self.report_file_path}: {e}", sys)
@@ -0,0 +1,216 @@
+from networksecurity.exception import NetworkSecurityException
+from networksecurity.logging import logger
+
+import io
+import os
+import sys
+import json
+import mmap
+import struct
+import pickle
+import platform
+import numpy as np
+import sklearn
+
+# first bytes of a model store file, anything else is read as a plain pickle
+MODEL_STORE_MAGIC: bytes = b"NSMODEL\x00"
+MODEL_STORE_FORMAT_VERSION: int = 1
+# array buffers start on cache-line boundaries so they can be mapped and used in place
+MODEL_STORE_ALIGNMENT: int = 64
+MMAP_ACCESS_MODES: dict = {"r": mmap.ACCESS_READ, "c": mmap.ACCESS_COPY}
+
+# the exact classes and reconstructors a model file may reference: the models, imputers and artifacts this package
+# saves and the numpy/scikit-learn internals their pickles use. A model type added to the grid is added here too.
+TRUSTED_GLOBALS: frozenset = frozenset({
+    ("builtins", name) for name in ("object", "list", "dict", "tuple", "set", "frozenset", "slice", "complex",
+                                    "bytes", "bytearray", "str", "int", "float", "bool")
+} | {
+    ("collections", "OrderedDict"),
+    ("copyreg", "_reconstructor"),
+    # numpy 2 moved numpy.core to numpy._core, both spellings appear in saved files
+    *((f"numpy.{core}.multiarray", name) for core in ("core", "_core") for name in ("_reconstruct", "scalar")),
+    *((f"numpy.{core}.numeric", "_frombuffer") for core in ("core", "_core")),
+    ("numpy", "dtype"),
+    ("numpy", "ndarray"),
+    ("numpy.random._pickle", "__randomstate_ctor"),
+    ("numpy.random._pickle", "__bit_generator_ctor"),
+    ("numpy.random._mt19937", "MT19937"),
+    ("numpy.random.bit_generator", "SeedSequence"),
+    ("numpy.random.bit_generator", "__pyx_unpickle_SeedSequence"),
+
+    ("sklearn.pipeline", "Pipeline"),
+    ("sklearn.impute._base", "SimpleImputer"),
+    ("sklearn.impute._knn", "KNNImputer"),
+    ("sklearn.linear_model._logistic", "LogisticRegression"),
+    ("sklearn.linear_model._stochastic_gradient", "SGDClassifier"),
+    ("sklearn.linear_model._sgd_fast", "Hinge"),
+    ("sklearn.linear_model._sgd_fast", "ModifiedHuber"),
+    ("sklearn.naive_bayes", "BernoulliNB"),
+    ("sklearn.neighbors._classification", "KNeighborsClassifier"),
+    ("sklearn.neighbors._kd_tree", "KDTree"),
+    ("sklearn.neighbors._kd_tree", "newObj"),
+    ("sklearn.neighbors._ball_tree", "BallTree"),
+    ("sklearn.neighbors._ball_tree", "newObj"),
+    ("sklearn.metrics._dist_metrics", "EuclideanDistance64"),
+    ("sklearn.metrics._dist_metrics", "newObj"),
+    ("sklearn.tree._classes", "DecisionTreeClassifier"),
+    ("sklearn.tree._classes", "DecisionTreeRegressor"),
+    ("sklearn.tree._tree", "Tree"),
+    ("sklearn.ensemble._forest", "RandomForestClassifier"),
+    ("sklearn.ensemble._gb", "GradientBoostingClassifier"),
+    ("sklearn.ensemble._weight_boosting", "AdaBoostClassifier"),
+    ("sklearn.dummy", "DummyClassifier"),
+    ("sklearn._loss.loss", "HalfBinomialLoss"),
+    ("sklearn._loss.loss", "ExponentialLoss"),
+    ("sklearn._loss._loss", "CyHalfBinomialLoss"),
+    ("sklearn._loss._loss", "CyExponentialLoss"),
+    ("sklearn._loss.link", "LogitLink"),
+    ("sklearn._loss.link", "HalfLogitLink"),
+    ("sklearn._loss.link", "Interval"),
+
+    ("networksecurity.utils.ml_utils.model.estimator", "NetworkModel"),
+    ("networksecurity.utils.ml_utils.model.compiled", "CompiledLinearModel"),
+    ("networksecurity.utils.ml_utils.model.compiled", "CompiledTreeEnsemble"),
+    ("networksecurity.utils.ml_utils.preprocessing.imputer", "IndexedKNNImputer"),
+    ("networksecurity.utils.main_utils.model_store", "DeferredObject._restore"),
+    # checkpointed stage outputs of the training pipeline
+    *(("networksecurity.entity.artifact_entity", name) for name in (
+        "DataIngestionArtifact", "DatasetValidationArtifact", "DataValidationArtifact", "DataTransformationArtifact",
+        "ClassificationMetricArtifact", "ModelTrainerArtifact")),
+})
+
+
+def _pad(offset: int) -> int:
+    return -offset % MODEL_STORE_ALIGNMENT
+
+
+class RestrictedUnpickler(pickle.Unpickler):
+    """
+    Unpickler that only resolves the exact (module, name) pairs in TRUSTED_GLOBALS. A tampered model file can
+    then only call those constructors, not os.system, eval or a library function that unpickles a payload of
+    its own (pandas.read_pickle, numpy.load, ...).
+    """
+    def find_class(self, module: str, name: str):
+        if (module, name) in TRUSTED_GLOBALS:
+            return super().find_class(module, name)
+        raise pickle.UnpicklingError(f"Model file references untrusted object {module}.{name}")
+
+
+class DeferredObject:
+    """
+    An object kept in its pickled form until load() is first called.
+    Pickled with protocol 5 its stream and array buffers travel out of band, so inside a mapped model store
+    file they stay untouched pages of the file until the object is actually needed.
+    """
+    def __init__(self, obj: object):
+        self.buffers = []
+        self.stream = pickle.dumps(obj, protocol=5, buffer_callback=lambda buffer: self.buffers.append(buffer.raw()))
+        self._obj = None
+
+    def __reduce_ex__(self, protocol):
+        wrap = pickle.PickleBuffer if protocol >= 5 else bytes
+        return DeferredObject._restore, (wrap(self.stream), [wrap(buffer) for buffer in self.buffers])
+
+    @staticmethod
+    def _restore(stream, buffers) -> "DeferredObject":
+        deferred = DeferredObject.__new__(DeferredObject)
+        deferred.stream, deferred.buffers, deferred._obj = stream, list(buffers), None
+        return deferred
+
+    def load(self) -> object:
+        if self._obj is None:
+            self._obj = RestrictedUnpickler(io.BytesIO(self.stream), buffers=self.buffers).load()
+        return self._obj
+
+
+def dump_object(file_path: str, obj: object, metadata: dict = None) -> None:
+    """
+    Writes `obj` as a model store file: a JSON header (format and library versions, caller metadata),
+    the pickle stream, and every contiguous numpy array of the object as an aligned raw buffer after it.
+    The arrays never pass through the pickle stream, so loading can map them straight from the file.
+    """
+    try:
+        buffers = []
+        stream = pickle.dumps(obj, protocol=5, buffer_callback=buffers.append)
+        raw_buffers = [buffer.raw() for buffer in buffers]
+
+        header = {
+            "format_version": MODEL_STORE_FORMAT_VERSION,
+            "object_type": f"{type(obj).__module__}.{type(obj).__qualname__}",
+            "versions": {"python": platform.python_version(), "numpy": np.__version__, "sklearn": sklearn.__version__},
+            "metadata": metadata or {},
+        }
+        # buffer offsets depend on the header length, so lay out the header with placeholder offsets first
+        header["pickle"] = [0, len(stream)]
+        header["buffers"] = [[0, raw.nbytes] for raw in raw_buffers]
+        header_length = len(json.dumps(header).encode()) + 32 * (len(raw_buffers) + 1)
+        offset = len(MODEL_STORE_MAGIC) + 8 + header_length
+        offset += _pad(offset)
+        header["pickle"][0] = offset
+        offset += len(stream)
+        for entry in header["buffers"]:
+            offset += _pad(offset)
+            entry[0] = offset
+            offset += entry[1]
+        encoded_header = json.dumps(header).encode().ljust(header_length)
+
+        os.makedirs(os.path.dirname(file_path), exist_ok=True)
+        with open(file_path, 'wb') as file:
+            file.write(MODEL_STORE_MAGIC)
+            file.write(struct.pack("<Q", header_length))
+            file.write(encoded_header)
+            for (start, _), payload in zip([header["pickle"]] + header["buffers"], [stream] + raw_buffers):
+                file.write(b"\0" * (start - file.tell()))
+                file.write(payload)
+    except Exception as e:
+        raise NetworkSecurityException(f"Error writing model store file {file_path}: {e}", sys)
+
+
+def is_model_store_file(file_path: str) -> bool:
+    with open(file_path, 'rb') as file:
+        return file.read(len(MODEL_STORE_MAGIC)) == MODEL_STORE_MAGIC
+
+
+def _read_header(file) -> dict:
+    if file.read(len(MODEL_STORE_MAGIC)) != MODEL_STORE_MAGIC:
+        raise ValueError("Not a model store file")
+    (header_length,) = struct.unpack("<Q", file.read(8))
+    header = json.loads(file.read(header_length))
+    if header["format_version"] > MODEL_STORE_FORMAT_VERSION:
+        raise ValueError(f"Model store format {header['format_version']} is newer than the supported {MODEL_STORE_FORMAT_VERSION}")
+    return header
+
+
+def read_object_metadata(file_path: str) -> dict:
+    """
+    Reads the header of a model store file (versions, object type, caller metadata) without loading the object.
+    """
+    try:
+        with open(file_path, 'rb') as file:
+            return _read_header(file)
+    except Exception as e:
+        raise NetworkSecurityException(f"Error reading model store header {file_path}: {e}", sys)
+
+
+def load_object_file(file_path: str, mmap_mode: str = "r") -> object:
+    """
+    Loads a model store file. With mmap_mode "r" the arrays are read-only views of the mapped file, so
+    processes loading the same model share its pages; "c" maps them copy-on-write and None reads them into memory.
+    """
+    try:
+        with open(file_path, 'rb') as file:
+            header = _read_header(file)
+            if header["versions"]["sklearn"] != sklearn.__version__:
+                logger.warning(f"{file_path} was written with scikit-learn {header['versions']['sklearn']}, "
+                               f"loading it with {sklearn.__version__}")
+            if mmap_mode is None:
+                file.seek(0)
+                view = memoryview(bytearray(file.read()))
+            else:
+                view = memoryview(mmap.mmap(file.fileno(), 0, access=MMAP_ACCESS_MODES[mmap_mode]))
+
+        start, length = header["pickle"]
+        buffers = [view[offset:offset + size] for offset, size in header["buffers"]]
+        return RestrictedUnpickler(io.BytesIO(view[start:start + length]), buffers=buffers).load()
+    except Exception as e:
+        raise NetworkSecurityException(f"Error loading model store file {file_path}: {e}", sys)
@@ -0,0 +1,155 @@
+from networksecurity.exception import NetworkSecurityException
+from networksecurity.logging import logger
+from networksecurity.utils.main_utils.utils import read_yaml_file, write_yaml_file
+
+import os
+import sys
+import json
+import shutil
+import hashlib
+import numpy as np
+import pandas as pd
+
+MANIFEST_FILE_NAME: str = "manifest.yaml"
+HASH_BLOCK_SIZE: int = 1024 * 1024
+
+
+class StageCache:
+    """
+    Content-addressed cache of stage outputs.
+    A stage hashes everything its output depends on (data, schema, parameters, code) into a key and
+    reuses the cached files when an entry with that key exists. The least recently used entries are
+    evicted once the cache grows past `max_size_bytes`.
+    """
+    def __init__(self, cache_dir: str, max_size_bytes: int):
+        try:
+            self.cache_dir = cache_dir
+            self.max_size_bytes = max_size_bytes
+            os.makedirs(self.cache_dir, exist_ok=True)
+        except Exception as e:
+            raise NetworkSecurityException(e, sys)
+
+    @staticmethod
+    def _update_hash(digest, value) -> None:
+        if isinstance(value, pd.DataFrame):
+            digest.update(json.dumps([list(map(str, value.columns)), list(map(str, value.dtypes))]).encode())
+            digest.update(pd.util.hash_pandas_object(value, index=False).to_numpy().tobytes())
+        elif isinstance(value, np.ndarray):
+            digest.update(f"{value.shape}{value.dtype}".encode())
+            digest.update(np.ascontiguousarray(value).tobytes())
+        elif isinstance(value, str) and os.path.isfile(value):
+            with open(value, 'rb') as file:
+                for block in iter(lambda: file.read(HASH_BLOCK_SIZE), b""):
+                    digest.update(block)
+        else:
+            digest.update(json.dumps(value, sort_keys=True, default=repr).encode())
+
+    @staticmethod
+    def fingerprint(*inputs) -> str:
+        """
+        Hashes stage inputs into a cache key. File paths are hashed by content, DataFrames and arrays
+        by their values, anything else by its JSON (or repr) form.
+        """
+        try:
+            digest = hashlib.sha256()
+            for value in inputs:
+                StageCache._update_hash(digest, value)
+                digest.update(b"\0")
+            return digest.hexdigest()
+        except Exception as e:
+            raise NetworkSecurityException(e, sys)
+
+    def _entry_dir(self, stage: str, key: str) -> str:
+        return os.path.join(self.cache_dir, stage, key)
+
+    def get(self, stage: str, key: str) -> dict:
+        """
+        Returns the cached entry as {"files": {name: path}, "metadata": {...}}, or None on a miss.
+        """
+        try:
+            entry_dir = self._entry_dir(stage, key)
+            manifest_path = os.path.join(entry_dir, MANIFEST_FILE_NAME)
+            if not os.path.exists(manifest_path):
+                return None
+
+            manifest = read_yaml_file(manifest_path)
+            files = {name: os.path.join(entry_dir, file_name) for name, file_name in manifest["files"].items()}
+            if not all(os.path.exists(file_path) for file_path in files.values()):
+                return None
+
+            # mark the entry as recently used for eviction
+            os.utime(manifest_path)
+            logger.info(f"Stage cache hit for {stage}: {key}")
+            return {"files": files, "metadata": manifest.get("metadata", {})}
+        except Exception as e:
+            raise NetworkSecurityException(e, sys)
+
+    def put(self, stage: str, key: str, files: dict, metadata: dict = None) -> None:
+        """
+        Copies the stage output files into a new cache entry and evicts old entries if needed.
+        A failure is logged and the entry skipped: put runs behind the stage on the artifact writer, and a
+        cache that cannot be filled must not fail the run that produced the outputs.
+        """
+        entry_dir = self._entry_dir(stage, key)
+        staging_dir = entry_dir + ".tmp"
+        try:
+            shutil.rmtree(staging_dir, ignore_errors=True)
+            os.makedirs(staging_dir, exist_ok=True)
+
+            manifest_files = {}
+            for name, file_path in files.items():
+                file_name = f"{name}{os.path.splitext(file_path)[1]}"
+                shutil.copyfile(file_path, os.path.join(staging_dir, file_name))
+                manifest_files[name] = file_name
+
+            write_yaml_file(os.path.join(staging_dir, MANIFEST_FILE_NAME), {"files": manifest_files, "metadata": metadata or {}})
+
+            # publish the entry in one step so readers never see a partial entry
+            shutil.rmtree(entry_dir, ignore_errors=True)
+            os.replace(staging_dir, entry_dir)
+            logger.info(f"Stage cache stored {stage}: {key}")
+
+            self.evict()
+        except Exception as e:
+            shutil.rmtree(staging_dir, ignore_errors=True)
+            logger.warning(f"Stage cache could not store {stage}: {key}: {e}")
+
+    @staticmethod
+    def restore(entry: dict, destinations: dict) -> None:
+        """
+        Copies cached files to the paths the stage would have written, keyed by entry file name.
+        """
+        try:
+            for name, destination in destinations.items():
+                os.makedirs(os.path.dirname(destination), exist_ok=True)
+                shutil.copyfile(entry["files"][name], destination)
+        except Exception as e:
+            raise NetworkSecurityException(e, sys)
+
+    def evict(self) -> None:
+        """
+        Removes the least recently used entries until the cache fits in `max_size_bytes`.
+        """
+        try:
+            entries = []
+            for stage in os.listdir(self.cache_dir):
+                stage_dir = os.path.join(self.cache_dir, stage)
+                if not os.path.isdir(stage_dir):
+                    continue
+                for key in os.listdir(stage_dir):
+                    entry_dir = os.path.join(stage_dir, key)
+                    manifest_path = os.path.join(entry_dir, MANIFEST_FILE_NAME)
+                    if not os.path.exists(manifest_path):
+                        continue
+                    size = sum(os.path.getsize(os.path.join(entry_dir, file_name)) for file_name in os.listdir(entry_dir))
+                    entries.append((os.path.getmtime(manifest_path), size, entry_dir))
+
+            total_size = sum(size for _, size, _ in entries)
+            for _, size, entry_dir in sorted(entries):
+                if total_size <= self.max_size_bytes:
+                    break
+                shutil.rmtree(entry_dir, ignore_errors=True)
+                total_size -= size
+                logger.info(f"Stage cache evicted {entry_dir}")
+        except Exception as e:
+            raise NetworkSecurityException(e, sys)
@@ -1,11 +1,19 @@
 import yaml
 from networksecurity.exception import NetworkSecurityException
 from networksecurity.logging import logger
-from sklearn.model_selection import GridSearchCV
 from sklearn.metrics import r2_score
 import os, sys
+import csv
 import numpy as np
-import pickle
+import pandas as pd
+from networksecurity.utils.ml_utils.search.model_search import ModelSearchEngine
+from networksecurity.utils.ml_utils.search.incremental_search import IncrementalSearchEngine
+from networksecurity.utils.main_utils.model_store import dump_object, load_object_file, is_model_store_file, RestrictedUnpickler
+from networksecurity.utils.main_utils.instrumentation import record_candidates
+from networksecurity.utils.ml_utils.tracking.experiment_tracker import ExperimentTracker
+from concurrent.futures import Future, ThreadPoolExecutor
+
+PARQUET_COMPRESSION: str = "zstd"
 
 def read_yaml_file(file_path: str) -> dict:
     """
@@ -33,67 +41,317 @@ def write_yaml_file(file_path: str, content: object, replace: bool = False) -> N
     except Exception as e:
         raise NetworkSecurityException(f"Error writing YAML file {file_path}: {e}", sys)
     
-def save_numpy_array(file_path: str, array: np.ndarray) -> None:
+def get_file_format(file_path: str) -> str:
+    """
+    Returns the artifact format of a file from its extension, "csv" or "parquet".
+    """
+    return "parquet" if file_path.endswith(".parquet") else "csv"
+    
+def compact_dataframe(data: pd.DataFrame) -> pd.DataFrame:
+    """
+    Downcasts integral numeric columns that fit in int8 to the nullable Int8 dtype and other
+    numeric columns to float32, so the ternary features are stored in one byte per value.
+    """
+    try:
+        columns = {}
+        for column in data.columns:
+            values = data[column]
+            if not pd.api.types.is_numeric_dtype(values):
+                columns[column] = values
+                continue
+            non_null = values.dropna().to_numpy(dtype=np.float64)
+            is_integral = np.array_equal(non_null, np.round(non_null))
+            in_range = non_null.size == 0 or (non_null.min() >= np.iinfo(np.int8).min and non_null.max() <= np.iinfo(np.int8).max)
+            columns[column] = values.astype("Int8" if is_integral and in_range else "float32")
+        return pd.DataFrame(columns, index=data.index)
+    except Exception as e:
+        raise NetworkSecurityException(f"Error compacting dataframe: {e}", sys)
+    
+def to_numpy_dtypes(data: pd.DataFrame) -> pd.DataFrame:
+    """
+    Converts nullable Int8 columns back to numpy dtypes, int8 when complete and float32 with NaN otherwise.
+    """
+    try:
+        for column in data.columns:
+            if isinstance(data[column].dtype, pd.Int8Dtype):
+                has_nulls = data[column].isna().any()
+                data[column] = data[column].to_numpy(dtype=np.float32 if has_nulls else np.int8, na_value=np.nan if has_nulls else 0)
+        return data
+    except Exception as e:
+        raise NetworkSecurityException(f"Error converting dataframe dtypes: {e}", sys)
+    
+def read_dataframe(file_path: str) -> pd.DataFrame:
+    """
+    Reads a csv or parquet artifact, the format is taken from the file extension.
+    """
+    try:
+        if get_file_format(file_path) == "parquet":
+            return to_numpy_dtypes(pd.read_parquet(file_path))
+        return pd.read_csv(file_path)
+    except Exception as e:
+        raise NetworkSecurityException(f"Error reading dataframe from {file_path}: {e}", sys)
+    
+def read_dataframe_in_chunks(file_path: str, chunk_size: int, bad_lines: list = None):
+    """
+    Yields a csv or parquet artifact as DataFrames of at most `chunk_size` rows, so only one chunk is in memory.
+    Csv lines with the wrong number of fields are left out of the chunks. With `bad_lines` the fields of each
+    one are appended to that list (for the caller to quarantine) before the first chunk is yielded, otherwise
+    lines with too many fields are skipped with a warning.
+    """
+    try:
+        if get_file_format(file_path) == "parquet":
+            import pyarrow.parquet as pq
+            
+            for batch in pq.ParquetFile(file_path).iter_batches(batch_size=chunk_size):
+                yield to_numpy_dtypes(batch.to_pandas())
+        elif bad_lines is None:
+            yield from pd.read_csv(file_path, chunksize=chunk_size, on_bad_lines="warn")
+        else:
+            # the C parser pads short lines with NaN and, in chunked mode, truncates a long line that starts a chunk
+            # instead of raising, so the field counts are checked up front (csv.reader is C code as well) and the
+            # bad lines skipped by row number
+            skip_rows = set()
+            with open(file_path, newline="") as file:
+                reader = csv.reader(file)
+                n_fields = len(next(reader, []))
+                for row_number, fields in enumerate(reader, start=1):
+                    if fields and len(fields) != n_fields:
+                        skip_rows.add(row_number)
+                        bad_lines.append(fields)
+            yield from pd.read_csv(file_path, chunksize=chunk_size, skiprows=skip_rows)
+    except Exception as e:
+        raise NetworkSecurityException(f"Error reading dataframe chunks from {file_path}: {e}", sys)
+    
+def write_dataframe(file_path: str, data: pd.DataFrame) -> None:
+    """
+    Writes a DataFrame to a csv or parquet artifact, the format is taken from the file extension.
+    """
+    try:
+        with DataFrameWriter(file_path) as writer:
+            writer.write(data)
+    except Exception as e:
+        raise NetworkSecurityException(f"Error writing dataframe to {file_path}: {e}", sys)
+    
+class DataFrameWriter:
+    """
+    Writes DataFrame chunks into a single csv or parquet artifact.
+    Parquet files are written with int8 columns and compression, one row group per chunk.
+    In append mode a write that fails (or a `with` block that raises) leaves the existing file as it was.
+    """
+    def __init__(self, file_path: str, append: bool = False):
+        try:
+            self.file_path = file_path
+            self.file_format = get_file_format(file_path)
+            self.append = append and os.path.exists(file_path)
+            self.header = not self.append
+            self.parquet_writer = None
+            self.previous_file_path = None
+            # csv appends are rolled back by truncating to the original size
+            self.original_size = os.path.getsize(file_path) if self.append else None
+            
+            dir_path = os.path.dirname(file_path)
+            os.makedirs(dir_path, exist_ok=True)
+        except Exception as e:
+            raise NetworkSecurityException(f"Error opening writer for {file_path}: {e}", sys)
+    
+    def __enter__(self):
+        return self
+    
+    def __exit__(self, exc_type, exc_value, traceback):
+        self.close(commit=exc_type is None)
+        
+    def _open_parquet_writer(self, data: pd.DataFrame):
+        import pyarrow as pa
+        import pyarrow.parquet as pq
+        
+        if self.append:
+            # parquet files cannot be extended in place, so the existing row groups are streamed into the new file
+            self.previous_file_path = self.file_path + ".previous"
+            os.replace(self.file_path, self.previous_file_path)
+            previous_file = pq.ParquetFile(self.previous_file_path)
+            self.schema = previous_file.schema_arrow
+            self.parquet_writer = pq.ParquetWriter(self.file_path, self.schema, compression=PARQUET_COMPRESSION)
+            for row_group in range(previous_file.num_row_groups):
+                self.parquet_writer.write_table(previous_file.read_row_group(row_group))
+        else:
+            self.schema = pa.Schema.from_pandas(data, preserve_index=False)
+            self.parquet_writer = pq.ParquetWriter(self.file_path, self.schema, compression=PARQUET_COMPRESSION)
+        
+    def write(self, data: pd.DataFrame) -> None:
+        try:
+            if self.file_format == "parquet":
+                import pyarrow as pa
+                
+                data = compact_dataframe(data)
+                if self.parquet_writer is None:
+                    self._open_parquet_writer(data)
+                self.parquet_writer.write_table(pa.Table.from_pandas(data, schema=self.schema, preserve_index=False))
+            else:
+                data.to_csv(self.file_path, mode="w" if self.header else "a", index=False, header=self.header)
+                self.header = False
+        except Exception as e:
+            raise NetworkSecurityException(f"Error writing dataframe chunk to {self.file_path}: {e}", sys)
+        
+    def close(self, commit: bool = True) -> None:
+        """
+        Finishes the file. With `commit` False an append is rolled back to the file as it was before.
+        """
+        try:
+            try:
+                if self.parquet_writer is not None:
+                    self.parquet_writer.close()
+                    self.parquet_writer = None
+            except Exception:
+                commit = False
+                raise
+            finally:
+                if self.previous_file_path is not None:
+                    if commit:
+                        os.remove(self.previous_file_path)
+                    else:
+                        os.replace(self.previous_file_path, self.file_path)
+                    self.previous_file_path = None
+                elif not commit and self.original_size is not None and self.file_format == "csv":
+                    with open(self.file_path, "r+b") as file:
+                        file.truncate(self.original_size)
+        except Exception as e:
+            raise NetworkSecurityException(f"Error closing writer for {self.file_path}: {e}", sys)
+    
+class ArtifactWriter:
+    """
+    Persists stage artifacts either inline or, in write-behind mode, on a background thread so the
+    next stage can start from the in-memory handles while the files are still being written.
     """
-    Saves a numpy array to a specified file path."""
+    def __init__(self, write_behind: bool = False, max_workers: int = 2):
+        self.write_behind = write_behind
+        self.executor = ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix="artifact-writer") if write_behind else None
+        self.futures = []
+        
+    def submit(self, fn, *args, **kwargs) -> Future:
+        """
+        Runs `fn` now, or queues it on the background thread in write-behind mode.
+        """
+        if self.executor is not None:
+            future = self.executor.submit(fn, *args, **kwargs)
+            self.futures.append(future)
+            return future
+        
+        future = Future()
+        future.set_result(fn(*args, **kwargs))
+        return future
+    
+    def submit_after(self, futures: list, fn, *args, **kwargs) -> Future:
+        """
+        Runs `fn` once the given writes have finished, e.g. to cache files that are written behind.
+        """
+        def run_after():
+            for future in futures:
+                future.result()
+            return fn(*args, **kwargs)
+        
+        return self.submit(run_after)
+    
+    def wait(self) -> None:
+        """
+        Blocks until every queued write has finished, re-raising the first failure.
+        """
+        futures, self.futures = self.futures, []
+        for future in futures:
+            future.result()
+            
+    def shutdown(self) -> None:
+        try:
+            self.wait()
+        finally:
+            if self.executor is not None:
+                self.executor.shutdown(wait=True)
+    
+def compact_array(array: np.ndarray) -> np.ndarray:
+    """
+    Downcasts an array to int8 when every value is an integer in the int8 range, otherwise to float32.
+    """
+    try:
+        if np.issubdtype(array.dtype, np.integer) and array.dtype.itemsize == 1:
+            return array
+        is_integral = np.isfinite(array).all() and np.array_equal(array, np.round(array))
+        in_range = array.size == 0 or (array.min() >= np.iinfo(np.int8).min and array.max() <= np.iinfo(np.int8).max)
+        return array.astype(np.int8 if is_integral and in_range else np.float32)
+    except Exception as e:
+        raise NetworkSecurityException(f"Error compacting numpy array: {e}", sys)
+    
+def save_numpy_array(file_path: str, array: np.ndarray, dtype=None) -> None:
+    """
+    Saves a numpy array to a specified file path, optionally cast to `dtype`."""
     try:
         dir_path = os.path.dirname(file_path)
         os.makedirs(dir_path, exist_ok=True)
+        if dtype is not None:
+            array = array.astype(dtype, copy=False)
         with open(file_path, 'wb') as file:
             np.save(file, array)
     except Exception as e:
         raise NetworkSecurityException(f"Error saving numpy array to {file_path}: {e}", sys)
     
-def load_numpy_array(file_path: str) -> np.ndarray:
+def load_numpy_array(file_path: str, mmap_mode: str = None) -> np.ndarray:
     """
     Loads a numpy array from a specified file path.
+    With `mmap_mode` ("r", "c", ...) the file is memory-mapped instead of read into RAM, so loading is
+    near-instant and processes reading the same file share one copy in the page cache.
     """
     try:
         if not os.path.exists(file_path):
             raise FileNotFoundError(f"The file {file_path} does not exist.")
-        with open(file_path, 'rb') as file:
-            return np.load(file)
+        return np.load(file_path, mmap_mode=mmap_mode)
     except Exception as e:
         raise NetworkSecurityException(f"Error loading numpy array from {file_path}: {e}", sys)
     
-def save_object(file_path: str, obj: object) -> None:
+def save_object(file_path: str, obj: object, metadata: dict = None) -> None:
     """
-    Saves an object to a specified file path using pickle.
+    Saves an object to a specified file path in the model store format, with its numpy arrays stored
+    out of band so they can be memory-mapped on load. `metadata` is kept in the file header.
     """
     try:
-        dir_path = os.path.dirname(file_path)
-        os.makedirs(dir_path, exist_ok=True)
-        with open(file_path, 'wb') as file:
-            pickle.dump(obj, file)
+        dump_object(file_path, obj, metadata)
     except Exception as e:
         raise NetworkSecurityException(f"Error saving object to {file_path}: {e}", sys)
     
-def load_object(file_path: str) -> object:
+def load_object(file_path: str, mmap_mode: str = "r") -> object:
     """
-    Loads an object from a specified file path using pickle.
+    Loads an object saved by save_object, mapping its arrays from the file ("r" read-only, "c" copy-on-write,
+    None to read them into memory). Files written as a plain pickle are still read.
+    Only objects from trusted packages are unpickled in both cases.
     """
     try:
         if not os.path.exists(file_path):
             raise FileNotFoundError(f"The file {file_path} does not exist.")
+        if is_model_store_file(file_path):
+            return load_object_file(file_path, mmap_mode=mmap_mode)
         with open(file_path, 'rb') as file:
-            print(file)
-            return pickle.load(file)
+            return RestrictedUnpickler(file).load()
     except Exception as e:
         raise NetworkSecurityException(f"Error loading object from {file_path}: {e}", sys)
 
-def evaluate_models(x_train, y_train, x_test, y_test, models: dict, params: dict) -> dict:
+def evaluate_models(x_train, y_train, x_test, y_test, models: dict, params: dict, strategy: str = "grid",
+                    cv: int = 3, n_jobs: int = -1, n_iter: int = 20, halving_factor: int = 3,
+                    shared_memory: bool = True, tracker: ExperimentTracker = None) -> dict:
+    """
+    Searches the hyperparameters of all models in parallel and returns the test score of each one.
+    The entries of `models` are replaced with their best estimator, already refit on the training data.
+    Every candidate's cv score and fit time goes to the run report, and to `tracker` when one is given.
+    """
     try:
-       report = {}
+       engine = ModelSearchEngine(strategy=strategy, cv=cv, n_jobs=n_jobs, n_iter=n_iter, halving_factor=halving_factor,
+                                  shared_memory=shared_memory)
+       search_report = engine.search(models, params, x_train, y_train)
        
-       for i in range(len(list(models))):
-           model = list(models.values())[i]
-           para = params[list(models.keys())[i]]
-           
-           gs = GridSearchCV(model, para, cv=3)
-           gs.fit(x_train, y_train)
-           
-           model.set_params(**gs.best_params_)
-           model.fit(x_train, y_train)
+       report = {}
+       for model_name, search_result in search_report.items():
+           model = search_result.best_estimator
+           models[model_name] = model
+           # cv score and fit time of every candidate the search tried go into the run report
+           record_candidates(search_result.candidates)
+           if tracker is not None:
+               tracker.log_candidates(search_result.candidates)
            
            y_train_pred = model.predict(x_train)
            y_test_pred = model.predict(x_test)
@@ -101,9 +359,34 @@ def evaluate_models(x_train, y_train, x_test, y_test, models: dict, params: dict
            train_model_score = r2_score(y_train, y_train_pred)
            test_model_score = r2_score(y_test, y_test_pred)
            
-           report[list(models.keys())[i]] = test_model_score
+           report[model_name] = test_model_score
            
        return report
        
     except Exception as e:
-        raise NetworkSecurityException(f"Error evaluating models: {e}", sys)
\ No newline at end of file
+        raise NetworkSecurityException(f"Error evaluating models: {e}", sys)
+
+def evaluate_models_incrementally(train_array, test_array, models: dict, params: dict, chunk_size: int = 100_000,
+                                  epochs: int = 5, validation_fraction: float = 0.1,
+                                  tracker: ExperimentTracker = None) -> dict:
+    """
+    Out-of-core evaluate_models for partial_fit learners: the transformed arrays (features, then the target
+    column, usually memmapped) are streamed in chunks and never loaded whole.
+    Returns the test f1 score of each model and replaces the entries of `models` with their best estimator.
+    """
+    try:
+        engine = IncrementalSearchEngine(chunk_size=chunk_size, epochs=epochs, validation_fraction=validation_fraction)
+        search_report = engine.search(models, params, train_array)
+
+        for model_name, search_result in search_report.items():
+            models[model_name] = search_result.best_estimator
+            record_candidates(search_result.candidates)
+            if tracker is not None:
+                tracker.log_candidates(search_result.candidates)
+
+        # all families are scored on the same pass over the test array
+        test_metrics = engine.score(models, test_array)
+        return {model_name: test_metric.f1_score for model_name, test_metric in test_metrics.items()}
+
+    except Exception as e:
+        raise NetworkSecurityException(f"Error evaluating models incrementally: {e}", sys)
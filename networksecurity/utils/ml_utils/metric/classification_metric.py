@@ -13,4 +13,20 @@ def get_classification_score(y_true, y_pred) -> ClassificationMetricArtifact:
     
     except Exception as e:
         raise NetworkSecurityException(e, sys) from e
-    
\ No newline at end of file
+    
+def get_classification_score_from_counts(true_positives: int, false_positives: int, false_negatives: int) -> ClassificationMetricArtifact:
+    """
+    Same scores as get_classification_score from the confusion counts of the positive class, for predictions
+    counted chunk by chunk. Undefined scores are 0, like sklearn's default zero_division.
+    """
+    try:
+        predicted_positives = true_positives + false_positives
+        actual_positives = true_positives + false_negatives
+        precision = true_positives / predicted_positives if predicted_positives else 0.0
+        recall = true_positives / actual_positives if actual_positives else 0.0
+        f1 = 2 * true_positives / (predicted_positives + actual_positives) if predicted_positives + actual_positives else 0.0
+
+        return ClassificationMetricArtifact(precision=precision, recall=recall, f1_score=f1)
+
+    except Exception as e:
+        raise NetworkSecurityException(e, sys) from e
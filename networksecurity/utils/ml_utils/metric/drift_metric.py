@@ -0,0 +1,257 @@
+from networksecurity.exception import NetworkSecurityException
+
+import sys
+import math
+import numpy as np
+import pandas as pd
+from scipy.stats import chi2, kstwo
+
+try:
+    # exact two-sample KS p-values, the same routine ks_2samp uses for small samples
+    from scipy.stats._stats_py import _attempt_exact_2kssamp
+except ImportError:
+    _attempt_exact_2kssamp = None
+
+DRIFT_METRICS = ("ks", "chi2", "psi")
+KS_METHODS = ("auto", "asymp")
+# with method="auto" samples up to this size get exact KS p-values, like ks_2samp
+KS_EXACT_MAX_N: int = 10000
+# columns with more distinct values than this are histogrammed over their sorted unique values
+MAX_DIRECT_BINS: int = 1024
+PSI_EPSILON: float = 1e-4
+
+
+def _is_integer_valued(values: np.ndarray) -> bool:
+    if np.issubdtype(values.dtype, np.integer):
+        return True
+    return bool(np.all(np.isnan(values) | (values == np.floor(values))))
+
+
+def value_histograms(*samples: np.ndarray) -> tuple:
+    """
+    Counts the values of every column of each sample in one vectorized pass over a shared support.
+    Returns (support, counts, ...) with one (n_columns, n_values) count matrix per sample; NaNs are not counted.
+    Integer-valued data (such as the {-1, 0, 1} features) is binned directly, without sorting.
+    """
+    try:
+        samples = [np.asarray(sample) for sample in samples]
+        n_columns = samples[0].shape[1]
+        bounds = []
+        for sample in samples:
+            if np.issubdtype(sample.dtype, np.integer):
+                if sample.size:
+                    bounds.append((sample.min(), sample.max()))
+            elif not np.all(np.isnan(sample)):
+                bounds.append((np.nanmin(sample), np.nanmax(sample)))
+        if not bounds:
+            return (np.zeros(0), *[np.zeros((n_columns, 0), dtype=np.int64) for _ in samples])
+        low, high = min(bound[0] for bound in bounds), max(bound[1] for bound in bounds)
+
+        if high - low < MAX_DIRECT_BINS and all(_is_integer_valued(sample) for sample in samples):
+            support = np.arange(low, high + 1)
+            to_codes = lambda sample: sample - low
+        else:
+            support = np.unique(np.concatenate([sample[~np.isnan(sample)] for sample in samples]))
+            to_codes = lambda sample: np.where(np.isnan(sample), np.nan, np.searchsorted(support, sample))
+
+        # NaNs go to one extra bin per column, and each column gets its own block of bins,
+        # so a single bincount covers the whole sample
+        n_bins = len(support) + 1
+        offsets = np.arange(n_columns, dtype=np.int64) * n_bins
+        counts = []
+        for sample in samples:
+            codes = to_codes(sample)
+            if not np.issubdtype(codes.dtype, np.integer):
+                codes = np.nan_to_num(codes, nan=len(support))
+            codes = codes.astype(np.int64, copy=False) + offsets
+            counts.append(np.bincount(codes.ravel(), minlength=n_columns * n_bins).reshape(n_columns, n_bins)[:, :-1])
+        return (support, *counts)
+    except Exception as e:
+        raise NetworkSecurityException(e, sys)
+
+
+def _ks_pvalue(statistic: float, n1: int, n2: int, method: str = "auto") -> float:
+    if method == "auto" and max(n1, n2) <= KS_EXACT_MAX_N and _attempt_exact_2kssamp is not None:
+        success, _, pvalue = _attempt_exact_2kssamp(n1, n2, math.gcd(n1, n2), statistic, "two-sided")
+        if success:
+            return float(np.clip(pvalue, 0, 1))
+    m, n = sorted([float(n1), float(n2)], reverse=True)
+    return float(np.clip(kstwo.sf(statistic, np.round(m * n / (m + n))), 0, 1))
+
+
+def ks_from_counts(base_counts: np.ndarray, current_counts: np.ndarray, method: str = "auto") -> tuple:
+    """
+    Two-sided two-sample KS statistics and p-values of every column, from value counts over a sorted support.
+    Gives the same results as scipy.stats.ks_2samp on the raw samples with the same `method`;
+    "asymp" skips the exact p-value computation, which dominates the cost on small samples.
+    """
+    try:
+        n1, n2 = base_counts.sum(axis=1), current_counts.sum(axis=1)
+        with np.errstate(divide="ignore", invalid="ignore"):
+            cdf1 = np.cumsum(base_counts, axis=1) / n1[:, None]
+            cdf2 = np.cumsum(current_counts, axis=1) / n2[:, None]
+        statistics = np.abs(cdf1 - cdf2).max(axis=1, initial=0.0)
+
+        # p-values only depend on (statistic, n1, n2), compute each distinct combination once
+        pvalues = np.full(len(statistics), np.nan)
+        cache = {}
+        for column, key in enumerate(zip(statistics.tolist(), n1.tolist(), n2.tolist())):
+            if key[1] == 0 or key[2] == 0:
+                continue
+            if key not in cache:
+                cache[key] = _ks_pvalue(*key, method=method)
+            pvalues[column] = cache[key]
+        return statistics, pvalues
+    except Exception as e:
+        raise NetworkSecurityException(e, sys)
+
+
+def chi2_from_counts(base_counts: np.ndarray, current_counts: np.ndarray) -> tuple:
+    """
+    Chi-square test of homogeneity of every column's 2 x n_values contingency table.
+    """
+    try:
+        observed = np.stack([base_counts, current_counts], axis=1).astype(np.float64)
+        totals = observed.sum(axis=(1, 2))
+        expected = observed.sum(axis=2, keepdims=True) * observed.sum(axis=1, keepdims=True) / np.maximum(totals, 1)[:, None, None]
+        with np.errstate(divide="ignore", invalid="ignore"):
+            cells = np.where(expected > 0, (observed - expected) ** 2 / expected, 0.0)
+        statistics = cells.sum(axis=(1, 2))
+        dof = np.maximum((observed.sum(axis=1) > 0).sum(axis=1) - 1, 0)
+        pvalues = np.where(dof > 0, chi2.sf(statistics, np.maximum(dof, 1)), 1.0)
+        return statistics, pvalues
+    except Exception as e:
+        raise NetworkSecurityException(e, sys)
+
+
+def psi_from_counts(base_counts: np.ndarray, current_counts: np.ndarray) -> np.ndarray:
+    """
+    Population stability index of every column, with empty bins floored at PSI_EPSILON.
+    """
+    try:
+        expected = np.clip(base_counts / np.maximum(base_counts.sum(axis=1, keepdims=True), 1), PSI_EPSILON, None)
+        actual = np.clip(current_counts / np.maximum(current_counts.sum(axis=1, keepdims=True), 1), PSI_EPSILON, None)
+        return ((actual - expected) * np.log(actual / expected)).sum(axis=1)
+    except Exception as e:
+        raise NetworkSecurityException(e, sys)
+
+
+def _to_array(df: pd.DataFrame) -> np.ndarray:
+    # plain integer columns stay integers so they can be binned without a NaN pass
+    if all(pd.api.types.is_integer_dtype(dtype) and isinstance(dtype, np.dtype) for dtype in df.dtypes):
+        return df.to_numpy(dtype=np.int64)
+    return df.to_numpy(dtype=np.float64, na_value=np.nan)
+
+
+def _check_drift_options(metrics, ks_method: str) -> None:
+    unknown = set(metrics) - set(DRIFT_METRICS)
+    if unknown:
+        raise ValueError(f"Unknown drift metrics {sorted(unknown)}, expected some of {DRIFT_METRICS}")
+    if ks_method not in KS_METHODS:
+        raise ValueError(f"Unknown KS method {ks_method}, expected one of {KS_METHODS}")
+
+
+def _report_from_counts(columns: list, base_counts: np.ndarray, current_counts: np.ndarray, threshold: float,
+                        metrics, ks_method: str) -> tuple:
+    _, ks_pvalues = ks_from_counts(base_counts, current_counts, ks_method)
+    extra = {}
+    if "chi2" in metrics:
+        extra["chi2_p_value"] = chi2_from_counts(base_counts, current_counts)[1]
+    if "psi" in metrics:
+        extra["psi"] = psi_from_counts(base_counts, current_counts)
+
+    report = {}
+    for index, column in enumerate(columns):
+        report[column] = {
+            "p_value": float(ks_pvalues[index]),
+            "same_distribution": bool(threshold <= ks_pvalues[index])
+        }
+        for name, values in extra.items():
+            report[column][name] = float(values[index])
+    status = all(entry["same_distribution"] for entry in report.values())
+    return status, report
+
+
+def get_drift_report(base_df: pd.DataFrame, current_df: pd.DataFrame, threshold: float = 0.5, metrics=("ks",),
+                     ks_method: str = "auto") -> tuple:
+    """
+    Compares every column of `current_df` with `base_df` from their value histograms.
+    Returns (status, report) where report holds, per column, the KS "p_value" and "same_distribution" flag
+    plus "chi2_p_value" / "psi" when those metrics are requested. Drift is decided on the KS p-value.
+    """
+    try:
+        _check_drift_options(metrics, ks_method)
+        columns = list(base_df.columns)
+        _, base_counts, current_counts = value_histograms(_to_array(base_df[columns]), _to_array(current_df[columns]))
+        return _report_from_counts(columns, base_counts, current_counts, threshold, metrics, ks_method)
+    except Exception as e:
+        raise NetworkSecurityException(e, sys)
+
+
+def build_profile(df: pd.DataFrame) -> dict:
+    """
+    Summarizes a dataset as {"row_count", "columns": {column: {"null_count", "values", "counts"}}}.
+    Only the values that occur are kept, so the profile of the ternary features is a few numbers per column.
+    """
+    try:
+        columns = list(df.columns)
+        support, counts = value_histograms(_to_array(df))
+        null_counts = df.isna().sum()
+        profile = {"row_count": int(len(df)), "columns": {}}
+        for index, column in enumerate(columns):
+            present = np.flatnonzero(counts[index])
+            profile["columns"][str(column)] = {
+                "null_count": int(null_counts[column]),
+                "values": support[present].tolist(),
+                "counts": counts[index][present].tolist()
+            }
+        return profile
+    except Exception as e:
+        raise NetworkSecurityException(e, sys)
+
+
+def merge_profiles(*profiles: dict) -> dict:
+    """
+    Adds up profiles of disjoint samples (e.g. the train and test split) into the profile of their union.
+    """
+    try:
+        merged = {"row_count": 0, "columns": {}}
+        for profile in profiles:
+            merged["row_count"] += profile["row_count"]
+            for column, column_profile in profile["columns"].items():
+                target = merged["columns"].setdefault(column, {"null_count": 0, "values": [], "counts": []})
+                target["null_count"] += column_profile["null_count"]
+                counts = dict(zip(target["values"], target["counts"]))
+                for value, count in zip(column_profile["values"], column_profile["counts"]):
+                    counts[value] = counts.get(value, 0) + count
+                target["values"] = sorted(counts)
+                target["counts"] = [counts[value] for value in target["values"]]
+        return merged
+    except Exception as e:
+        raise NetworkSecurityException(e, sys)
+
+
+def get_profile_drift_report(reference_profile: dict, current_profile: dict, threshold: float = 0.5, metrics=("ks",),
+                             ks_method: str = "auto") -> tuple:
+    """
+    Same report as get_drift_report, computed from two profiles instead of the raw data,
+    so a new batch can be checked against the training data without reloading it.
+    Columns missing from the current profile are reported as drifted.
+    """
+    try:
+        _check_drift_options(metrics, ks_method)
+        columns = list(reference_profile["columns"])
+        empty = {"null_count": 0, "values": [], "counts": []}
+        current_columns = [current_profile["columns"].get(column, empty) for column in columns]
+        support = np.unique(np.concatenate([np.asarray(column_profile["values"], dtype=np.float64)
+                                            for column_profile in [*reference_profile["columns"].values(), *current_columns]]))
+
+        base_counts = np.zeros((len(columns), len(support)), dtype=np.int64)
+        current_counts = np.zeros((len(columns), len(support)), dtype=np.int64)
+        for index, column in enumerate(columns):
+            for counts, column_profile in ((base_counts, reference_profile["columns"][column]), (current_counts, current_columns[index])):
+                positions = np.searchsorted(support, np.asarray(column_profile["values"], dtype=np.float64))
+                counts[index, positions] = column_profile["counts"]
+        return _report_from_counts(columns, base_counts, current_counts, threshold, metrics, ks_method)
+    except Exception as e:
+        raise NetworkSecurityException(e, sys)
@@ -0,0 +1,203 @@
+from networksecurity.exception import NetworkSecurityException
+from networksecurity.logging import logger
+
+import sys
+import numpy as np
+from sklearn.tree import BaseDecisionTree
+from sklearn.linear_model import LogisticRegression, SGDClassifier
+from sklearn.ensemble import (RandomForestClassifier, ExtraTreesClassifier, GradientBoostingClassifier, AdaBoostClassifier)
+
+# rows evaluated at once, bounds the (rows, trees, classes) intermediate arrays
+EVALUATION_BLOCK_SIZE: int = 4096
+# predicted rows remembered by the ternary lookup table
+MAX_LOOKUP_TABLE_SIZE: int = 1 << 20
+# base-3 row codes of the ternary features fit in an int64 up to this many columns
+MAX_TERNARY_CODE_FEATURES: int = 39
+
+
+def _ternary_codes(x: np.ndarray) -> np.ndarray:
+    """
+    Encodes rows of {-1, 0, 1} values as one base-3 integer each.
+    """
+    powers = 3 ** np.arange(x.shape[1], dtype=np.int64)
+    return (x.astype(np.int64) + 1) @ powers
+
+
+def _empty_lookup_table() -> tuple:
+    return np.empty(0, dtype=np.int64), np.empty(0, dtype=np.intp)
+
+
+class CompiledTreeEnsemble:
+    """
+    Flat-array evaluator for sklearn decision trees and tree ensembles.
+    All trees are concatenated into node arrays (feature, threshold, children) with leaves looping onto
+    themselves, so every row walks every tree in lock-step with a few vectorized gathers per level.
+    Leaf values are added up tree by tree, in sklearn's order, onto `bias` and turned into a class by `rule`:
+    "argmax" over the classes, or "non_negative" (second class when the single score is >= 0).
+    Integer-valued inputs (the ternary features) are compared as int8 against integer thresholds and keyed by
+    their base-3 code into a lookup table of already predicted rows, so repeated rows are never re-evaluated.
+    """
+    def __init__(self, trees: list, leaf_values: list, classes: np.ndarray, rule: str, bias: float = 0.0):
+        offsets = np.cumsum([0] + [tree.node_count for tree in trees[:-1]])
+        features, thresholds, children = [], [], []
+        for tree, offset in zip(trees, offsets):
+            is_leaf = tree.children_left == -1
+            node_ids = np.arange(tree.node_count)
+            features.append(np.where(is_leaf, 0, tree.feature))
+            thresholds.append(np.where(is_leaf, np.inf, tree.threshold))
+            # children of node i at 2i (x <= threshold) and 2i + 1 (x > threshold)
+            children.append(np.column_stack([np.where(is_leaf, node_ids, tree.children_left),
+                                             np.where(is_leaf, node_ids, tree.children_right)]).ravel() + offset)
+
+        self.roots = offsets.astype(np.intp)
+        self.feature = np.concatenate(features).astype(np.intp)
+        self.threshold = np.concatenate(thresholds)
+        # x <= t for integer x is x <= floor(t); leaves (inf) never go right, so they stay put
+        self.int_threshold = np.clip(np.floor(self.threshold), -128, 127).astype(np.int8)
+        self.children = np.concatenate(children).astype(np.intp)
+        self.leaf_value = np.concatenate(leaf_values)
+        self.max_depth = max(tree.max_depth for tree in trees)
+        self.classes_ = classes
+        self.rule = rule
+        self.bias = bias
+        self._lookup_table = _empty_lookup_table()
+
+    def __getstate__(self):
+        # predictions cached at serving time are not part of the model
+        state = self.__dict__.copy()
+        state["_lookup_table"] = _empty_lookup_table()
+        return state
+
+    def _leaves(self, x: np.ndarray) -> np.ndarray:
+        threshold = self.int_threshold if x.dtype == np.int8 else self.threshold
+        values = x.ravel()
+        row_offsets = np.arange(len(x))[:, None] * x.shape[1]
+        node = np.broadcast_to(self.roots, (len(x), len(self.roots)))
+        for _ in range(self.max_depth):
+            go_right = values[row_offsets + self.feature[node]] > threshold[node]
+            next_node = self.children[2 * node + go_right]
+            if np.array_equal(next_node, node):
+                break
+            node = next_node
+        return node
+
+    def _scores(self, x: np.ndarray) -> np.ndarray:
+        values = self.leaf_value[self._leaves(x)]
+        # a running sum adds the trees one after the other like sklearn does, so ties break the same way
+        bias = np.full((len(x), 1, values.shape[2]), self.bias)
+        return np.cumsum(np.concatenate([bias, values], axis=1), axis=1)[:, -1]
+
+    def _class_indices(self, x: np.ndarray) -> np.ndarray:
+        indices = np.empty(len(x), dtype=np.intp)
+        for start in range(0, len(x), EVALUATION_BLOCK_SIZE):
+            scores = self._scores(np.ascontiguousarray(x[start:start + EVALUATION_BLOCK_SIZE]))
+            if self.rule == "non_negative":
+                indices[start:start + EVALUATION_BLOCK_SIZE] = scores[:, 0] >= 0
+            else:
+                indices[start:start + EVALUATION_BLOCK_SIZE] = np.argmax(scores, axis=1)
+        return indices
+
+    def _lookup(self, codes: np.ndarray) -> tuple:
+        table_codes, table_indices = self._lookup_table
+        position = np.minimum(np.searchsorted(table_codes, codes), max(len(table_codes) - 1, 0))
+        found = table_codes[position] == codes if len(table_codes) else np.zeros(len(codes), dtype=bool)
+        return found, table_indices[position] if len(table_codes) else np.zeros(len(codes), dtype=np.intp)
+
+    def _predict_ternary(self, x: np.ndarray, codes: np.ndarray) -> np.ndarray:
+        found, indices = self._lookup(codes)
+        if not found.all():
+            missing = np.flatnonzero(~found)
+            new_codes, first, inverse = np.unique(codes[missing], return_index=True, return_inverse=True)
+            new_indices = self._class_indices(x[missing[first]])
+            indices[missing] = new_indices[inverse.reshape(-1)]
+
+            table_codes, table_indices = self._lookup_table
+            if len(table_codes) + len(new_codes) <= MAX_LOOKUP_TABLE_SIZE:
+                merged_codes = np.concatenate([table_codes, new_codes])
+                order = np.argsort(merged_codes, kind="stable")
+                # swapped in as one tuple, concurrent readers see either the old or the new table
+                self._lookup_table = (merged_codes[order], np.concatenate([table_indices, new_indices])[order])
+        return indices
+
+    def predict(self, x) -> np.ndarray:
+        x = np.asarray(x)
+        if x.size == 0:
+            return self.classes_[np.zeros(len(x), dtype=np.intp)]
+        low, high = x.min(), x.max()
+        integral = np.issubdtype(x.dtype, np.integer) or (np.issubdtype(x.dtype, np.floating) and np.all(x == np.round(x)))
+        if not (integral and -128 <= low and high <= 127):
+            # the comparisons sklearn makes, on float32 features
+            return self.classes_[self._class_indices(x.astype(np.float32))]
+
+        x = x.astype(np.int8)
+        if -1 <= low and high <= 1 and x.shape[1] <= MAX_TERNARY_CODE_FEATURES:
+            return self.classes_[self._predict_ternary(x, _ternary_codes(x))]
+        return self.classes_[self._class_indices(x)]
+
+
+class CompiledLinearModel:
+    """
+    Logistic regression or an SGD linear classifier as a plain dot product against its coefficients.
+    """
+    def __init__(self, model):
+        self.coef = model.coef_.T.copy()
+        self.intercept = model.intercept_.copy()
+        self.classes_ = model.classes_
+
+    def predict(self, x) -> np.ndarray:
+        scores = np.asarray(x, dtype=np.float64) @ self.coef + self.intercept
+        if scores.shape[1] == 1:
+            return self.classes_[(scores[:, 0] > 0).astype(np.intp)]
+        return self.classes_[np.argmax(scores, axis=1)]
+
+
+def _class_probabilities(tree) -> np.ndarray:
+    # as in DecisionTreeClassifier.predict_proba, empty nodes keep their zeros
+    values = tree.value[:, 0, :]
+    normalizer = values.sum(axis=1, keepdims=True)
+    normalizer[normalizer == 0.0] = 1.0
+    return values / normalizer
+
+
+def compile_model(model):
+    """
+    Exports a fitted sklearn classifier into an array-backed evaluator with the same predictions.
+    Supports decision trees, random/extra forests, binary gradient boosting, AdaBoost over trees and
+    linear classifiers (logistic regression, SGD); returns None for anything else (the model is then used as is).
+    """
+    try:
+        if isinstance(model, (LogisticRegression, SGDClassifier)):
+            return CompiledLinearModel(model)
+
+        if isinstance(model, BaseDecisionTree) and hasattr(model, "classes_") and model.n_outputs_ == 1:
+            return CompiledTreeEnsemble([model.tree_], [_class_probabilities(model.tree_)], model.classes_, "argmax")
+
+        if isinstance(model, (RandomForestClassifier, ExtraTreesClassifier)) and model.n_outputs_ == 1:
+            # the summed probabilities rank the classes like their mean does
+            trees = [estimator.tree_ for estimator in model.estimators_]
+            return CompiledTreeEnsemble(trees, [_class_probabilities(tree) for tree in trees], model.classes_, "argmax")
+
+        if isinstance(model, GradientBoostingClassifier) and model.estimators_.shape[1] == 1:
+            trees = [estimator.tree_ for estimator in model.estimators_[:, 0]]
+            leaf_values = [model.learning_rate * tree.value[:, 0, :] for tree in trees]
+            # the init estimator predicts a constant, read it off any one row
+            probe = np.zeros((1, model.n_features_in_), dtype=np.float32)
+            bias = float(model._raw_predict_init(probe)[0, 0])
+            return CompiledTreeEnsemble(trees, leaf_values, model.classes_, "non_negative", bias)
+
+        if isinstance(model, AdaBoostClassifier) and all(isinstance(estimator, BaseDecisionTree) for estimator in model.estimators_):
+            n_classes = len(model.classes_)
+            trees, leaf_values = [], []
+            for estimator, weight in zip(model.estimators_, model.estimator_weights_):
+                # SAMME votes: +w for the tree's class, -w/(K-1) for the others
+                predicted = np.searchsorted(model.classes_, estimator.classes_[np.argmax(estimator.tree_.value[:, 0, :], axis=1)])
+                votes = np.full((estimator.tree_.node_count, n_classes), -1 / max(n_classes - 1, 1) * weight)
+                votes[np.arange(len(predicted)), predicted] = weight
+                trees.append(estimator.tree_)
+                leaf_values.append(votes)
+            return CompiledTreeEnsemble(trees, leaf_values, model.classes_, "argmax")
+
+        logger.info(f"No compiled evaluator for {type(model).__name__}, predictions use the sklearn model")
+        return None
+    except Exception as e:
+        raise NetworkSecurityException(e, sys)
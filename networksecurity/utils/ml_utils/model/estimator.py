@@ -1,22 +1,73 @@
 from networksecurity.constants.training_pipeline import SAVED_MODEL_DIR, MODEL_FILE_NAME
 
 import os, sys
+import logging
 
 from networksecurity.exception import NetworkSecurityException
 from networksecurity.logging import logger
+from networksecurity.utils.ml_utils.preprocessing.imputer import count_missing_values, impute_missing_rows
+from networksecurity.utils.ml_utils.model.compiled import compile_model
+from networksecurity.utils.main_utils.model_store import DeferredObject
 
 class NetworkModel:
     def __init__(self, model, preprocessor):
         try:
             self.model = model
             self.preprocessor = preprocessor
+            # flat-array evaluator of the model, set by compile()
+            self.compiled_model = None
 
         except Exception as e:
             raise NetworkSecurityException(e, sys) from e
         
+    def __getstate__(self):
+        state = self.__dict__.copy()
+        if "_deferred_model" in state:
+            state["model"] = state.pop("_deferred_model")
+        elif state.get("compiled_model") is not None:
+            # predict only needs the compiled evaluator, the sklearn model is unpickled on first access
+            state["model"] = DeferredObject(state["model"])
+        return state
+    
+    def __setstate__(self, state):
+        model = state.pop("model")
+        self.__dict__.update(state)
+        if isinstance(model, DeferredObject):
+            self._deferred_model = model
+        else:
+            self.model = model
+    
+    def __getattr__(self, name):
+        # only reached when the attribute is missing, i.e. for a model still deferred
+        if name == "model" and "_deferred_model" in self.__dict__:
+            self.model = self.__dict__.pop("_deferred_model").load()
+            return self.model
+        raise AttributeError(f"{type(self).__name__!r} object has no attribute {name!r}")
+        
+    def compile(self) -> bool:
+        """
+        Exports the fitted model into a flat-array evaluator used by predict instead of the sklearn model.
+        Returns False when the model type has no compiled form.
+        """
+        try:
+            self.compiled_model = compile_model(self.model)
+            return self.compiled_model is not None
+        except Exception as e:
+            raise NetworkSecurityException(e, sys) from e
+        
     def predict(self, x):
         try:
-            x_transformed = self.preprocessor.transform(x)
+            # complete rows skip the imputer, only rows with a missing value are imputed.
+            # the null counts are only logged: one NetworkModel is shared by the serving threads, so predict
+            # must not write to it
+            if logger.isEnabledFor(logging.DEBUG):
+                null_counts = {column: count for column, count in count_missing_values(x).items() if count}
+                logger.debug(f"Predicting {len(x)} rows, missing values per column: {null_counts}")
+            x_transformed = impute_missing_rows(self.preprocessor, x)
+            # models pickled before compile() existed have no compiled_model attribute
+            compiled_model = getattr(self, "compiled_model", None)
+            if compiled_model is not None:
+                return compiled_model.predict(x_transformed)
             y_pred = self.model.predict(x_transformed)
             return y_pred
         except Exception as e:
@@ -0,0 +1,220 @@
+from networksecurity.exception import NetworkSecurityException
+
+import sys
+import threading
+import numpy as np
+import pandas as pd
+from collections import OrderedDict
+from sklearn.base import BaseEstimator, OneToOneFeatureMixin, TransformerMixin
+from sklearn.impute import KNNImputer, SimpleImputer
+from sklearn.neighbors import NearestNeighbors
+from sklearn.utils.validation import check_is_fitted
+
+IMPUTER_STRATEGIES = ("knn", "indexed_knn", "mode")
+# distance matrix budget of the brute-force path, in float64 values
+BRUTE_FORCE_BLOCK_SIZE: int = 4 * 1024 * 1024
+
+
+class IndexedKNNImputer(OneToOneFeatureMixin, TransformerMixin, BaseEstimator):
+    """
+    KNN imputer backed by a spatial index instead of brute-force distances over every training row.
+    Donors are the complete training rows. Rows to impute are grouped by their missing-value pattern:
+    frequent patterns query a KD/ball tree built over the donors' observed columns, so they cost
+    O(rows * log(donors)), and rare patterns use a blocked, vectorized distance computation that does not
+    pay for building a tree. Within a pattern the neighbours match those of KNNImputer's nan-euclidean
+    distance restricted to complete donors. Only the `max_trees` most recently used trees are kept.
+    """
+    def __init__(self, missing_values=np.nan, n_neighbors: int = 3, weights: str = "uniform",
+                 algorithm: str = "kd_tree", leaf_size: int = 40, min_rows_for_index: int = 256,
+                 max_trees: int = 8):
+        self.missing_values = missing_values
+        self.n_neighbors = n_neighbors
+        self.weights = weights
+        self.algorithm = algorithm
+        self.leaf_size = leaf_size
+        self.min_rows_for_index = min_rows_for_index
+        self.max_trees = max_trees
+
+    def _get_mask(self, x: np.ndarray) -> np.ndarray:
+        if isinstance(self.missing_values, float) and np.isnan(self.missing_values):
+            return np.isnan(x)
+        return (x == self.missing_values) | np.isnan(x)
+
+    def fit(self, X, y=None):
+        try:
+            x = np.asarray(X, dtype=np.float64)
+            mask = self._get_mask(x)
+            self.n_features_in_ = x.shape[1]
+            self.donors_ = x[~mask.any(axis=1)]
+
+            # most frequent value per column, used when there are no donors or no observed columns
+            self.fill_values_ = np.zeros(x.shape[1])
+            for column in range(x.shape[1]):
+                values, counts = np.unique(x[~mask[:, column], column], return_counts=True)
+                if values.size:
+                    self.fill_values_[column] = values[np.argmax(counts)]
+
+            self._trees = OrderedDict()
+            self._trees_lock = threading.Lock()
+            return self
+        except Exception as e:
+            raise NetworkSecurityException(e, sys)
+
+    def __getstate__(self):
+        # the per-pattern trees are rebuilt lazily, keep them out of the pickled preprocessor
+        state = self.__dict__.copy()
+        state["_trees"] = OrderedDict()
+        state.pop("_trees_lock", None)
+        return state
+
+    def __setstate__(self, state):
+        super().__setstate__(state)
+        self._trees_lock = threading.Lock()
+
+    def _get_tree(self, observed: np.ndarray) -> NearestNeighbors:
+        key = observed.tobytes()
+        # train and test may be transformed concurrently, the cache is shared
+        with self._trees_lock:
+            tree = self._trees.pop(key, None)
+            if tree is None:
+                tree = NearestNeighbors(n_neighbors=min(self.n_neighbors, len(self.donors_)),
+                                        algorithm=self.algorithm, leaf_size=self.leaf_size)
+                tree.fit(self.donors_[:, observed])
+            self._trees[key] = tree
+            while len(self._trees) > self.max_trees:
+                self._trees.popitem(last=False)
+        return tree
+
+    def _brute_force_neighbors(self, queries: np.ndarray, observed: np.ndarray):
+        """
+        Exact k nearest donors for a few rows, computed in blocks of the distance matrix.
+        """
+        donors = self.donors_[:, observed]
+        donor_norms = (donors ** 2).sum(axis=1)
+        n_neighbors = min(self.n_neighbors, len(donors))
+        block_size = max(1, BRUTE_FORCE_BLOCK_SIZE // len(donors))
+
+        distances = np.empty((len(queries), n_neighbors))
+        indices = np.empty((len(queries), n_neighbors), dtype=np.intp)
+        for start in range(0, len(queries), block_size):
+            block = queries[start:start + block_size]
+            squared = (block ** 2).sum(axis=1)[:, None] + donor_norms[None, :] - 2.0 * block @ donors.T
+            nearest = np.argpartition(squared, n_neighbors - 1, axis=1)[:, :n_neighbors]
+            nearest_squared = np.take_along_axis(squared, nearest, axis=1)
+            order = np.argsort(nearest_squared, axis=1)
+            indices[start:start + block_size] = np.take_along_axis(nearest, order, axis=1)
+            distances[start:start + block_size] = np.sqrt(np.maximum(np.take_along_axis(nearest_squared, order, axis=1), 0.0))
+        return distances, indices
+
+    def transform(self, X):
+        try:
+            check_is_fitted(self, "donors_")
+            x = np.array(X, dtype=np.float64, copy=True)
+            mask = self._get_mask(x)
+            rows = np.flatnonzero(mask.any(axis=1))
+            if rows.size == 0:
+                return x
+
+            if len(self.donors_) == 0:
+                x[mask] = np.broadcast_to(self.fill_values_, x.shape)[mask]
+                return x
+
+            patterns, inverse = np.unique(mask[rows], axis=0, return_inverse=True)
+            inverse = inverse.reshape(-1)
+            for pattern_index, pattern in enumerate(patterns):
+                pattern_rows = rows[inverse == pattern_index]
+                observed = np.flatnonzero(~pattern)
+                missing = np.flatnonzero(pattern)
+                if observed.size == 0:
+                    x[np.ix_(pattern_rows, missing)] = self.fill_values_[missing]
+                    continue
+
+                queries = x[np.ix_(pattern_rows, observed)]
+                if len(pattern_rows) >= self.min_rows_for_index:
+                    distances, indices = self._get_tree(observed).kneighbors(queries)
+                else:
+                    distances, indices = self._brute_force_neighbors(queries, observed)
+                neighbour_values = self.donors_[:, missing][indices]
+                if self.weights == "distance":
+                    with np.errstate(divide="ignore"):
+                        weights = 1.0 / distances
+                    # exact matches take all the weight, as in KNNImputer
+                    exact = np.isinf(weights)
+                    weights = np.where(exact.any(axis=1, keepdims=True), exact.astype(np.float64), weights)
+                else:
+                    weights = np.ones_like(distances)
+                x[np.ix_(pattern_rows, missing)] = (neighbour_values * weights[..., None]).sum(axis=1) / weights.sum(axis=1)[:, None]
+            return x
+        except Exception as e:
+            raise NetworkSecurityException(e, sys)
+
+
+def get_imputer(imputer_params: dict):
+    """
+    Builds the imputer selected by the "strategy" key of the imputer params:
+    "knn" (sklearn KNNImputer), "indexed_knn" (IndexedKNNImputer) or "mode" (most frequent value per column).
+    """
+    try:
+        params = dict(imputer_params)
+        strategy = params.pop("strategy", "knn")
+        if strategy == "knn":
+            return KNNImputer(**params)
+        if strategy == "indexed_knn":
+            return IndexedKNNImputer(**params)
+        if strategy == "mode":
+            return SimpleImputer(missing_values=params.get("missing_values", np.nan), strategy="most_frequent")
+        raise ValueError(f"Unknown imputer strategy {strategy}, expected one of {IMPUTER_STRATEGIES}")
+    except Exception as e:
+        raise NetworkSecurityException(e, sys)
+
+
+def count_missing_values(x) -> dict:
+    """
+    Per-column null counts of a DataFrame or 2-d array, keyed by column name (or position).
+    """
+    try:
+        if isinstance(x, pd.DataFrame):
+            counts = np.isnan(x.to_numpy(dtype=np.float64, na_value=np.nan)).sum(axis=0)
+            return {str(column): int(count) for column, count in zip(x.columns, counts)}
+        counts = np.isnan(np.asarray(x, dtype=np.float64)).sum(axis=0)
+        return {str(column): int(count) for column, count in enumerate(counts)}
+    except Exception as e:
+        raise NetworkSecurityException(e, sys)
+
+
+def _keeps_columns(preprocessor, x, n_features: int) -> bool:
+    """
+    Whether the preprocessor outputs as many columns as it is given, from its output feature names when it
+    has them, otherwise by transforming one row.
+    """
+    try:
+        return len(preprocessor.get_feature_names_out()) == n_features
+    except Exception:
+        probe = preprocessor.transform(x.iloc[:1] if isinstance(x, pd.DataFrame) else np.asarray(x, dtype=np.float64)[:1])
+        return np.shape(probe)[1] == n_features
+
+
+def impute_missing_rows(preprocessor, x) -> np.ndarray:
+    """
+    Transforms `x` with an imputation-only preprocessor, running it only on the rows that have a missing value.
+    Complete rows pass through unchanged (imputers leave them as they are), so a NaN-free input skips the
+    neighbour search entirely. Falls back to a full transform if the preprocessor changes the column count.
+    """
+    try:
+        frame = x if isinstance(x, pd.DataFrame) else None
+        values = np.asarray(x, dtype=np.float64)
+        incomplete = np.flatnonzero(np.isnan(values).any(axis=1))
+
+        if incomplete.size == 0:
+            if not _keeps_columns(preprocessor, x, values.shape[1]):
+                return np.asarray(preprocessor.transform(x), dtype=np.float64)
+            return values.copy()
+
+        imputed = preprocessor.transform(frame.iloc[incomplete] if frame is not None else values[incomplete])
+        if np.shape(imputed)[1] != values.shape[1]:
+            return np.asarray(preprocessor.transform(x), dtype=np.float64)
+        transformed = values.copy()
+        transformed[incomplete] = imputed
+        return transformed
+    except Exception as e:
+        raise NetworkSecurityException(e, sys)
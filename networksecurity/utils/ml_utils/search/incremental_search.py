@@ -0,0 +1,135 @@
+from networksecurity.exception import NetworkSecurityException
+from networksecurity.logging import logger
+from networksecurity.utils.ml_utils.search.model_search import CandidateResult, SearchResult
+from networksecurity.utils.ml_utils.metric.classification_metric import get_classification_score_from_counts
+
+import sys
+import time
+import numpy as np
+from sklearn.base import clone
+from sklearn.model_selection import ParameterGrid
+
+# label scored as the positive class, as in get_classification_score
+POSITIVE_LABEL: int = 1
+
+
+def iter_chunks(array, chunk_size: int, start: int = 0, stop: int = None, rng: np.random.Generator = None):
+    """
+    Yields (x, y) for consecutive blocks of `chunk_size` rows of a transformed array (features, then the target
+    column), between rows `start` and `stop`. Only one block is read at a time, so a memmapped array is never
+    loaded whole. With `rng` the blocks come in random order and the rows of each block are shuffled.
+    """
+    stop = len(array) if stop is None else stop
+    starts = np.arange(start, stop, chunk_size)
+    if rng is not None:
+        starts = rng.permutation(starts)
+    for block_start in starts:
+        chunk = np.asarray(array[block_start:min(block_start + chunk_size, stop)])
+        if rng is not None:
+            chunk = chunk[rng.permutation(len(chunk))]
+        yield chunk[:, :-1].astype(np.float64), chunk[:, -1]
+
+
+class IncrementalSearchEngine:
+    """
+    Out-of-core counterpart of ModelSearchEngine for learners with partial_fit.
+    The training array is read `chunk_size` rows at a time and every chunk is fed to all candidates of all
+    families, so each epoch is a single pass over the file however many candidates there are. The last
+    `validation_fraction` of the rows is held out and scored (f1) in one more pass to pick the best candidate
+    of each family. Memory is bounded by the chunk size, the size of the training set only by disk.
+    """
+    def __init__(self, chunk_size: int = 100_000, epochs: int = 5, validation_fraction: float = 0.1,
+                 random_state: int = 42):
+        try:
+            if chunk_size < 1 or epochs < 1 or not 0.0 < validation_fraction < 1.0:
+                raise ValueError(f"chunk_size and epochs must be positive and validation_fraction in (0, 1), "
+                                 f"got {chunk_size}, {epochs} and {validation_fraction}")
+            self.chunk_size = chunk_size
+            self.epochs = epochs
+            self.validation_fraction = validation_fraction
+            self.random_state = random_state
+        except Exception as e:
+            raise NetworkSecurityException(e, sys)
+
+    def get_classes(self, array, stop: int = None) -> np.ndarray:
+        """
+        The labels found in the target column, which partial_fit needs up front.
+        """
+        classes = set()
+        for _, y in iter_chunks(array, self.chunk_size, stop=stop):
+            classes.update(np.unique(y).tolist())
+        return np.array(sorted(classes))
+
+    def fit(self, estimators: dict, array, stop: int = None) -> dict:
+        """
+        Trains every estimator of `estimators` in place over the rows before `stop`.
+        Returns the partial_fit seconds spent on each one.
+        """
+        try:
+            classes = self.get_classes(array, stop)
+            rng = np.random.default_rng(self.random_state)
+            fit_times = {key: 0.0 for key in estimators}
+            for epoch in range(self.epochs):
+                for x, y in iter_chunks(array, self.chunk_size, stop=stop, rng=rng):
+                    for key, estimator in estimators.items():
+                        start = time.perf_counter()
+                        estimator.partial_fit(x, y, classes=classes)
+                        fit_times[key] += time.perf_counter() - start
+                logger.info(f"Incremental training epoch {epoch + 1}/{self.epochs} done for {len(estimators)} candidates")
+            return fit_times
+        except Exception as e:
+            raise NetworkSecurityException(e, sys)
+
+    def score(self, estimators: dict, array, start: int = 0) -> dict:
+        """
+        Scores every estimator on the rows from `start` on in one pass, counting the confusion matrix chunk
+        by chunk. Returns {key: ClassificationMetricArtifact}.
+        """
+        try:
+            counts = {key: np.zeros(3, dtype=np.int64) for key in estimators}
+            for x, y in iter_chunks(array, self.chunk_size, start=start):
+                actual = y == POSITIVE_LABEL
+                for key, estimator in estimators.items():
+                    predicted = estimator.predict(x) == POSITIVE_LABEL
+                    counts[key] += [np.sum(predicted & actual), np.sum(predicted & ~actual), np.sum(~predicted & actual)]
+            return {key: get_classification_score_from_counts(*(int(count) for count in key_counts))
+                    for key, key_counts in counts.items()}
+        except Exception as e:
+            raise NetworkSecurityException(e, sys)
+
+    def search(self, models: dict, params: dict, array) -> dict:
+        """
+        Trains every candidate of the grids on the training rows, scores them on the held-out rows and returns
+        {model_name: SearchResult} with the best estimator of each family.
+        """
+        try:
+            n_samples = len(array)
+            n_fit = n_samples - max(1, int(n_samples * self.validation_fraction))
+            if n_fit < 1:
+                raise ValueError(f"Not enough rows ({n_samples}) to hold out a validation set")
+
+            candidates = {(name, index): (candidate_params, clone(models[name]).set_params(**candidate_params))
+                          for name in models
+                          for index, candidate_params in enumerate(ParameterGrid(params.get(name, {})))}
+            estimators = {key: estimator for key, (_, estimator) in candidates.items()}
+            fit_times = self.fit(estimators, array, stop=n_fit)
+            scores = self.score(estimators, array, start=n_fit)
+
+            report = {}
+            for name in models:
+                results = [CandidateResult(model_name=name, params=candidate_params, mean_score=float(scores[key].f1_score),
+                                           fit_time=fit_times[key], n_samples=n_fit)
+                           for key, (candidate_params, _) in candidates.items() if key[0] == name]
+                best_index = int(np.argmax([result.mean_score for result in results]))
+                best = results[best_index]
+                report[name] = SearchResult(
+                    model_name=name,
+                    best_params=best.params,
+                    best_score=best.mean_score,
+                    best_estimator=estimators[(name, best_index)],
+                    candidates=results
+                )
+                logger.info(f"{name}: best validation f1 {best.mean_score:.4f} with {best.params}")
+            return report
+        except Exception as e:
+            raise NetworkSecurityException(e, sys)
@@ -0,0 +1,239 @@
+from networksecurity.exception import NetworkSecurityException
+from networksecurity.logging import logger
+
+import os
+import sys
+import math
+import time
+import shutil
+import tempfile
+import numpy as np
+from dataclasses import dataclass, field
+from joblib import Parallel, delayed, effective_n_jobs
+from sklearn.base import clone
+from sklearn.model_selection import ParameterGrid, ParameterSampler, check_cv
+
+SEARCH_STRATEGIES = ("grid", "random", "halving")
+
+
+@dataclass
+class CandidateResult:
+    model_name: str
+    params: dict
+    mean_score: float
+    fit_time: float
+    n_samples: int
+    # first fit error of a candidate that failed on some fold
+    error: str = None
+
+
+@dataclass
+class SearchResult:
+    model_name: str
+    best_params: dict
+    best_score: float
+    best_estimator: object
+    candidates: list = field(default_factory=list)
+
+
+# arrays attached by this worker process, keyed by their .npy path
+_attached_arrays = {}
+
+
+def publish_arrays(arrays: dict, temp_folder: str = None) -> tuple:
+    """
+    Saves the training arrays once as .npy files so pool workers can memory-map them instead of
+    receiving a pickled copy per task. Returns (folder, {name: path}).
+    """
+    folder = tempfile.mkdtemp(prefix="model_search_", dir=temp_folder)
+    paths = {}
+    for name, array in arrays.items():
+        paths[name] = os.path.join(folder, f"{name}.npy")
+        np.save(paths[name], np.ascontiguousarray(array))
+    return folder, paths
+
+
+def attach_array(array_ref):
+    """
+    Returns the array behind a published path as a read-only memmap (zero-copy, shared page cache),
+    or the array itself when it was passed directly.
+    """
+    if not isinstance(array_ref, str):
+        return array_ref
+    if array_ref not in _attached_arrays:
+        # only keep the arrays of the current search attached
+        folder = os.path.dirname(array_ref)
+        for path in [path for path in _attached_arrays if os.path.dirname(path) != folder]:
+            del _attached_arrays[path]
+        _attached_arrays[array_ref] = np.load(array_ref, mmap_mode="r")
+    return _attached_arrays[array_ref]
+
+
+def _fit_and_score(estimator, params: dict, x, y, train_idx, test_idx):
+    """
+    Fits one candidate on one fold and returns (score, fit_time, error); failed fits score NaN like GridSearchCV's
+    error_score and return the error message. `x` and `y` are arrays or published paths, the fold rows are gathered
+    from them in the worker.
+    """
+    start = time.perf_counter()
+    error = None
+    try:
+        x, y = attach_array(x), attach_array(y)
+        model = clone(estimator).set_params(**params)
+        model.fit(x[train_idx], y[train_idx])
+        score = model.score(x[test_idx], y[test_idx])
+    except Exception as e:
+        score = np.nan
+        error = f"{type(e).__name__}: {e}"
+    return score, time.perf_counter() - start, error
+
+
+def _refit(estimator, params: dict, x, y):
+    x, y = attach_array(x), attach_array(y)
+    return clone(estimator).set_params(**params).fit(np.asarray(x), np.asarray(y))
+
+
+class ModelSearchEngine:
+    """
+    Hyperparameter search over several model families at once.
+    Every (family, candidate, fold) fit is fanned out over one process pool instead of running one
+    GridSearchCV after another. Candidates come from the full grid, a random sample of it, or successive
+    halving rounds on growing subsamples. The best candidate of each family is refit once on the full data.
+    With `shared_memory` the training arrays are published once as memmapped .npy files that every
+    worker attaches to, so memory stays flat as the number of workers grows.
+    """
+    def __init__(self, strategy: str = "grid", cv: int = 3, n_jobs: int = -1, n_iter: int = 20,
+                 halving_factor: int = 3, random_state: int = 42, shared_memory: bool = True,
+                 temp_folder: str = None):
+        try:
+            if strategy not in SEARCH_STRATEGIES:
+                raise ValueError(f"Unknown search strategy {strategy}, expected one of {SEARCH_STRATEGIES}")
+            self.strategy = strategy
+            self.cv = cv
+            self.n_jobs = n_jobs
+            self.n_iter = n_iter
+            self.halving_factor = halving_factor
+            self.random_state = random_state
+            self.shared_memory = shared_memory
+            self.temp_folder = temp_folder
+        except Exception as e:
+            raise NetworkSecurityException(e, sys)
+
+    def get_candidates(self, params: dict) -> list:
+        grid = ParameterGrid(params)
+        if self.strategy == "random" and len(grid) > self.n_iter:
+            return list(ParameterSampler(params, n_iter=self.n_iter, random_state=self.random_state))
+        return list(grid)
+
+    def _score_candidates(self, parallel: Parallel, models: dict, candidates: dict, x, y, rows, x_ref, y_ref) -> dict:
+        """
+        Cross-validates every surviving candidate of every family on `rows` in one parallel batch.
+        Returns {model_name: [CandidateResult, ...]} in candidate order.
+        """
+        y_rows = y[rows]
+        # fold indices are mapped back to rows of the full arrays, which the workers index directly
+        folds = [(rows[train_idx], rows[test_idx])
+                 for train_idx, test_idx in check_cv(self.cv, y_rows, classifier=True).split(np.zeros((len(rows), 1)), y_rows)]
+
+        tasks = [(name, index, train_idx, test_idx)
+                 for name, model_candidates in candidates.items()
+                 for index in range(len(model_candidates))
+                 for train_idx, test_idx in folds]
+        outputs = parallel(delayed(_fit_and_score)(models[name], candidates[name][index], x_ref, y_ref, train_idx, test_idx)
+                           for name, index, train_idx, test_idx in tasks)
+
+        scores = {}
+        for (name, index, _, _), output in zip(tasks, outputs):
+            scores.setdefault((name, index), []).append(output)
+
+        results = {}
+        for name, model_candidates in candidates.items():
+            results[name] = []
+            for index, params in enumerate(model_candidates):
+                fold_scores = [score for score, _, _ in scores[(name, index)]]
+                errors = [error for _, _, error in scores[(name, index)] if error is not None]
+                if errors:
+                    # the same warning as GridSearchCV's FitFailedWarning
+                    logger.warning(f"{name} with {params} failed to fit on {len(errors)} of {len(fold_scores)} folds: {errors[0]}")
+                results[name].append(CandidateResult(
+                    model_name=name,
+                    params=params,
+                    mean_score=float(np.mean(fold_scores)),
+                    fit_time=float(sum(fit_time for _, fit_time, _ in scores[(name, index)])),
+                    n_samples=len(rows),
+                    error=errors[0] if errors else None
+                ))
+        return results
+
+    @staticmethod
+    def _rank(results: list) -> list:
+        # NaN scores (failed fits) rank last
+        return sorted(results, key=lambda result: -np.inf if np.isnan(result.mean_score) else result.mean_score, reverse=True)
+
+    def search(self, models: dict, params: dict, x, y) -> dict:
+        """
+        Runs the search and returns {model_name: SearchResult} with the refit best estimator of each family.
+        """
+        shared_folder = None
+        try:
+            x, y = np.asarray(x), np.asarray(y)
+            n_samples = len(y)
+            candidates = {name: self.get_candidates(params.get(name, {})) for name in models}
+            history = {name: [] for name in models}
+
+            x_ref, y_ref = x, y
+            if self.shared_memory and effective_n_jobs(self.n_jobs) > 1:
+                shared_folder, paths = publish_arrays({"x": x, "y": y}, self.temp_folder)
+                x_ref, y_ref = paths["x"], paths["y"]
+
+            with Parallel(n_jobs=self.n_jobs) as parallel:
+                if self.strategy == "halving":
+                    # successive halving: every round keeps the top 1/factor of each family on `factor` times more rows
+                    largest = max(len(model_candidates) for model_candidates in candidates.values())
+                    n_rounds = max(1, math.ceil(math.log(largest, self.halving_factor)) + 1) if largest > 1 else 1
+                    order = np.random.RandomState(self.random_state).permutation(n_samples)
+                    final_results = {}
+                    for round_index in range(n_rounds):
+                        # families already narrowed down to one candidate drop out of later rounds
+                        active = {name: model_candidates for name, model_candidates in candidates.items()
+                                  if name not in final_results or len(model_candidates) > 1}
+                        if not active:
+                            break
+                        n_rows = n_samples // (self.halving_factor ** (n_rounds - 1 - round_index))
+                        n_rows = max(n_rows, min(n_samples, self.cv * 10))
+                        results = self._score_candidates(parallel, models, active, x, y, np.sort(order[:n_rows]), x_ref, y_ref)
+                        for name, model_results in results.items():
+                            history[name].extend(model_results)
+                            ranked = self._rank(model_results)
+                            keep = max(1, math.ceil(len(ranked) / self.halving_factor))
+                            final_results[name] = ranked[:keep]
+                            candidates[name] = [result.params for result in ranked[:keep]]
+                        logger.info(f"Successive halving round {round_index + 1}/{n_rounds} on {n_rows} rows")
+                else:
+                    final_results = self._score_candidates(parallel, models, candidates, x, y, np.arange(n_samples), x_ref, y_ref)
+                    history = final_results
+
+                best = {name: self._rank(final_results[name])[0] for name in models}
+                for name, result in best.items():
+                    if np.isnan(result.mean_score):
+                        raise ValueError(f"Every candidate of {name} failed to fit, {result.params} with {result.error}")
+
+                # one refit per family on the full training data, also in parallel
+                estimators = parallel(delayed(_refit)(models[name], best[name].params, x_ref, y_ref) for name in models)
+
+            report = {}
+            for name, estimator in zip(models, estimators):
+                report[name] = SearchResult(
+                    model_name=name,
+                    best_params=best[name].params,
+                    best_score=best[name].mean_score,
+                    best_estimator=estimator,
+                    candidates=history[name]
+                )
+                logger.info(f"{name}: best cv score {best[name].mean_score:.4f} with {best[name].params}")
+            return report
+        except Exception as e:
+            raise NetworkSecurityException(e, sys)
+        finally:
+            if shared_folder is not None:
+                shutil.rmtree(shared_folder, ignore_errors=True)
@@ -0,0 +1,183 @@
+from networksecurity.exception import NetworkSecurityException
+from networksecurity.logging import logger
+
+import os
+import sys
+import time
+import queue
+import tempfile
+import threading
+from dataclasses import asdict
+
+# MLflow accepts at most this many metrics, params and tags in one log_batch call
+MAX_BATCH_METRICS: int = 1000
+MAX_BATCH_PARAMS: int = 100
+MAX_BATCH_TAGS: int = 100
+MAX_PARAM_VALUE_LENGTH: int = 6000
+CANDIDATES_ARTIFACT_FILE: str = "candidates.json"
+
+_STOP = object()
+
+
+class ExperimentTracker:
+    """
+    Logs a pipeline run to MLflow from a background thread, so training never waits on the tracking backend.
+    Calls only queue the record: metrics, params and tags are sent together with log_batch, models and
+    artifacts are uploaded in order between batches. Everything goes to a single MLflow run.
+    A tracking failure is logged and the record dropped, it never fails the pipeline.
+    mlflow is imported by the worker, the tracker can be created where it is not installed.
+    """
+    def __init__(self, tracking_uri: str = None, experiment_name: str = None, run_name: str = None,
+                 max_queue_size: int = 10000):
+        try:
+            self.tracking_uri = tracking_uri
+            self.experiment_name = experiment_name
+            self.run_name = run_name
+            self.run_id = None
+            self._queue = queue.Queue(maxsize=max_queue_size)
+            self._worker = threading.Thread(target=self._run, name="experiment-tracker", daemon=True)
+            self._worker.start()
+        except Exception as e:
+            raise NetworkSecurityException(e, sys)
+
+    def _put(self, kind: str, *args) -> None:
+        try:
+            self._queue.put_nowait((kind, args))
+        except queue.Full:
+            logger.warning(f"Experiment tracking queue is full, dropping {kind}")
+
+    def log_params(self, params: dict) -> None:
+        self._put("params", {str(key): str(value)[:MAX_PARAM_VALUE_LENGTH] for key, value in params.items()})
+
+    def log_metrics(self, metrics: dict, step: int = 0) -> None:
+        timestamp = int(time.time() * 1000)
+        self._put("metrics", [(str(key), float(value), timestamp, step) for key, value in metrics.items()])
+
+    def set_tags(self, tags: dict) -> None:
+        self._put("tags", {str(key): str(value) for key, value in tags.items()})
+
+    def log_candidates(self, candidates: list) -> None:
+        """
+        Logs the cv score and fit time of every search candidate as a metric series per model (one step per
+        candidate), and the candidate parameters as a JSON table, since MLflow params cannot repeat within a run.
+        """
+        timestamp = int(time.time() * 1000)
+        metrics, table = [], []
+        for step, candidate in enumerate(candidates):
+            metrics.append((f"candidate/{candidate.model_name}/cv_score", float(candidate.mean_score), timestamp, step))
+            metrics.append((f"candidate/{candidate.model_name}/fit_time", float(candidate.fit_time), timestamp, step))
+            table.append(dict(asdict(candidate), step=step))
+        self._put("metrics", metrics)
+        self._put("candidates", table)
+
+    def log_model(self, model, artifact_path: str = "model") -> None:
+        self._put("model", model, artifact_path)
+
+    def log_artifact(self, file_path: str, artifact_path: str = None) -> None:
+        self._put("artifact", file_path, artifact_path)
+
+    def _start_run(self):
+        import mlflow
+        from mlflow import MlflowClient
+
+        client = MlflowClient(tracking_uri=self.tracking_uri or mlflow.get_tracking_uri())
+        experiment_id = "0"
+        experiment_name = self.experiment_name or os.getenv("MLFLOW_EXPERIMENT_NAME")
+        if experiment_name:
+            experiment = client.get_experiment_by_name(experiment_name)
+            experiment_id = experiment.experiment_id if experiment is not None else client.create_experiment(experiment_name)
+        self.run_id = client.create_run(experiment_id, run_name=self.run_name).info.run_id
+        logger.info(f"Tracking this run as MLflow run {self.run_id}")
+        return client
+
+    def _flush(self, client, metrics: list, params: dict, tags: dict) -> None:
+        from mlflow.entities import Metric, Param, RunTag
+
+        metrics = [Metric(key, value, timestamp, step) for key, value, timestamp, step in metrics]
+        params = [Param(key, value) for key, value in params.items()]
+        tags = [RunTag(key, value) for key, value in tags.items()]
+        while metrics or params or tags:
+            client.log_batch(self.run_id, metrics=metrics[:MAX_BATCH_METRICS], params=params[:MAX_BATCH_PARAMS],
+                             tags=tags[:MAX_BATCH_TAGS])
+            metrics, params, tags = metrics[MAX_BATCH_METRICS:], params[MAX_BATCH_PARAMS:], tags[MAX_BATCH_TAGS:]
+
+    def _upload(self, client, kind: str, args: tuple) -> None:
+        if kind == "model":
+            import mlflow.sklearn
+
+            model, artifact_path = args
+            # serialized once per run, here rather than on the training thread
+            with tempfile.TemporaryDirectory() as temp_dir:
+                model_dir = os.path.join(temp_dir, artifact_path)
+                # cloudpickle, as log_model wrote it before; newer MLflow defaults to skops, which may not be installed
+                mlflow.sklearn.save_model(model, model_dir, serialization_format=mlflow.sklearn.SERIALIZATION_FORMAT_CLOUDPICKLE)
+                client.log_artifacts(self.run_id, model_dir, artifact_path)
+        elif kind == "candidates":
+            client.log_dict(self.run_id, {"candidates": args[0]}, CANDIDATES_ARTIFACT_FILE)
+        elif kind == "artifact":
+            file_path, artifact_path = args
+            client.log_artifact(self.run_id, file_path, artifact_path)
+
+    def _run(self) -> None:
+        client = None
+        try:
+            client = self._start_run()
+        except Exception as e:
+            logger.warning(f"Experiment tracking is disabled for this run, MLflow run could not be started: {e}")
+        stopping = False
+        while not stopping:
+            # block for one record, then drain whatever else is queued into the same batch
+            records = [self._queue.get()]
+            while True:
+                try:
+                    records.append(self._queue.get_nowait())
+                except queue.Empty:
+                    break
+
+            metrics, params, tags = [], {}, {}
+            for record in records:
+                try:
+                    if record is _STOP:
+                        stopping = True
+                        continue
+                    if client is None:
+                        continue
+                    kind, args = record
+                    if kind == "metrics":
+                        metrics.extend(args[0])
+                    elif kind == "params":
+                        params.update(args[0])
+                    elif kind == "tags":
+                        tags.update(args[0])
+                    else:
+                        # keep the order of what was logged before the upload
+                        self._flush(client, metrics, params, tags)
+                        metrics, params, tags = [], {}, {}
+                        self._upload(client, kind, args)
+                except Exception as e:
+                    logger.warning(f"Experiment tracking failed, dropping {record[0] if isinstance(record, tuple) else 'record'}: {e}")
+                    metrics, params, tags = [], {}, {}
+            try:
+                if client is not None:
+                    self._flush(client, metrics, params, tags)
+            except Exception as e:
+                logger.warning(f"Experiment tracking failed to log a batch: {e}")
+
+        try:
+            if client is not None:
+                client.set_terminated(self.run_id)
+        except Exception as e:
+            logger.warning(f"Experiment tracking failed to end run {self.run_id}: {e}")
+
+    def close(self, timeout: float = None) -> None:
+        """
+        Sends everything still queued and ends the MLflow run, waiting at most `timeout` seconds.
+        """
+        try:
+            if self._worker.is_alive():
+                self._queue.put(_STOP)
+            self._worker.join(timeout)
+            if self._worker.is_alive():
+                logger.warning(f"Experiment tracking did not finish within {timeout}s, the rest of the run is not logged")
+        except Exception as e:
+            raise NetworkSecurityException(e, sys)
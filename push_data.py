@@ -1,18 +1,27 @@
 import os
 import sys
-import json
-import certifi
+import time
 import pymongo
+import argparse
 import pandas as pd
 import numpy as np
-from dotenv import load_dotenv
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor
 from networksecurity.logging import logger
 from networksecurity.exception import NetworkSecurityException
+from networksecurity.constants.training_pipeline import ARTIFACTS_DIR, DATA_INGESTION_ROW_HASH_FIELD
+from networksecurity.utils.main_utils.utils import read_yaml_file, write_yaml_file
+from networksecurity.entity.config_entity import MongoDBClientConfig
+from networksecurity.configuration.mongo_db_connection import get_mongo_client
 
-load_dotenv()
-
-uri = os.getenv("MONGO_DB_URI")
-ca = certifi.where()
+# rows read from the CSV at a time, and documents per insert_many call
+CHUNK_SIZE: int = 100000
+BATCH_SIZE: int = 10000
+# concurrent insert_many calls, each on its own pooled connection
+N_WORKERS: int = 4
+# progress of an upsert load, so an interrupted load resumes after the last row known to be written
+CHECKPOINT_FILE_PATH: str = os.path.join(ARTIFACTS_DIR, "push_data_checkpoint.yaml")
+DUPLICATE_KEY_ERROR: int = 11000
 
 class NetworkDataExtract():
     def __init__(self):
@@ -21,11 +30,70 @@ class NetworkDataExtract():
         except Exception as e:
             raise NetworkSecurityException(e, sys)
         
+    @staticmethod
+    def to_records(data: pd.DataFrame) -> list:
+        """
+        Builds one document per row straight from the column arrays, NaN becomes None as in the JSON export.
+        """
+        columns = [str(column) for column in data.columns]
+        values = []
+        for column in data.columns:
+            series = data[column]
+            if series.hasnans:
+                series = series.astype(object).where(series.notna(), None)
+            # tolist() turns numpy scalars into the Python ints/floats BSON encodes
+            values.append(series.tolist())
+        return [dict(zip(columns, row)) for row in zip(*values)]
+        
+    @staticmethod
+    def row_hashes(data: pd.DataFrame) -> list:
+        """
+        Content hash of every row, independent of how pandas typed the chunk: numeric columns are hashed as
+        float64 (1 and 1.0 hash alike), anything else as text.
+        """
+        canonical = {}
+        for column in data.columns:
+            numeric = pd.to_numeric(data[column], errors="coerce")
+            if numeric.notna().sum() == data[column].notna().sum():
+                canonical[column] = numeric.astype(np.float64)
+            else:
+                canonical[column] = data[column].astype(str)
+        hashes = pd.util.hash_pandas_object(pd.DataFrame(canonical), index=False).to_numpy()
+        return [f"{value:016x}" for value in hashes.tolist()]
+        
+    def upsert_batch(self, records: list) -> int:
+        """
+        Upserts documents keyed on their row hash with an unordered bulk_write, returning how many were new.
+        Rows already in the collection are left untouched.
+        """
+        operations = [pymongo.UpdateOne({DATA_INGESTION_ROW_HASH_FIELD: record[DATA_INGESTION_ROW_HASH_FIELD]},
+                                        {"$setOnInsert": record}, upsert=True) for record in records]
+        try:
+            return self.collection.bulk_write(operations, ordered=False).upserted_count
+        except pymongo.errors.BulkWriteError as e:
+            # two workers upserting the same new row race on the unique index, the loser's row is already there
+            if any(error["code"] != DUPLICATE_KEY_ERROR for error in e.details["writeErrors"]):
+                raise
+            return e.details["nUpserted"]
+        
+    def read_checkpoint(self, file, database, collection) -> int:
+        """
+        Rows of `file` already loaded into `database.collection` by an interrupted upsert load, 0 otherwise.
+        """
+        if not os.path.exists(CHECKPOINT_FILE_PATH):
+            return 0
+        checkpoint = read_yaml_file(CHECKPOINT_FILE_PATH) or {}
+        if checkpoint.get("target") != [os.path.abspath(file), database, collection]:
+            return 0
+        return checkpoint.get("rows_done", 0)
+        
+    def write_checkpoint(self, file, database, collection, rows_done: int) -> None:
+        write_yaml_file(CHECKPOINT_FILE_PATH, {"target": [os.path.abspath(file), database, collection], "rows_done": rows_done}, replace=True)
+        
     def cv_to_json_convertor(self, file):
         try:
             data = pd.read_csv(file)
-            data.reset_index(drop=True, inplace=True)
-            records = list(json.loads(data.T.to_json()).values())
+            records = self.to_records(data)
             logger.info(f"Data extracted from {file} and converted to JSON format")
             print(f"Data extracted from {file} and converted to JSON format")
             
@@ -40,10 +108,10 @@ class NetworkDataExtract():
             self.database = database
             self.collection = collection
             
-            self.client = pymongo.MongoClient(uri, tlsCAFile=ca)
+            self.client = get_mongo_client()
             self.database = self.client[self.database]
             self.collection = self.database[self.collection]
-            self.collection.insert_many(self.records)
+            self.collection.insert_many(self.records, ordered=False)
             
             logger.info(f"Data pushed to MongoDB collection: {self.collection.name} in database: {self.database.name}")
             print(f"Data pushed to MongoDB collection: {self.collection.name} in database: {self.database.name}")
@@ -53,15 +121,93 @@ class NetworkDataExtract():
         except Exception as e:
             raise NetworkSecurityException(e, sys)
         
+    def bulk_load(self, file, database, collection, chunk_size: int = CHUNK_SIZE, batch_size: int = BATCH_SIZE,
+                  n_workers: int = N_WORKERS, upsert: bool = False) -> int:
+        """
+        Streams the CSV in chunks and writes it in unordered batches from `n_workers` threads sharing one
+        client pool. At most two batches per worker are in flight, so memory stays flat whatever the file size.
+        Plain mode inserts every row. Upsert mode keys each document on its row hash, so re-running the load
+        only adds rows the collection does not hold yet, and it checkpoints the rows written so that an
+        interrupted load resumes where it stopped. Returns the number of documents added.
+        """
+        try:
+            # the shared client, with a pool wide enough for every worker to hold a connection
+            mongo_db_client_config = MongoDBClientConfig()
+            mongo_db_client_config.max_pool_size = max(mongo_db_client_config.max_pool_size, n_workers)
+            self.client = get_mongo_client(mongo_db_client_config)
+            self.collection = self.client[database][collection]
+            
+            rows_done = 0
+            if upsert:
+                # documents loaded before upsert mode have no hash, keep them out of the unique index
+                self.collection.create_index(DATA_INGESTION_ROW_HASH_FIELD, unique=True,
+                                             partialFilterExpression={DATA_INGESTION_ROW_HASH_FIELD: {"$exists": True}})
+                rows_done = self.read_checkpoint(file, database, collection)
+                if rows_done:
+                    logger.info(f"Resuming the load of {file} after {rows_done} rows")
+            resume_from = rows_done
+            
+            start = time.perf_counter()
+            n_rows = n_added = 0
+            with ThreadPoolExecutor(max_workers=n_workers) as executor:
+                pending = deque()
+                
+                def complete_oldest():
+                    # batches complete in submission order, so every row before this batch's end is written
+                    nonlocal n_added, rows_done
+                    future, batch_end = pending.popleft()
+                    result = future.result()
+                    n_added += result if upsert else len(result.inserted_ids)
+                    if upsert:
+                        rows_done = batch_end
+                        self.write_checkpoint(file, database, collection, rows_done)
+                
+                for chunk in pd.read_csv(file, chunksize=chunk_size, skiprows=range(1, resume_from + 1)):
+                    records = self.to_records(chunk)
+                    if upsert:
+                        for record, row_hash in zip(records, self.row_hashes(chunk)):
+                            record[DATA_INGESTION_ROW_HASH_FIELD] = row_hash
+                    for batch_start in range(0, len(records), batch_size):
+                        batch = records[batch_start:batch_start + batch_size]
+                        if upsert:
+                            future = executor.submit(self.upsert_batch, batch)
+                        else:
+                            future = executor.submit(self.collection.insert_many, batch, ordered=False)
+                        n_rows += len(batch)
+                        pending.append((future, resume_from + n_rows))
+                        if len(pending) >= 2 * n_workers:
+                            complete_oldest()
+                while pending:
+                    complete_oldest()
+            
+            if upsert and os.path.exists(CHECKPOINT_FILE_PATH):
+                os.remove(CHECKPOINT_FILE_PATH)
+            
+            elapsed = time.perf_counter() - start
+            rows_per_second = n_rows / elapsed if elapsed > 0 else 0.0
+            logger.info(f"Loaded {n_rows} rows into {database}.{collection} in {elapsed:.1f}s ({rows_per_second:.0f} rows/sec), {n_added} added")
+            print(f"Loaded {n_rows} rows into {database}.{collection} in {elapsed:.1f}s ({rows_per_second:.0f} rows/sec), {n_added} added")
+            
+            return n_added
+            
+        except Exception as e:
+            raise NetworkSecurityException(e, sys)
+        
 if __name__ == "__main__":
     try:
-        file = "Network_data\phisingData.csv"
-        database = "network_security"
-        collection = "network_data"
+        parser = argparse.ArgumentParser(description="Load the phishing CSV into MongoDB.")
+        parser.add_argument("--file", default=os.path.join("Network_data", "phisingData.csv"))
+        parser.add_argument("--database", default="network_security")
+        parser.add_argument("--collection", default="network_data")
+        parser.add_argument("--chunk-size", type=int, default=CHUNK_SIZE, help="rows read from the CSV at a time")
+        parser.add_argument("--batch-size", type=int, default=BATCH_SIZE, help="documents per insert_many call")
+        parser.add_argument("--workers", type=int, default=N_WORKERS, help="concurrent insert_many calls")
+        parser.add_argument("--upsert", action="store_true", help="skip rows already in the collection and resume an interrupted load")
+        args = parser.parse_args()
         
         extractor = NetworkDataExtract()
-        records = extractor.cv_to_json_convertor(file)
-        count = extractor.push_data_to_mongo(records, database, collection)
+        count = extractor.bulk_load(args.file, args.database, args.collection, args.chunk_size, args.batch_size, args.workers,
+                                    upsert=args.upsert)
         
         print(f"Total records pushed: {count}")
         
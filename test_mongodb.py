@@ -1,18 +1,11 @@
+from networksecurity.configuration.mongo_db_connection import get_mongo_client
 
-from pymongo.mongo_client import MongoClient
-from dotenv import load_dotenv
-import os
-
-load_dotenv()
-
-uri = os.getenv("MONGO_DB_URI")
-
-# Create a new client and connect to the server
-client = MongoClient(uri)
+# Reuse the shared, pooled client the pipeline connects with
+client = get_mongo_client()
 
 # Send a ping to confirm a successful connection
 try:
     client.admin.command('ping')
     print("Pinged your deployment. You successfully connected to MongoDB!")
 except Exception as e:
-    print(e)
\ No newline at end of file
+    print(e)
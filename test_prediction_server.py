@@ -0,0 +1,45 @@
+from networksecurity.serving.prediction_server import PredictionServer
+from networksecurity.entity.config_entity import PredictionServerConfig
+from networksecurity.constants.training_pipeline import TARGET_COLUMN
+import pandas as pd
+import numpy as np
+import json
+import time
+import urllib.request
+from concurrent.futures import ThreadPoolExecutor
+
+N_REQUESTS = 2000
+CONCURRENCY = 32
+
+# Start the server in-process on a free port with the published model
+config = PredictionServerConfig()
+config.host, config.port = "127.0.0.1", 0
+server = PredictionServer(config)
+host, port = server.start()
+url = f"http://{host}:{port}"
+
+rows = pd.read_csv("Network_data/phisingData.csv").drop(columns=[TARGET_COLUMN]).head(N_REQUESTS).to_dict(orient="records")
+
+def predict(row):
+    request = urllib.request.Request(f"{url}/predict", data=json.dumps(row).encode(), headers={"Content-Type": "application/json"})
+    start = time.perf_counter()
+    with urllib.request.urlopen(request) as response:
+        prediction = json.loads(response.read())["predictions"][0]
+    return prediction, time.perf_counter() - start
+
+# Fire concurrent single-row requests so the server can coalesce them into micro-batches
+try:
+    start = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=CONCURRENCY) as executor:
+        results = list(executor.map(predict, rows))
+    elapsed = time.perf_counter() - start
+
+    client_latencies = np.array([latency for _, latency in results]) * 1000
+    print(f"{len(results)} requests in {elapsed:.2f}s ({len(results) / elapsed:.0f} req/s)")
+    print(f"client p50 {np.percentile(client_latencies, 50):.2f} ms, p99 {np.percentile(client_latencies, 99):.2f} ms")
+    with urllib.request.urlopen(f"{url}/metrics") as response:
+        print(f"server metrics: {json.loads(response.read())}")
+except Exception as e:
+    print(e)
+finally:
+    server.shutdown()